@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+User = get_user_model()
+
+
+def user_cache_key(user_id):
+    return f'auth_user:{user_id}'
+
+
+def invalidate_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+# Только то, что нужно request.user в шаблонах и проверках доступа,
+# и хеш пароля: из него get_session_auth_hash считает подпись сессии,
+# остальные поля догрузятся из БД.
+CACHED_FIELDS = ('id', 'password', 'username', 'first_name', 'last_name',
+                 'email', 'is_active', 'is_staff', 'is_superuser')
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который при загрузке request.user берёт
+    плоскую запись пользователя из общего кэша вместо запроса
+    к auth_user. Запись сбрасывается при сохранении пользователя,
+    в том числе при смене пароля и обновлении last_login.
+    Годится только с общим кэшем: с LocMemCache сброс виден
+    лишь воркеру, сохранившему пользователя.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        fields = cache.get(key)
+        if fields is None or set(fields) != set(CACHED_FIELDS):
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, {name: getattr(user, name)
+                                for name in CACHED_FIELDS},
+                          settings.AUTH_USER_CACHE_TIMEOUT)
+            return user
+        # from_db ждёт значения в порядке полей модели.
+        names = [field.attname for field in User._meta.concrete_fields
+                 if field.attname in fields]
+        user = User.from_db(User.objects.db, names,
+                            [fields[name] for name in names])
+        return user if self.user_can_authenticate(user) else None
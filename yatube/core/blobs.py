@@ -0,0 +1,95 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from sorl.thumbnail import delete as delete_with_thumbnails
+
+from .models import Blob
+
+
+def counted(names):
+    return Counter(name for name in names if name)
+
+
+@transaction.atomic
+def retain(*names):
+    """Добавляет по ссылке на каждый из файлов."""
+    for name, count in counted(names).items():
+        _, created = Blob.objects.get_or_create(
+            name=name, defaults={'refs': count})
+        if not created:
+            Blob.objects.filter(pk=name).update(refs=F('refs') + count)
+
+
+def release(*names):
+    """Снимает ссылки; файл удалит collect, когда их не останется."""
+    for name, count in counted(names).items():
+        Blob.objects.filter(pk=name).update(refs=F('refs') - count,
+                                            released=timezone.now())
+
+
+@transaction.atomic
+def recount(references):
+    """Выставляет точные счётчики по Counter ссылок из таблиц."""
+    references = {name: count for name, count in references.items() if name}
+    Blob.objects.exclude(pk__in=list(references)).exclude(refs=0).update(
+        refs=0, released=timezone.now())
+    for name, count in references.items():
+        Blob.objects.update_or_create(name=name, defaults={'refs': count})
+
+
+def stored_files(directory):
+    """Все файлы каталога хранилища, кроме недописанных загрузок."""
+    directories, files = default_storage.listdir(directory)
+    for name in files:
+        if not name.startswith('.upload-'):
+            yield f'{directory}/{name}'
+    for subdirectory in directories:
+        yield from stored_files(f'{directory}/{subdirectory}')
+
+
+def touched_since(name, moment):
+    try:
+        return default_storage.get_modified_time(name) >= moment
+    except FileNotFoundError:
+        return False
+
+
+def collect(grace=None, dry_run=False, orphans=False):
+    """
+    Удаляет файлы со счётчиком ссылок 0, а с orphans — и вовсе
+    не учтённые (загрузка без сохранённого поста); это безопасно только
+    сразу после recount. Файлы, записанные или загруженные повторно
+    за последние grace секунд, не трогает — на них ещё может сослаться
+    пост. Возвращает список удалённых имён.
+    """
+    grace = settings.MEDIA_GC_GRACE if grace is None else grace
+    before = timezone.now() - timedelta(seconds=grace)
+    unreferenced = set(Blob.objects.filter(refs__lte=0, released__lt=before)
+                       .values_list('name', flat=True))
+    known = set(Blob.objects.values_list('name', flat=True))
+    for directory in settings.MEDIA_GC_DIRS if orphans else ():
+        if not default_storage.exists(directory):
+            continue
+        for name in stored_files(directory):
+            if name not in known and not touched_since(name, before):
+                unreferenced.add(name)
+    if dry_run:
+        return sorted(unreferenced)
+    removed = []
+    for name in sorted(unreferenced):
+        # Повторная загрузка того же файла обновляет его mtime
+        # ещё до сохранения поста и retain — такой файл не трогаем.
+        if touched_since(name, before):
+            continue
+        # Ссылка могла появиться, пока шёл обход.
+        if name in known and not Blob.objects.filter(
+                pk=name, refs__lte=0).delete()[0]:
+            continue
+        delete_with_thumbnails(name)
+        removed.append(name)
+    return removed
@@ -0,0 +1,40 @@
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def supported_encodings():
+    """Кодировки в порядке предпочтения: brotli, если установлен, и gzip."""
+    if brotli is not None:
+        return ('br', 'gzip')
+    return ('gzip', )
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content)
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    """Сжимает поток по кускам, сбрасывая буфер после каждого."""
+    if encoding == 'br':
+        compressor = brotli.Compressor()
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(6, zlib.DEFLATED, GZIP_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
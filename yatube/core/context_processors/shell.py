@@ -0,0 +1,5 @@
+def edge_shell(request):
+    """Флаг режима общей для всех пользователей страницы."""
+    return {
+        'edge_shell': getattr(request, 'edge_shell', False),
+    }
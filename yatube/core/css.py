@@ -0,0 +1,112 @@
+import os
+import re
+
+from django.conf import settings
+
+CLASS_ATTR_RE = re.compile(r'class\s*=\s*"([^"]*)"')
+ADDCLASS_RE = re.compile(r'addclass:\s*"([^"]*)"')
+TEMPLATE_TAG_RE = re.compile(r'{%.*?%}|{{.*?}}')
+SELECTOR_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][\w-]*)')
+NESTED_AT_RULES = ('@media', '@supports')
+
+
+def used_classes(template_dirs=None):
+    """Собирает CSS-классы, которые встречаются в шаблонах проекта."""
+    classes = set(settings.STATIC_CSS_SAFELIST)
+    for template_dir in template_dirs or [settings.TEMPLATES_DIR]:
+        for root, _, files in os.walk(template_dir):
+            for filename in files:
+                if not filename.endswith('.html'):
+                    continue
+                with open(os.path.join(root, filename),
+                          encoding='utf-8') as template:
+                    source = template.read()
+                for value in (CLASS_ATTR_RE.findall(source)
+                              + ADDCLASS_RE.findall(source)):
+                    classes.update(
+                        TEMPLATE_TAG_RE.sub(' ', value).split()
+                    )
+    return classes
+
+
+def split_blocks(css):
+    """
+    Делит таблицу стилей на верхнеуровневые блоки «прелюдия{тело}»,
+    пропуская строки и комментарии.
+    """
+    blocks = []
+    depth = 0
+    start = 0
+    prelude_end = None
+    i = 0
+    while i < len(css):
+        char = css[i]
+        if css.startswith('/*', i):
+            i = css.find('*/', i + 2)
+            i = len(css) if i == -1 else i + 2
+            continue
+        if char in '"\'':
+            i = css.find(char, i + 1)
+            i = len(css) if i == -1 else i + 1
+            continue
+        if char == ';' and depth == 0:
+            blocks.append((css[start:i + 1], None))
+            start = i + 1
+        elif char == '{':
+            if depth == 0:
+                prelude_end = i
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                blocks.append((css[start:prelude_end],
+                               css[prelude_end + 1:i]))
+                start = i + 1
+        i += 1
+    return blocks
+
+
+def split_selectors(prelude):
+    selectors = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(prelude):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:i])
+            start = i + 1
+    selectors.append(prelude[start:])
+    return selectors
+
+
+def selector_is_used(selector, classes):
+    # Классы внутри :not() не требуют присутствия в разметке.
+    selector = re.sub(r':not\([^)]*\)', '', selector)
+    return all(name in classes
+               for name in SELECTOR_CLASS_RE.findall(selector))
+
+
+def prune_css(css, classes):
+    """Удаляет правила с селекторами на неиспользуемые классы."""
+    output = []
+    for prelude, body in split_blocks(css):
+        if body is None:
+            output.append(prelude)
+            continue
+        head = prelude.strip()
+        if head.startswith(NESTED_AT_RULES):
+            inner = prune_css(body, classes)
+            if inner:
+                output.append(f'{prelude}{{{inner}}}')
+            continue
+        if head.startswith('@'):
+            output.append(f'{prelude}{{{body}}}')
+            continue
+        selectors = [selector for selector in split_selectors(prelude)
+                     if selector_is_used(selector, classes)]
+        if selectors:
+            output.append(f'{",".join(selectors)}{{{body}}}')
+    return ''.join(output)
@@ -0,0 +1,74 @@
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from time import perf_counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connection
+
+# Свои потоки, чтобы зависшая проверка не держала поток запроса
+# дольше таймаута. Соединение с БД у каждого потока своё и живёт
+# между вызовами.
+executor = ThreadPoolExecutor(max_workers=6,
+                              thread_name_prefix='health')
+
+
+def check_database():
+    # После падения БД соединение потока нужно открыть заново.
+    connection.close_if_unusable_or_obsolete()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def check_cache():
+    key = f'health:{uuid.uuid4().hex}'
+    cache.set(key, 1, 10)
+    value = cache.get(key)
+    cache.delete(key)
+    if value != 1:
+        raise RuntimeError('значение не вернулось из кэша')
+
+
+def check_storage():
+    default_storage.exists('health-probe')
+
+
+CHECKS = {
+    'database': check_database,
+    'cache': check_cache,
+    'storage': check_storage,
+}
+
+
+def timed(check):
+    started = perf_counter()
+    check()
+    return perf_counter() - started
+
+
+def run_checks(checks=None, timeout=None):
+    """
+    Запускает проверки параллельно, каждую не дольше timeout секунд.
+    Возвращает (всё ли в порядке, {имя: результат}).
+    """
+    checks = checks or CHECKS
+    timeout = timeout or settings.HEALTH_CHECK_TIMEOUT
+    started = perf_counter()
+    futures = {name: executor.submit(timed, check)
+               for name, check in checks.items()}
+    results = {}
+    for name, future in futures.items():
+        remaining = max(timeout - (perf_counter() - started), 0)
+        try:
+            elapsed = future.result(timeout=remaining)
+        except FutureTimeout:
+            results[name] = {'ok': False, 'error': 'timeout',
+                             'ms': round(timeout * 1000, 1)}
+        except Exception as error:
+            results[name] = {'ok': False, 'error': repr(error)}
+        else:
+            results[name] = {'ok': True, 'ms': round(elapsed * 1000, 1)}
+    return all(result['ok'] for result in results.values()), results
@@ -0,0 +1,272 @@
+import asyncio
+import random
+import re
+import uuid
+from collections import defaultdict
+from http.cookies import SimpleCookie
+from time import perf_counter
+from urllib.parse import urlencode, urlsplit
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C\x0A\x00\x3B'
+)
+CSRF_RE = re.compile(rb'name="csrfmiddlewaretoken" value="([^"]+)"')
+POST_RE = re.compile(rb'/posts/(\d+)/')
+PROFILE_RE = re.compile(rb'href="/profile/([^/"]+)/"')
+
+DEFAULT_MIX = {
+    'index': 40,
+    'post_detail': 25,
+    'profile': 15,
+    'add_comment': 8,
+    'profile_follow': 7,
+    'post_create': 5,
+}
+AUTH_ONLY = {'add_comment', 'profile_follow', 'post_create'}
+
+
+class Response:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class Session:
+    """Минимальный асинхронный HTTP/1.1-клиент с cookie на один поток."""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.ssl = parts.scheme == 'https'
+        self.timeout = timeout
+        self.cookies = {}
+
+    async def request(self, method, path, data=None, files=None):
+        headers = {
+            'Host': f'{self.host}:{self.port}',
+            'Connection': 'close',
+            'Referer': f'http{"s" if self.ssl else ""}://'
+                       f'{self.host}:{self.port}{path}',
+        }
+        body = b''
+        if files:
+            boundary = uuid.uuid4().hex
+            body = multipart(boundary, data or {}, files)
+            headers['Content-Type'] = (f'multipart/form-data; '
+                                       f'boundary={boundary}')
+        elif data is not None:
+            body = urlencode(data).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if body:
+            headers['Content-Length'] = str(len(body))
+        if self.cookies:
+            headers['Cookie'] = '; '.join(
+                f'{key}={value}' for key, value in self.cookies.items())
+        head = f'{method} {path} HTTP/1.1\r\n' + ''.join(
+            f'{key}: {value}\r\n' for key, value in headers.items())
+        return await asyncio.wait_for(
+            self.exchange(head.encode() + b'\r\n' + body), self.timeout)
+
+    async def exchange(self, payload):
+        reader, writer = await asyncio.open_connection(
+            self.host, self.port, ssl=self.ssl or None)
+        try:
+            writer.write(payload)
+            await writer.drain()
+            raw = await reader.read()
+        finally:
+            writer.close()
+        head, _, body = raw.partition(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split()[1])
+        headers = defaultdict(list)
+        for line in lines[1:]:
+            key, _, value = line.partition(':')
+            headers[key.strip().lower()].append(value.strip())
+        for cookie in headers.get('set-cookie', ()):
+            for key, morsel in SimpleCookie(cookie).items():
+                self.cookies[key] = morsel.value
+        if 'chunked' in headers.get('transfer-encoding', ()):
+            body = dechunk(body)
+        return Response(status, headers, body)
+
+
+def dechunk(body):
+    result = b''
+    while body:
+        size_line, _, body = body.partition(b'\r\n')
+        size = int(size_line.split(b';')[0], 16)
+        if not size:
+            break
+        result += body[:size]
+        body = body[size + 2:]
+    return result
+
+
+def multipart(boundary, data, files):
+    parts = []
+    for key, value in data.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; '
+            f'name="{key}"\r\n\r\n{value}\r\n'.encode())
+    for key, (filename, content, content_type) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; '
+            f'name="{key}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'.encode()
+            + content + b'\r\n')
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts)
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name, started, ok):
+        self.latencies[name].append((perf_counter() - started) * 1000)
+        if not ok:
+            self.errors[name] += 1
+
+    def report(self, elapsed):
+        rows = []
+        for name, latencies in sorted(self.latencies.items()):
+            latencies.sort()
+            rows.append({
+                'name': name,
+                'requests': len(latencies),
+                'rps': len(latencies) / elapsed,
+                'errors': self.errors[name] / len(latencies),
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+            })
+        return rows
+
+
+def percentile(values, percent):
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+class VirtualUser:
+    """Один посетитель: случайно выбирает действия согласно смеси."""
+
+    def __init__(self, base_url, mix, stats, credentials, timeout, rng):
+        self.session = Session(base_url, timeout)
+        self.mix = {name: weight for name, weight in mix.items()
+                    if credentials or name not in AUTH_ONLY}
+        self.stats = stats
+        self.credentials = credentials
+        self.rng = rng
+        self.post_ids = []
+        self.usernames = []
+
+    async def call(self, name, method, path, ok_statuses=(200, ),
+                   **kwargs):
+        started = perf_counter()
+        try:
+            response = await self.session.request(method, path, **kwargs)
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            self.stats.record(name, started, False)
+            return None
+        self.stats.record(name, started, response.status in ok_statuses)
+        self.post_ids.extend(POST_RE.findall(response.body)[:20])
+        self.usernames.extend(PROFILE_RE.findall(response.body)[:20])
+        del self.post_ids[:-100], self.usernames[:-100]
+        return response
+
+    async def csrf_token(self, name, path):
+        """
+        Токен со страницы формы. Её GET пишется в статистику отдельно
+        (<name>_form), чтобы не смешиваться с самой отправкой формы.
+        """
+        response = await self.call(f'{name}_form', 'GET', path)
+        if response is None:
+            return None
+        match = CSRF_RE.search(response.body)
+        return match.group(1).decode() if match else None
+
+    async def login(self):
+        username, password = self.credentials
+        token = await self.csrf_token('login', '/auth/login/')
+        await self.call('login', 'POST', '/auth/login/', (302, ), data={
+            'csrfmiddlewaretoken': token,
+            'username': username,
+            'password': password,
+        })
+
+    async def index(self):
+        await self.call('index', 'GET',
+                        f'/?page={self.rng.randint(1, 5)}')
+
+    async def post_detail(self):
+        if self.post_ids:
+            post_id = self.rng.choice(self.post_ids).decode()
+            await self.call('post_detail', 'GET', f'/posts/{post_id}/')
+
+    async def profile(self):
+        if self.usernames:
+            username = self.rng.choice(self.usernames).decode()
+            await self.call('profile', 'GET', f'/profile/{username}/')
+
+    async def add_comment(self):
+        if not self.post_ids:
+            return
+        post_id = self.rng.choice(self.post_ids).decode()
+        token = await self.csrf_token('add_comment', f'/posts/{post_id}/')
+        await self.call('add_comment', 'POST',
+                        f'/posts/{post_id}/comment/', (302, ), data={
+                            'csrfmiddlewaretoken': token,
+                            'text': 'Комментарий нагрузочного теста',
+                        })
+
+    async def profile_follow(self):
+        if self.usernames:
+            username = self.rng.choice(self.usernames).decode()
+            await self.call('profile_follow', 'GET',
+                            f'/profile/{username}/follow/', (302, ))
+
+    async def post_create(self):
+        token = await self.csrf_token('post_create', '/create/')
+        await self.call('post_create', 'POST', '/create/', (302, ), data={
+            'csrfmiddlewaretoken': token,
+            'text': 'Пост нагрузочного теста',
+        }, files={'image': ('load.gif', SMALL_GIF, 'image/gif')})
+
+    async def run(self, deadline, think_time):
+        if self.credentials:
+            await self.login()
+        names, weights = zip(*self.mix.items())
+        # Свежие посты для post_detail и комментариев берём из RSS.
+        await self.call('feed', 'GET', '/feed/rss/')
+        await self.index()
+        while perf_counter() < deadline:
+            action = self.rng.choices(names, weights)[0]
+            await getattr(self, action)()
+            if think_time:
+                await asyncio.sleep(self.rng.uniform(0, think_time))
+
+
+async def run_load(base_url, concurrency, duration, mix, credentials,
+                   logged_in_share, timeout=10, think_time=0, seed=None):
+    """Запускает concurrency посетителей на duration секунд."""
+    rng = random.Random(seed)
+    stats = Stats()
+    deadline = perf_counter() + duration
+    users = []
+    for number in range(concurrency):
+        logged_in = credentials and rng.random() < logged_in_share
+        users.append(VirtualUser(
+            base_url, mix, stats,
+            credentials[number % len(credentials)] if logged_in else None,
+            timeout, random.Random(rng.random()),
+        ))
+    started = perf_counter()
+    await asyncio.gather(*(user.run(deadline, think_time) for user in users))
+    return stats.report(perf_counter() - started)
@@ -0,0 +1,118 @@
+from datetime import timedelta
+from email import message_from_bytes, policy
+from email.message import EmailMessage as PolicyMessage
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import MIMEMixin
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Складывает письма в таблицу очереди вместо отправки во время
+    запроса. Доставляет их команда send_queued_mail.
+    """
+
+    def send_messages(self, email_messages):
+        queued = [
+            QueuedEmail(
+                from_email=message.from_email,
+                recipients=message.recipients(),
+                message=message.message().as_bytes(),
+            )
+            for message in email_messages
+            if message.recipients()
+        ]
+        QueuedEmail.objects.bulk_create(queued)
+        return len(queued)
+
+
+class StoredMIMEMessage(MIMEMixin, PolicyMessage):
+    """
+    Разобранное письмо с as_bytes(linesep=...) как у SafeMIMEText:
+    так его вызывает SMTP-бэкенд Django.
+    """
+
+
+class StoredEmailMessage(EmailMessage):
+    """Письмо, собранное заранее и восстановленное из очереди."""
+
+    def __init__(self, queued):
+        super().__init__(from_email=queued.from_email, to=queued.recipients)
+        self.raw_message = bytes(queued.message)
+
+    def message(self):
+        return message_from_bytes(self.raw_message, StoredMIMEMessage,
+                                  policy=policy.SMTP)
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.MAIL_QUEUE_RETRY_DELAY
+                     * 2 ** (attempts - 1))
+
+
+def claim(queued):
+    """
+    Забирает письмо себе, чтобы параллельный воркер его не отправил.
+    next_attempt на время отправки — срок, после которого письмо
+    упавшего воркера вернётся в очередь.
+    """
+    return QueuedEmail.objects.filter(
+        pk=queued.pk, status=QueuedEmail.QUEUED
+    ).update(status=QueuedEmail.SENDING,
+             next_attempt=timezone.now() + timedelta(
+                 seconds=settings.MAIL_QUEUE_SENDING_TIMEOUT))
+
+
+def requeue_stale():
+    """Возвращает в очередь письма, зависшие в SENDING."""
+    return QueuedEmail.objects.filter(
+        status=QueuedEmail.SENDING, next_attempt__lte=timezone.now()
+    ).update(status=QueuedEmail.QUEUED)
+
+
+def deliver_queued(batch_size=None):
+    """
+    Отправляет пачку созревших писем одним соединением
+    с настоящим бэкендом. Возвращает число отправленных.
+    """
+    batch_size = batch_size or settings.MAIL_QUEUE_BATCH
+    requeue_stale()
+    batch = [
+        queued for queued in QueuedEmail.objects.filter(
+            status=QueuedEmail.QUEUED, next_attempt__lte=timezone.now()
+        )[:batch_size]
+        if claim(queued)
+    ]
+    if not batch:
+        return 0
+    sent = 0
+    connection = get_connection(settings.MAIL_QUEUE_BACKEND)
+    try:
+        for queued in batch:
+            queued.attempts += 1
+            try:
+                connection.send_messages([StoredEmailMessage(queued)])
+            except Exception as error:
+                queued.last_error = repr(error)
+                queued.status = (
+                    QueuedEmail.FAILED
+                    if queued.attempts >= settings.MAIL_QUEUE_MAX_ATTEMPTS
+                    else QueuedEmail.QUEUED
+                )
+                queued.next_attempt = (timezone.now()
+                                       + retry_delay(queued.attempts))
+            else:
+                queued.status = QueuedEmail.SENT
+                queued.sent_at = timezone.now()
+                sent += 1
+    finally:
+        connection.close()
+    QueuedEmail.objects.bulk_update(batch, (
+        'status', 'attempts', 'last_error', 'next_attempt', 'sent_at',
+    ))
+    return sent
@@ -0,0 +1,97 @@
+from statistics import mean
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'django.contrib.sessions.backends.signed_cookies',
+    'core.sessions',
+)
+URL_NAMES = ('posts:index', 'posts:follow_index', 'posts:post_create')
+# Кэш замера по умолчанию: свой, в памяти процесса.
+BENCH_CACHE = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'bench_sessions',
+}
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает движки сессий: запросы к БД и время '
+            'на один запрос авторизованного пользователя.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--engine', action='append', dest='engines')
+        parser.add_argument(
+            '--cache', dest='cache_alias',
+            help='Алиас из CACHES, выделенный под замер: он станет '
+                 'default и будет очищаться перед каждым движком. '
+                 'Без него — свой LocMemCache.',
+        )
+
+    def handle(self, *args, **options):
+        bench_cache = BENCH_CACHE
+        if options['cache_alias']:
+            if options['cache_alias'] not in settings.CACHES:
+                raise CommandError(
+                    f'Нет кэша {options["cache_alias"]} в CACHES')
+            bench_cache = settings.CACHES[options['cache_alias']]
+        # Общий кэш сайта не трогаем: в нём сессии и страницы.
+        with override_settings(CACHES={**settings.CACHES,
+                                       'default': bench_cache}):
+            self.run(options)
+
+    def run(self, options):
+        self.stdout.write(f'{"engine":<50}{"queries":>9}'
+                          f'{"session":>9}{"ms":>9}')
+        for engine in options['engines'] or ENGINES:
+            try:
+                with transaction.atomic():
+                    queries, session, latency = self.measure(
+                        engine, options['requests'])
+                    raise Rollback
+            except Rollback:
+                pass
+            self.stdout.write(f'{engine:<50}{queries:>9.2f}'
+                              f'{session:>9.2f}{latency:>9.2f}')
+
+    def measure(self, engine, requests):
+        """Средние на запрос: все запросы, запросы к сессиям, мс."""
+        cache.clear()
+        with override_settings(SESSION_ENGINE=engine,
+                               DEBUG_TOOLBAR_CONFIG={
+                                   'SHOW_TOOLBAR_CALLBACK': lambda r: False
+                               }):
+            user = User.objects.create_user(username='bench_sessions')
+            client = Client()
+            client.force_login(user)
+            urls = [reverse(name) for name in URL_NAMES]
+            client.get(urls[0])
+            queries, session_queries, timings = [], [], []
+            for i in range(requests):
+                url = urls[i % len(urls)]
+                with CaptureQueriesContext(connection) as context:
+                    started = perf_counter()
+                    client.get(url)
+                    timings.append((perf_counter() - started) * 1000)
+                queries.append(len(context))
+                session_queries.append(sum(
+                    'django_session' in query['sql']
+                    for query in context.captured_queries
+                ))
+        return mean(queries), mean(session_queries), mean(timings)
@@ -0,0 +1,62 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.loadtest import DEFAULT_MIX, run_load
+
+
+def parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in DEFAULT_MIX:
+            raise CommandError(f'Неизвестное действие: {name}')
+        mix[name] = float(weight)
+    return mix
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест запущенного экземпляра Yatube: смесь '
+            'анонимного и авторизованного трафика на asyncio.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('base_url', help='Например, http://127.0.0.1:8000')
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--duration', type=float, default=30)
+        parser.add_argument(
+            '--mix', type=parse_mix, default=DEFAULT_MIX,
+            help='Веса действий: index=40,post_detail=25,profile=15,'
+                 'add_comment=8,profile_follow=7,post_create=5',
+        )
+        parser.add_argument('--login', action='append', default=[],
+                            metavar='USERNAME:PASSWORD',
+                            help='Учётные записи для авторизованного '
+                                 'трафика, можно несколько')
+        parser.add_argument('--logged-in-share', type=float, default=0.3)
+        parser.add_argument('--think-time', type=float, default=0)
+        parser.add_argument('--timeout', type=float, default=10)
+        parser.add_argument('--seed', type=int)
+
+    def handle(self, *args, **options):
+        credentials = [tuple(item.split(':', 1))
+                       for item in options['login']]
+        rows = asyncio.run(run_load(
+            options['base_url'].rstrip('/'),
+            options['concurrency'],
+            options['duration'],
+            options['mix'],
+            credentials,
+            options['logged_in_share'],
+            timeout=options['timeout'],
+            think_time=options['think_time'],
+            seed=options['seed'],
+        ))
+        self.stdout.write(f'{"url name":<16}{"requests":>9}{"rps":>9}'
+                          f'{"errors":>8}{"p50 ms":>9}{"p95 ms":>9}'
+                          f'{"p99 ms":>9}')
+        for row in rows:
+            self.stdout.write(
+                f'{row["name"]:<16}{row["requests"]:>9}{row["rps"]:>9.1f}'
+                f'{row["errors"]:>8.1%}{row["p50"]:>9.1f}'
+                f'{row["p95"]:>9.1f}{row["p99"]:>9.1f}'
+            )
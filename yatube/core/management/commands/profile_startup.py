@@ -0,0 +1,49 @@
+import subprocess
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import parse_importtime, profile_startup
+
+
+class Command(BaseCommand):
+    help = ('Замеряет холодный старт: django.setup(), первый запрос '
+            'и время импорта по пакетам.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/')
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--depth', type=int, default=1,
+                            help='Сколько уровней имени модуля учитывать.')
+        parser.add_argument('--env', action='append', default=[],
+                            metavar='NAME=VALUE',
+                            help='Переменные окружения профиля, '
+                                 'например DEV_TOOLS=0.')
+
+    def handle(self, *args, **options):
+        env = {}
+        for item in options['env']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'Ожидалось NAME=VALUE: {item}')
+            env[name] = value
+        try:
+            timings, stderr = profile_startup(options['path'], env)
+        except subprocess.CalledProcessError as error:
+            traceback = [line for line in error.stderr.splitlines()
+                         if not line.startswith('import time:')]
+            raise CommandError('\n'.join(traceback)) from error
+
+        self.stdout.write(
+            f'django.setup(): {timings["setup"] * 1000:.0f} мс\n'
+            f'первый запрос {options["path"]} '
+            f'({timings["status"]}): '
+            f'{timings["first_request"] * 1000:.0f} мс\n'
+            f'модулей загружено: {timings["modules"]}\n'
+        )
+        packages = parse_importtime(stderr, options['depth'])
+        total = sum(us for _, us in packages) or 1
+        self.stdout.write(f'{"package":<40}{"ms":>9}{"share":>8}')
+        for package, us in packages[:options['top']]:
+            self.stdout.write(
+                f'{package:<40}{us / 1000:>9.1f}{us / total:>8.1%}'
+            )
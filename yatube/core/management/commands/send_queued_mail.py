@@ -0,0 +1,27 @@
+from time import sleep
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.mail import deliver_queued
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди пачками. С --loop работает '
+            'как фоновый воркер.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            default=settings.MAIL_QUEUE_BATCH)
+        parser.add_argument('--loop', action='store_true')
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            sent = deliver_queued(options['batch_size'])
+            if sent:
+                self.stdout.write(f'Отправлено писем: {sent}.')
+            if not options['loop']:
+                return
+            if sent < options['batch_size']:
+                sleep(options['interval'])
@@ -0,0 +1,68 @@
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class Unsatisfiable(ValueError):
+    """Диапазон целиком за концом файла — ответ 416."""
+
+
+def parse_range(header, size):
+    """
+    Один диапазон из заголовка Range: (начало, конец включительно) или
+    None, если заголовок стоит проигнорировать и отдать файл целиком
+    (нет заголовка, несколько диапазонов, синтаксическая ошибка).
+    """
+    match = RANGE_RE.match((header or '').replace(' ', ''))
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        # bytes=-500 — последние 500 байт.
+        length = int(last)
+        if length == 0:
+            raise Unsatisfiable(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start > end:
+        if last and int(last) < start:
+            return None
+        raise Unsatisfiable(header)
+    return start, end
+
+
+def read_range(file, start, length, block_size=64 * 1024):
+    """Куски файла от start длиной length; файл закрывается в конце."""
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(block_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def is_immutable(path):
+    """Имена, которые меняются вместе с содержимым: можно кэшировать вечно."""
+    return any(re.match(pattern, path)
+               for pattern in settings.MEDIA_IMMUTABLE_PATTERNS)
+
+
+def offload_headers(path, full_path):
+    """
+    Заголовки, которые передают отдачу файла веб-серверу перед
+    приложением: nginx (X-Accel-Redirect) или Apache/lighttpd (X-Sendfile).
+    """
+    if settings.MEDIA_SENDFILE == 'x-accel':
+        location = settings.MEDIA_ACCEL_PREFIX + quote(path)
+        return {'X-Accel-Redirect': location}
+    if settings.MEDIA_SENDFILE == 'x-sendfile':
+        return {'X-Sendfile': full_path}
+    return None
@@ -0,0 +1,132 @@
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+from .compression import compress, compress_stream, supported_encodings
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/rss+xml',
+    'application/atom+xml',
+    'image/svg+xml',
+)
+MIN_SIZE = 200
+
+
+# Как в GZipMiddleware Django: случайная длина заголовка gzip мешает
+# атаке BREACH подбирать секреты персональных страниц по размеру.
+MAX_RANDOM_BYTES = 100
+
+
+def accepted_encodings(request):
+    """{кодировка: q} из Accept-Encoding; q=0 означает запрет."""
+    accepted = {}
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        encoding, _, params = item.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if encoding.strip():
+            accepted[encoding.strip().lower()] = quality
+    return accepted
+
+
+def negotiate(request, encodings=None):
+    """
+    Лучшая из поддерживаемых кодировок по q-значениям клиента,
+    при равных — в порядке нашего предпочтения.
+    """
+    accepted = accepted_encodings(request)
+    best, best_quality = None, 0
+    for encoding in encodings or supported_encodings():
+        quality = accepted.get(encoding, accepted.get('*', 0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_shared(request, response):
+    """
+    Одинаково ли тело для всех: без CSRF-токена, новых cookies
+    и сессии, либо помечено public. Такие тела сжимаются без
+    случайной добавки и кэшируются.
+    """
+    if (request.META.get('CSRF_COOKIE_NEEDS_UPDATE') or response.cookies
+            or 'private' in response.get('Cache-Control', '')):
+        return False
+    return ('public' in response.get('Cache-Control', '')
+            or settings.SESSION_COOKIE_NAME not in request.COOKIES)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Сжатие ответов brotli или gzip. Потоковые ответы сжимаются
+    по кускам. Общие для всех тела кэшируются по хешу содержимого,
+    чтобы популярные страницы сжимались один раз; персональные
+    сжимаются только gzip со случайной длиной заголовка.
+    """
+
+    def process_response(self, request, response):
+        if (response.has_header('Content-Encoding')
+                or response.status_code == 206):
+            return response
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding', ))
+        shared = is_shared(request, response)
+        encoding = negotiate(request, None if shared else ('gzip', ))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                return response
+            response.streaming_content = (
+                compress_stream(response.streaming_content, encoding)
+                if shared else
+                compress_sequence(response.streaming_content,
+                                  max_random_bytes=MAX_RANDOM_BYTES)
+            )
+            del response.headers['Content-Length']
+        else:
+            if len(response.content) < MIN_SIZE:
+                return response
+            compressed = (
+                self.compressed_body(response.content, encoding)
+                if shared else
+                compress_string(response.content,
+                                max_random_bytes=MAX_RANDOM_BYTES)
+            )
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def compressed_body(self, content, encoding):
+        if len(content) > settings.COMPRESSION_CACHE_MAX_SIZE:
+            return compress(content, encoding)
+        key = f'compressed:{encoding}:{md5(content).hexdigest()}'
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = compress(content, encoding)
+            cache.set(key, compressed, settings.COMPRESSION_CACHE_TIMEOUT)
+        return compressed
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.1 on 2026-10-19 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('name', models.CharField(max_length=255, primary_key=True, serialize=False, verbose_name='Файл')),
+                ('refs', models.IntegerField(default=0, verbose_name='Ссылок')),
+                ('released', models.DateTimeField(blank=True, null=True, verbose_name='Последняя ссылка снята')),
+            ],
+            options={
+                'verbose_name': 'Файл медиа',
+                'verbose_name_plural': 'Файлы медиа',
+                'indexes': [models.Index(fields=['refs', 'released'], name='blob_refs')],
+            },
+        ),
+    ]
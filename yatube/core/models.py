@@ -0,0 +1,57 @@
+from django.db import models
+from django.utils import timezone
+
+
+class QueuedEmail(models.Model):
+    QUEUED = 'queued'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Ошибка'),
+    )
+
+    from_email = models.CharField('Отправитель', max_length=254)
+    recipients = models.JSONField('Получатели')
+    message = models.BinaryField('Письмо (MIME)')
+    status = models.CharField('Статус', max_length=10, choices=STATUSES,
+                              default=QUEUED)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    next_attempt = models.DateTimeField('Следующая попытка',
+                                        default=timezone.now)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        ordering = ('id', )
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+        indexes = [
+            models.Index(fields=('status', 'next_attempt'),
+                         name='queued_email_due'),
+        ]
+
+    def __str__(self):
+        return f'{self.from_email} -> {", ".join(self.recipients)}'
+
+
+class Blob(models.Model):
+    """Файл в хранилище по содержимому и число ссылок на него."""
+    name = models.CharField('Файл', max_length=255, primary_key=True)
+    refs = models.IntegerField('Ссылок', default=0)
+    released = models.DateTimeField('Последняя ссылка снята', null=True,
+                                    blank=True)
+
+    class Meta:
+        verbose_name = 'Файл медиа'
+        verbose_name_plural = 'Файлы медиа'
+        indexes = [
+            models.Index(fields=('refs', 'released'), name='blob_refs'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.refs})'
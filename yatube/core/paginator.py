@@ -0,0 +1,40 @@
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Min
+from django.utils.functional import cached_property
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для огромных таблиц: без фильтров вместо COUNT(*)
+    берёт оценку из статистики PostgreSQL или разброс первичного
+    ключа, который читается по индексу. Для списка поверх нескольких
+    баз (атрибут querysets) оценки складываются.
+    """
+
+    @cached_property
+    def count(self):
+        querysets = getattr(self.object_list, 'querysets',
+                            [self.object_list])
+        return sum(map(self.estimate, querysets))
+
+    def estimate(self, queryset):
+        if queryset.query.where:
+            return queryset.count()
+        model = queryset.model
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples FROM pg_class WHERE relname = %s',
+                    [model._meta.db_table],
+                )
+                row = cursor.fetchone()
+            if row and row[0] > 0:
+                return int(row[0])
+        bounds = model._default_manager.using(queryset.db).aggregate(
+            low=Min('pk'), high=Max('pk')
+        )
+        if bounds['high'] is None:
+            return 0
+        return bounds['high'] - bounds['low'] + 1
@@ -0,0 +1,18 @@
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Тесты не зависят от SHARDS окружения: база у них одна, default,
+    а тесты шардирования включают шарды сами через override_settings.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.unsharded = override_settings(SHARDS=[], RETIRED_SHARDS=[])
+        self.unsharded.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.unsharded.disable()
+        super().teardown_test_environment(**kwargs)
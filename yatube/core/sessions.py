@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import (
+    SessionStore as CachedDBStore
+)
+
+from tasks.queue import enqueue
+
+KEY_PREFIX = 'core.sessions'
+
+
+class SessionStore(CachedDBStore):
+    """
+    Сессии в общем кэше с отложенной записью в БД: чтение идёт из кэша,
+    а изменения попадают в таблицу сессий не чаще одного раза
+    за SESSION_WRITE_BEHIND_INTERVAL секунд. Новая сессия (вход)
+    пишется в БД сразу, чтобы её видели все воркеры. Отложенные
+    изменения сбрасывает в БД фоновая задача flush_session.
+    """
+    cache_key_prefix = KEY_PREFIX
+
+    @property
+    def flush_key(self):
+        return f'{self.cache_key}:flushed'
+
+    @property
+    def pending_key(self):
+        return f'{self.cache_key}:pending'
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        interval = settings.SESSION_WRITE_BEHIND_INTERVAL
+        if must_create:
+            super().save(must_create=True)
+            self._cache.set(self.flush_key, True, interval)
+        elif self._cache.add(self.flush_key, True, interval):
+            super().save()
+        else:
+            self._cache.set(self.cache_key, self._session,
+                            self.get_expiry_age())
+            # Одна задача на интервал: последние изменения окна
+            # не пропадут при вытеснении из кэша или перезапуске.
+            if self._cache.add(self.pending_key, True, interval * 2):
+                enqueue('core.tasks.flush_session',
+                        {'session_key': self.session_key},
+                        dedup_key=f'{KEY_PREFIX}:{self.session_key}',
+                        delay=timedelta(seconds=interval))
+
+    def flush_pending(self):
+        """Пишет в БД состояние сессии из кэша, если оно ещё там."""
+        self._cache.delete(self.pending_key)
+        data = self._cache.get(self.cache_key)
+        if data is None:
+            return False
+        self._session_cache = data
+        CachedDBStore.save(self)
+        return True
+
+    def delete(self, session_key=None):
+        session_key = session_key or self.session_key
+        super().delete(session_key)
+        if session_key is not None:
+            for suffix in ('flushed', 'pending'):
+                self._cache.delete(
+                    f'{self.cache_key_prefix}{session_key}:{suffix}')
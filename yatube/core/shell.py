@@ -0,0 +1,56 @@
+from functools import wraps
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+
+# Имя «дырки» -> (шаблон, функция контекста(request, arg, page)).
+HOLES = {}
+
+
+def register_hole(name, template, context=None):
+    """
+    Регистрирует зависящий от пользователя кусок страницы. В режиме
+    EDGE_SHELL вместо него в страницу попадает заглушка, а сам кусок
+    браузер забирает отдельным запросом к core:holes.
+    """
+    HOLES[name] = (template, context or (lambda request, arg, page: {}))
+
+
+def hole_key(name, arg=''):
+    return f'{name}:{arg}' if arg != '' else name
+
+
+def render_hole(request, key, page=None):
+    """HTML куска по ключу «имя:аргумент» или None для неизвестного."""
+    name, _, arg = key.partition(':')
+    if name not in HOLES:
+        return None
+    template, get_context = HOLES[name]
+    context = get_context(request, arg, page or {})
+    if context is None:
+        return ''
+    return render_to_string(template, context, request=request)
+
+
+def edge_shell(view):
+    """
+    Страница без данных пользователя, которую можно отдать из общего
+    кэша: представление смотрит на request.edge_shell, а ответ получает
+    Cache-Control: public, если сессия так и не понадобилась.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.edge_shell = (settings.EDGE_SHELL
+                              and request.method in ('GET', 'HEAD'))
+        response = view(request, *args, **kwargs)
+        session = getattr(request, 'session', None)
+        if (request.edge_shell and response.status_code == 200
+                and not (session and session.accessed)):
+            patch_cache_control(response, public=True,
+                                max_age=settings.EDGE_SHELL_MAX_AGE)
+        return response
+    return wrapper
+
+
+register_hole('nav', 'includes/nav.html')
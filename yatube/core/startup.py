@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+# Выполняется в отдельном интерпретаторе, чтобы модули ещё не были
+# импортированы и -X importtime видел холодный старт.
+PROBE = '''
+import json, os, sys
+from time import perf_counter
+started = perf_counter()
+import django
+django.setup()
+setup = perf_counter() - started
+from django.test import Client
+started = perf_counter()
+response = Client().get(sys.argv[1])
+first_request = perf_counter() - started
+print(json.dumps({
+    'setup': setup,
+    'first_request': first_request,
+    'status': response.status_code,
+    'modules': len(sys.modules),
+}))
+'''
+
+
+def parse_importtime(stderr, depth=1):
+    """
+    Суммирует собственное время импорта из вывода -X importtime
+    по пакетам, обрезанным до depth уровней имени.
+    """
+    totals = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, _, name = line[len('import time:'):].split('|')
+        package = '.'.join(name.strip().split('.')[:depth])
+        totals[package] += int(self_time)
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def profile_startup(path='/', env=None):
+    """Замеряет django.setup() и первый запрос в свежем процессе."""
+    child_env = {**os.environ, **(env or {})}
+    child_env.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE, path],
+        capture_output=True, text=True, env=child_env, check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return timings, result.stderr
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import cached_property
+
+from .compression import compress, supported_encodings
+from .css import prune_css, used_classes
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.ico', '.txt', '.html', '.xml', '.json',
+)
+EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Статика с хешем содержимого в имени, заранее сжатыми копиями
+    .gz/.br и необязательной чисткой неиспользуемых CSS-правил.
+    """
+    # Карты исходников Bootstrap в репозиторий не входят, поэтому
+    # ссылки sourceMappingURL оставляем как есть.
+    patterns = tuple(
+        (extension, tuple(
+            pattern for pattern in extension_patterns
+            if 'sourceMappingURL' not in str(pattern)
+        ))
+        for extension, extension_patterns
+        in ManifestStaticFilesStorage.patterns
+    )
+
+    @cached_property
+    def immutable_names(self):
+        """Имена с хешем из манифеста: проверка на запрос без перебора."""
+        return frozenset(self.hashed_files.values())
+
+    def _save(self, name, content):
+        if name in settings.STATIC_PRUNE_CSS:
+            css = content.read().decode('utf-8')
+            content = ContentFile(
+                prune_css(css, used_classes()).encode('utf-8')
+            )
+        return super()._save(name, content)
+
+    def post_process(self, paths, dry_run=False, **options):
+        # Хеш считается по исходнику из finders, а урезанный CSS лежит
+        # уже здесь, в STATIC_ROOT.
+        paths = {
+            name: (self, name) if name in settings.STATIC_PRUNE_CSS
+            else source
+            for name, source in paths.items()
+        }
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for hashed_name in set(self.hashed_files.values()):
+            if not hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(hashed_name) as original:
+                content = original.read()
+            for encoding in supported_encodings():
+                compressed = compress(content, encoding)
+                if len(compressed) >= len(content):
+                    continue
+                compressed_name = hashed_name + EXTENSIONS[encoding]
+                if self.exists(compressed_name):
+                    self.delete(compressed_name)
+                self._save(compressed_name, ContentFile(compressed))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Медиа по содержимому: загрузка хешируется по мере записи и хранится
+    один раз как <каталог>/<xx>/<sha256><расширение>. Повторная загрузка
+    той же картинки получает то же имя, а значит, и готовые миниатюры.
+    Ссылки на файлы считает core.blobs.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Одинаковое имя — одинаковое содержимое, перезаписи не бывает.
+        return name
+
+    def _save(self, name, content):
+        directory, basename = posixpath.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        temp_dir = self.path(directory)
+        os.makedirs(temp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=temp_dir, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp.write(chunk)
+            hexdigest = digest.hexdigest()
+            name = posixpath.join(directory, hexdigest[:2],
+                                  hexdigest + extension)
+            path = self.path(name)
+            if os.path.exists(path):
+                os.remove(temp_path)
+                # Свежая дата защищает дубликат от core.blobs.collect,
+                # пока пост с ним не сохранён и не взял ссылку.
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return name
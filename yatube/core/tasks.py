@@ -0,0 +1,16 @@
+from datetime import timedelta
+
+from tasks.queue import task
+
+from .mail import deliver_queued
+from .sessions import SessionStore
+
+
+@task(every=timedelta(minutes=1))
+def deliver_queued_mail():
+    deliver_queued()
+
+
+@task
+def flush_session(session_key):
+    SessionStore(session_key).flush_pending()
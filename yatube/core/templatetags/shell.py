@@ -0,0 +1,16 @@
+from django import template
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from ..shell import hole_key, render_hole
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def hole(context, name, arg=''):
+    """Кусок страницы, зависящий от пользователя, или заглушка для него."""
+    key = hole_key(name, arg)
+    if context.get('edge_shell'):
+        return format_html('<div data-hole="{}"></div>', key)
+    return mark_safe(render_hole(context.request, key, context.flatten()))
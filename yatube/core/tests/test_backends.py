@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..backends import user_cache_key
+
+User = get_user_model()
+# Сессия без запросов к БД: считаются только запросы за пользователем.
+SIGNED_COOKIES = 'django.contrib.sessions.backends.signed_cookies'
+CACHED_BACKEND = 'core.backends.CachedModelBackend'
+
+
+@override_settings(SESSION_ENGINE=SIGNED_COOKIES,
+                   AUTHENTICATION_BACKENDS=[CACHED_BACKEND])
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader',
+                                            password='secret-pass-1')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def user_queries(self, url):
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+            self.assertEqual(response.wsgi_request.user, self.user)
+            return response
+
+    def test_user_loaded_from_cache(self):
+        """Повторный запрос не обращается к таблице пользователей."""
+        self.user_queries(reverse('about:author'))
+
+    def test_cache_dropped_on_password_change(self):
+        """Смена пароля сбрасывает кэш и завершает старые сессии."""
+        self.client.get(reverse('about:author'))
+        self.user.set_password('another-pass-2')
+        self.user.save()
+        response = self.client.get(reverse('about:author'))
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_password_change_keeps_session(self):
+        """После смены пароля через форму сессия остаётся живой."""
+        self.client.get(reverse('about:author'))
+        response = self.client.post(reverse('password_change'), {
+            'old_password': 'secret-pass-1',
+            'new_password1': 'another-pass-2',
+            'new_password2': 'another-pass-2',
+        })
+        self.assertEqual(response.status_code, 302)
+        response = self.client.get(reverse('about:author'))
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+        self.assertEqual(
+            cache.get(user_cache_key(self.user.pk))['password'],
+            User.objects.get(pk=self.user.pk).password)
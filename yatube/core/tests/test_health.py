@@ -0,0 +1,44 @@
+from time import sleep
+from unittest import mock
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import health
+
+
+class HealthTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+
+    def test_live(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('core:live'))
+        self.assertEqual(response.json(), {'status': 'ok'})
+
+    def test_ready_reports_latencies(self):
+        response = self.client.get(reverse('core:ready'))
+        self.assertEqual(response.status_code, 200)
+        checks = response.json()['checks']
+        self.assertEqual(set(checks), {'database', 'cache', 'storage'})
+        self.assertTrue(all(check['ok'] and 'ms' in check
+                            for check in checks.values()))
+
+    def test_slow_dependency_times_out(self):
+        """Зависшая проверка не держит ответ дольше таймаута."""
+        checks = {**health.CHECKS, 'cache': lambda: sleep(0.5)}
+        with mock.patch.dict(health.CHECKS, checks), \
+                self.settings(HEALTH_CHECK_TIMEOUT=0.1):
+            response = self.client.get(reverse('core:ready'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['checks']['cache']['error'],
+                         'timeout')
+
+    def test_failing_dependency(self):
+        def broken():
+            raise OSError('диск отвалился')
+
+        with mock.patch.dict(health.CHECKS, {'storage': broken}):
+            response = self.client.get(reverse('core:ready'))
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(response.json()['checks']['storage']['ok'])
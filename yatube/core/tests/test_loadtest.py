@@ -0,0 +1,39 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.test import LiveServerTestCase
+
+from posts.models import Comment, Post
+
+from ..loadtest import dechunk, run_load
+
+User = get_user_model()
+
+
+class LoadTestTests(LiveServerTestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author',
+                                               password='secret-pass-1')
+        Post.objects.create(author=self.author, text='Пост под нагрузкой')
+
+    def test_dechunk(self):
+        self.assertEqual(dechunk(b'4\r\nYatu\r\n2\r\nbe\r\n0\r\n\r\n'),
+                         b'Yatube')
+
+    def test_mixed_traffic_report(self):
+        """Смешанный трафик проходит без ошибок и попадает в отчёт."""
+        rows = asyncio.run(run_load(
+            self.live_server_url, concurrency=2, duration=1,
+            mix={'index': 1, 'post_detail': 1, 'add_comment': 1},
+            credentials=[('author', 'secret-pass-1')],
+            logged_in_share=1, seed=1,
+        ))
+        report = {row['name']: row for row in rows}
+        self.assertEqual(report['login']['errors'], 0)
+        self.assertEqual(report['login']['requests'], 2)
+        self.assertEqual(report['login_form']['requests'], 2)
+        self.assertEqual(report['add_comment_form']['requests'],
+                         report['add_comment']['requests'])
+        self.assertEqual(report['index']['errors'], 0)
+        self.assertGreater(report['index']['requests'], 0)
+        self.assertTrue(Comment.objects.exists())
@@ -0,0 +1,69 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..mail import StoredEmailMessage, claim, deliver_queued
+from ..models import QueuedEmail
+
+User = get_user_model()
+
+LOCMEM = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+@override_settings(EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+                   MAIL_QUEUE_BACKEND=LOCMEM)
+class MailQueueTests(TestCase):
+    def test_password_reset_is_queued(self):
+        """Письмо сброса пароля ставится в очередь, а не отправляется."""
+        User.objects.create_user(username='reader', email='reader@yatube.ru',
+                                 password='secret-pass-1')
+        self.client.post(reverse('password_reset'),
+                         {'email': 'reader@yatube.ru'})
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+
+    def test_queued_mail_delivered(self):
+        """Воркер отправляет письма из очереди."""
+        mail.send_mail('Тема', 'Текст', 'yatube@yatube.ru',
+                       ['reader@yatube.ru'])
+        self.assertEqual(deliver_queued(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].message().get_content(), 'Текст')
+        self.assertEqual(QueuedEmail.objects.get().status, QueuedEmail.SENT)
+
+    def test_failed_delivery_retried(self):
+        """Ошибка доставки откладывает письмо на повтор."""
+        mail.send_mail('Тема', 'Текст', 'yatube@yatube.ru',
+                       ['reader@yatube.ru'])
+        with mock.patch(f'{LOCMEM}.send_messages',
+                        side_effect=OSError('down')):
+            self.assertEqual(deliver_queued(), 0)
+        queued = QueuedEmail.objects.get()
+        self.assertEqual(queued.status, QueuedEmail.QUEUED)
+        self.assertEqual(queued.attempts, 1)
+        self.assertEqual(deliver_queued(), 0)
+
+    def test_stored_message_fits_smtp_backend(self):
+        """SMTP-бэкенд сериализует письмо как as_bytes(linesep='\\r\\n')."""
+        mail.send_mail('Тема', 'Текст', 'yatube@yatube.ru',
+                       ['reader@yatube.ru'])
+        message = StoredEmailMessage(QueuedEmail.objects.get()).message()
+        raw = message.as_bytes(linesep='\r\n')
+        self.assertIn(b'\r\nTo: reader@yatube.ru\r\n', raw)
+
+    def test_stale_sending_requeued(self):
+        """Письмо упавшего воркера возвращается в очередь по таймауту."""
+        mail.send_mail('Тема', 'Текст', 'yatube@yatube.ru',
+                       ['reader@yatube.ru'])
+        queued = QueuedEmail.objects.get()
+        claim(queued)
+        self.assertEqual(deliver_queued(), 0)
+        QueuedEmail.objects.update(
+            next_attempt=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(deliver_queued(), 1)
+        self.assertEqual(len(mail.outbox), 1)
@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.media import Unsatisfiable, parse_range
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+HASHED = 'posts/ab/' + 'ab' * 32 + '.jpg'
+CONTENT = bytes(range(256)) * 4
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_ranges(self):
+        cases = {
+            'bytes=0-99': (0, 99),
+            'bytes=1000-': (1000, 1023),
+            'bytes=-24': (1000, 1023),
+            'bytes=-5000': (0, 1023),
+            'bytes=10-5000': (10, 1023),
+            'bytes=0-1,5-6': None,
+            'bytes=9-2': None,
+            'items=0-1': None,
+            None: None,
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 1024), expected)
+
+    def test_unsatisfiable(self):
+        for header in ('bytes=1024-', 'bytes=-0'):
+            with self.subTest(header=header):
+                with self.assertRaises(Unsatisfiable):
+                    parse_range(header, 1024)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ServeMediaTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'posts', 'ab'))
+        for name in (HASHED, 'posts/old.jpg'):
+            with open(os.path.join(TEMP_MEDIA_ROOT, name), 'wb') as file:
+                file.write(CONTENT)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_full_and_cache_headers(self):
+        response = self.client.get(f'/media/{HASHED}')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+        response = self.client.get('/media/posts/old.jpg')
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_range(self):
+        response = self.client.get(f'/media/{HASHED}',
+                                   HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 100-199/1024')
+        self.assertEqual(b''.join(response.streaming_content),
+                         CONTENT[100:200])
+        response = self.client.get(f'/media/{HASHED}',
+                                   HTTP_RANGE='bytes=2000-')
+        self.assertEqual(response.status_code, 416)
+
+    def test_stale_if_range_gets_whole_file(self):
+        response = self.client.get(f'/media/{HASHED}', HTTP_RANGE='bytes=0-9',
+                                   HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_none_match(self):
+        etag = self.client.get(f'/media/{HASHED}')['ETag']
+        response = self.client.get(f'/media/{HASHED}',
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(MEDIA_SENDFILE='x-accel')
+    def test_offload(self):
+        response = self.client.get(f'/media/{HASHED}')
+        self.assertEqual(response['X-Accel-Redirect'],
+                         f'/protected-media/{HASHED}')
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+
+    def test_missing_and_traversal(self):
+        for path in ('posts/nope.jpg', 'posts'):
+            with self.subTest(path=path):
+                self.assertEqual(
+                    self.client.get(f'/media/{path}').status_code, 404)
+        self.assertEqual(
+            self.client.get('/media/../settings.py').status_code, 400)
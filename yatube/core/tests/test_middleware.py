@@ -0,0 +1,85 @@
+import gzip
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from ..compression import compress
+from ..middleware import CompressionMiddleware
+
+HTML = '<p>Повторяющийся текст ленты</p>' * 50
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+    def process(self, response, accept='gzip', request=None):
+        request = request or self.factory.get('/',
+                                              HTTP_ACCEPT_ENCODING=accept)
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(request)
+
+    def test_html_compressed(self):
+        """HTML сжимается, если клиент принимает gzip."""
+        response = self.process(HttpResponse(HTML))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), HTML)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_without_accept_encoding(self):
+        response = self.process(HttpResponse(HTML), accept='')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_media_skipped(self):
+        """Уже сжатые форматы не пережимаются."""
+        response = self.process(
+            HttpResponse(b'\x00' * 1000, content_type='image/png'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_compressed(self):
+        """Потоковый ответ сжимается по кускам."""
+        response = self.process(StreamingHttpResponse(
+            chunk.encode() for chunk in HTML.split('</p>')))
+        body = b''.join(response.streaming_content)
+        self.assertEqual(gzip.decompress(body).decode(),
+                         HTML.replace('</p>', ''))
+        self.assertFalse(response.has_header('Content-Length'))
+
+    def test_compressed_body_cached(self):
+        """Одинаковое тело сжимается один раз и берётся из кэша."""
+        with mock.patch('core.middleware.compress',
+                        wraps=compress) as compressor:
+            first = self.process(HttpResponse(HTML))
+            second = self.process(HttpResponse(HTML))
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(compressor.call_count, 1)
+
+    def test_q_values(self):
+        """q=0 запрещает кодировку, выбирается самая желанная."""
+        response = self.process(HttpResponse(HTML), accept='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.process(HttpResponse(HTML),
+                                accept='br;q=0, *;q=0.5')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_token_page_padded_and_not_cached(self):
+        """Страница с CSRF-токеном: случайная добавка и без кэша."""
+        def token_request():
+            request = self.factory.get('/', HTTP_ACCEPT_ENCODING='br, gzip')
+            request.META['CSRF_COOKIE_NEEDS_UPDATE'] = True
+            return request
+
+        with mock.patch('core.middleware.compress') as compressor:
+            responses = [self.process(HttpResponse(HTML),
+                                      request=token_request())
+                         for _ in range(20)]
+        compressor.assert_not_called()
+        self.assertEqual({response['Content-Encoding']
+                          for response in responses}, {'gzip'})
+        self.assertGreater(len({len(response.content)
+                                for response in responses}), 1)
+        self.assertEqual(gzip.decompress(responses[0].content).decode(),
+                         HTML)
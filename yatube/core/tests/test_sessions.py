@@ -0,0 +1,58 @@
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import TestCase
+
+from tasks.models import Task
+from tasks.queue import run_task
+
+from ..sessions import SessionStore
+
+
+class WriteBehindSessionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.session = SessionStore()
+        self.session['counter'] = 0
+        self.session.create()
+
+    def test_new_session_written_to_db(self):
+        """Новая сессия сразу попадает в БД."""
+        self.assertTrue(Session.objects.filter(
+            session_key=self.session.session_key).exists())
+
+    def test_changes_written_behind(self):
+        """Изменения в пределах интервала не пишутся в БД."""
+        self.session['counter'] = 1
+        self.session.save()
+        self.session['counter'] = 2
+        with self.assertNumQueries(0):
+            self.session.save()
+        stored = Session.objects.get(session_key=self.session.session_key)
+        self.assertEqual(stored.get_decoded()['counter'], 0)
+
+    def test_read_from_cache(self):
+        """Сессия читается из кэша без запросов к БД."""
+        self.session['counter'] = 2
+        self.session.save()
+        with self.assertNumQueries(0):
+            loaded = SessionStore(self.session.session_key)
+            self.assertEqual(loaded['counter'], 2)
+
+    def test_flush_after_interval(self):
+        """По истечении интервала изменения сбрасываются в БД."""
+        cache.delete(self.session.flush_key)
+        self.session['counter'] = 3
+        self.session.save()
+        stored = Session.objects.get(session_key=self.session.session_key)
+        self.assertEqual(stored.get_decoded()['counter'], 3)
+
+    def test_pending_changes_flushed_by_task(self):
+        """Отложенные изменения окна сбрасывает в БД одна задача."""
+        for counter in (4, 5):
+            self.session['counter'] = counter
+            self.session.save()
+        flush = Task.objects.get(name='core.tasks.flush_session')
+        Task.objects.update(status=Task.RUNNING)
+        self.assertEqual(run_task(flush.pk), Task.DONE)
+        stored = Session.objects.get(session_key=self.session.session_key)
+        self.assertEqual(stored.get_decoded()['counter'], 5)
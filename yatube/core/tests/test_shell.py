@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+@override_settings(EDGE_SHELL=True)
+class EdgeShellTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+        self.guest = Client()
+        self.reader = Client()
+        self.reader.force_login(self.user)
+
+    def test_shell_is_same_for_everyone(self):
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ):
+            with self.subTest(url=url):
+                guest = self.guest.get(url)
+                reader = self.reader.get(url)
+                self.assertEqual(guest.content, reader.content)
+                self.assertNotContains(reader, 'reader')
+                self.assertNotContains(reader, 'csrfmiddlewaretoken')
+                self.assertIn('public', reader['Cache-Control'])
+                self.assertNotIn('Cookie', reader.get('Vary', ''))
+
+    def test_holes_are_personal(self):
+        response = self.reader.get(reverse('core:holes'), {'h': [
+            'nav', f'follow:{self.author.username}',
+            f'comment_form:{self.post.pk}', 'unknown', 'comment_form:x',
+        ]})
+        holes = response.json()
+        self.assertIn('reader', holes['nav'])
+        self.assertIn('Подписаться', holes['follow:author'])
+        self.assertIn('csrfmiddlewaretoken',
+                      holes[f'comment_form:{self.post.pk}'])
+        self.assertNotIn('unknown', holes)
+        self.assertEqual(holes['comment_form:x'], '')
+        self.assertIn('no-cache', response['Cache-Control'])
@@ -0,0 +1,25 @@
+from django.test import SimpleTestCase
+
+from ..startup import parse_importtime
+
+IMPORTTIME = '''\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     django.utils
+import time:       300 |        400 |   django.db
+import time:        50 |        450 | django
+import time:      2000 |       2000 | pkg_resources
+Traceback line without prefix
+'''
+
+
+class ParseImporttimeTests(SimpleTestCase):
+    def test_groups_by_top_level_package(self):
+        self.assertEqual(parse_importtime(IMPORTTIME), [
+            ('pkg_resources', 2000),
+            ('django', 450),
+        ])
+
+    def test_depth(self):
+        packages = dict(parse_importtime(IMPORTTIME, depth=2))
+        self.assertEqual(packages['django.db'], 300)
+        self.assertEqual(packages['django'], 50)
@@ -0,0 +1,81 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..css import prune_css
+from ..views import serve_static
+
+TEMP_STATIC_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+
+class PruneCssTests(SimpleTestCase):
+    def test_unused_rules_removed(self):
+        """Правила с неиспользуемыми классами вырезаются."""
+        css = ('/*! license */body{margin:0}.used{color:red}'
+               '.unused,.used:hover{color:blue}'
+               '@media (min-width:1px){.unused{top:0}.used{top:1px}}'
+               '.x{background:url("data:{}")}')
+        self.assertEqual(
+            prune_css(css, {'used'}),
+            '/*! license */body{margin:0}.used{color:red}'
+            '.used:hover{color:blue}'
+            '@media (min-width:1px){.used{top:1px}}',
+        )
+
+
+@override_settings(
+    STATIC_ROOT=TEMP_STATIC_ROOT,
+    STORAGES={**settings.STORAGES, 'staticfiles': {'BACKEND': STORAGE}},
+    STATIC_PRUNE_CSS=('css/bootstrap.min.css', ),
+)
+class CollectStaticTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        staticfiles_storage._setup()
+        self.css_name = staticfiles_storage.stored_name(
+            'css/bootstrap.min.css')
+
+    def test_hashed_and_compressed(self):
+        """Собранный CSS получает хеш в имени, урезан и предсжат."""
+        self.assertNotEqual(self.css_name, 'css/bootstrap.min.css')
+        path = os.path.join(TEMP_STATIC_ROOT, self.css_name)
+        source = os.path.join(settings.BASE_DIR, 'static',
+                              'css', 'bootstrap.min.css')
+        self.assertLess(os.path.getsize(path), os.path.getsize(source))
+        with gzip.open(path + '.gz') as compressed, open(path, 'rb') as css:
+            self.assertEqual(compressed.read(), css.read())
+
+    def test_serve_precompressed_immutable(self):
+        """Хешированный файл отдаётся сжатым и с вечным кэшем."""
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        response = serve_static(request, self.css_name)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        response.close()
+
+    def test_refused_encoding_not_served(self):
+        """q=0 запрещает кодировку, а не включает её."""
+        for header, encoding in (('br;q=0, gzip', 'gzip'),
+                                 ('gzip;q=0, identity', None)):
+            request = RequestFactory().get(
+                '/', HTTP_ACCEPT_ENCODING=header)
+            response = serve_static(request, self.css_name)
+            self.assertEqual(response.get('Content-Encoding'), encoding)
+            response.close()
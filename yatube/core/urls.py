@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    path('_holes/', views.holes, name='holes'),
+    path('health/live/', views.live, name='live'),
+    path('health/ready/', views.ready, name='ready'),
+]
@@ -1,4 +1,25 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import (FileResponse, Http404, HttpResponse, JsonResponse,
+                         StreamingHttpResponse)
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_safe
+
+from .health import run_checks
+from .middleware import negotiate
+from .media import (Unsatisfiable, is_immutable, offload_headers,
+                    parse_range, read_range)
+from .shell import render_hole
+from .storage import EXTENSIONS
+
+HOLES_LIMIT = 20
 
 
 def page_not_found(request, exception):
@@ -16,3 +37,131 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def accepted_variant(request, path):
+    """Сжатая копия файла, если клиент её принимает и она собрана."""
+    available = [encoding for encoding, extension in EXTENSIONS.items()
+                 if os.path.exists(path + extension)]
+    encoding = available and negotiate(request, available)
+    if not encoding:
+        return path, None
+    return path + EXTENSIONS[encoding], encoding
+
+
+def serve_static(request, path):
+    """
+    Раздача собранной статики: предсжатые варианты и вечный кэш
+    для имён с хешем содержимого.
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    served_path, encoding = accepted_variant(request, full_path)
+    content_type, _ = mimetypes.guess_type(full_path)
+    response = FileResponse(
+        open(served_path, 'rb'),
+        content_type=content_type or 'application/octet-stream',
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding', ))
+    if path in getattr(staticfiles_storage, 'immutable_names', ()):
+        response.headers['Cache-Control'] = (
+            f'public, max-age={settings.STATIC_MAX_AGE}, immutable'
+        )
+    else:
+        response.headers['Cache-Control'] = 'public, max-age=60'
+    return response
+
+
+def ranged_response(request, full_path, size, etag, content_type):
+    """Файл целиком или один диапазон из Range (206 / 416)."""
+    byte_range = None
+    if request.headers.get('If-Range', etag) == etag:
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except Unsatisfiable:
+            response = HttpResponse(status=416)
+            response.headers['Content-Range'] = f'bytes */{size}'
+            return response
+    if byte_range is None:
+        return FileResponse(open(full_path, 'rb'), content_type=content_type)
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        read_range(open(full_path, 'rb'), start, end - start + 1),
+        status=206, content_type=content_type,
+    )
+    response.headers['Content-Length'] = end - start + 1
+    response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Раздача загрузок: ETag и If-None-Match, запросы Range и вечный
+    кэш для имён по содержимому. С MEDIA_SENDFILE байты отдаёт
+    веб-сервер, а приложение отвечает только заголовками.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    stat = os.stat(full_path)
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': (
+            f'public, max-age={settings.MEDIA_MAX_AGE}, immutable'
+            if is_immutable(path) else 'public, max-age=60'
+        ),
+    }
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        content_type, _ = mimetypes.guess_type(full_path)
+        content_type = content_type or 'application/octet-stream'
+        offload = offload_headers(path, full_path)
+        if offload:
+            # Range и If-Range веб-сервер обработает сам.
+            response = HttpResponse(content_type=content_type)
+            headers.update(offload)
+        else:
+            response = ranged_response(request, full_path, stat.st_size,
+                                       etag, content_type)
+    for name, value in headers.items():
+        response.headers[name] = value
+    return response
+
+
+@never_cache
+def holes(request):
+    """Зависящие от пользователя куски страницы-оболочки одним JSON."""
+    fragments = {}
+    for key in request.GET.getlist('h')[:HOLES_LIMIT]:
+        html = render_hole(request, key)
+        if html is not None:
+            fragments[key] = html
+    return JsonResponse(fragments)
+
+
+@never_cache
+def live(request):
+    """Процесс жив и отвечает; зависимости не трогаем."""
+    return JsonResponse({'status': 'ok'})
+
+
+@never_cache
+def ready(request):
+    """Готовность принимать трафик: БД, кэш и хранилище с таймаутами."""
+    ok, checks = run_checks()
+    return JsonResponse({'status': 'ok' if ok else 'fail', 'checks': checks},
+                        status=200 if ok else 503)
@@ -1,27 +1,186 @@
-from django.contrib import admin
+from operator import attrgetter
 
+from django import forms
+from django.conf import settings as s
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME, ActionForm
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.admin.views.main import ChangeList
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import QuerySet
+from django.template.response import TemplateResponse
+
+from core.paginator import EstimatedCountPaginator
+
+from . import sitemaps
 from .models import Group, Post, Comment, Follow
+from .sharding import ShardedList, is_sharded, locate, scatter
+from .utils import bump_version
+
+
+def in_batches(queryset):
+    """
+    Первичные ключи выборки пачками, обход по ключу без OFFSET.
+    Каждая пачка — с одного шарда: (шард, [pk, ...]).
+    """
+    for shard in scatter(queryset):
+        pks = shard.order_by('pk').values_list('pk', flat=True)
+        last_pk = 0
+        while True:
+            batch = list(pks.filter(pk__gt=last_pk)[:s.ADMIN_BATCH_SIZE])
+            if not batch:
+                break
+            yield shard.db, batch
+            last_pk = batch[-1]
+
+
+class ShardedChangeList(ChangeList):
+    def get_results(self, request):
+        super().get_results(request)
+        if isinstance(self.result_list, QuerySet):
+            # Короткий список или «показать все» ChangeList берёт
+            # из queryset напрямую, минуя пагинатор.
+            self.result_list = ShardedList(
+                self.result_list, key=attrgetter('pk'))[:self.result_count]
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Общие настройки для таблиц на миллионы строк. Таблицы на шардах
+    показываются со всех шардов по убыванию pk.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ('delete_in_batches', )
+
+    def get_ordering(self, request):
+        if is_sharded(self.model):
+            return ('-pk', )
+        return super().get_ordering(request)
+
+    def get_sortable_by(self, request):
+        if is_sharded(self.model):
+            return ()
+        return super().get_sortable_by(request)
+
+    def get_changelist(self, request, **kwargs):
+        if is_sharded(self.model):
+            return ShardedChangeList
+        return super().get_changelist(request, **kwargs)
+
+    def get_paginator(self, request, queryset, per_page, **kwargs):
+        if is_sharded(self.model):
+            queryset = ShardedList(queryset, key=attrgetter('pk'))
+        return super().get_paginator(request, queryset, per_page, **kwargs)
+
+    def get_object(self, request, object_id, from_field=None):
+        if from_field is None and is_sharded(self.model):
+            try:
+                shard = locate(int(object_id))
+            except ValueError:
+                return None
+            return (self.get_queryset(request).using(shard)
+                    .filter(pk=object_id).first())
+        return super().get_object(request, object_id, from_field)
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(description='Удалить выбранные (пачками)',
+                  permissions=('delete', ))
+    def delete_in_batches(self, request, queryset):
+        """
+        Как delete_selected: сначала страница подтверждения, каждая
+        удалённая запись попадает в журнал. Но без дерева связанных
+        объектов, которое на больших таблицах не построить.
+        """
+        if not request.POST.get('post'):
+            return TemplateResponse(
+                request, 'admin/delete_in_batches_confirmation.html', {
+                    **self.admin_site.each_context(request),
+                    'title': 'Вы уверены?',
+                    'opts': self.opts,
+                    'count': sum(shard.count() for shard in scatter(queryset)),
+                    'select_across': request.POST.get('select_across') == '1',
+                    'selected': request.POST.getlist(ACTION_CHECKBOX_NAME),
+                    'action_checkbox_name': ACTION_CHECKBOX_NAME,
+                })
+        content_type = ContentType.objects.get_for_model(self.model)
+        deleted = 0
+        for shard, batch in in_batches(queryset):
+            rows = self.model.objects.using(shard).filter(pk__in=batch)
+            LogEntry.objects.bulk_create(
+                LogEntry(user_id=request.user.pk,
+                         content_type_id=content_type.pk,
+                         object_id=str(obj.pk), object_repr=str(obj)[:200],
+                         action_flag=DELETION)
+                for obj in rows
+            )
+            deleted += len(batch)
+            rows.delete()
+        self.message_user(request, f'Удалено записей: {deleted}.')
+
+
+class PostActionForm(ActionForm):
+    group = forms.ModelChoiceField(
+        Group.objects.all(), required=False, label='Группа',
+    )
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(LargeTableAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
-    list_editable = ('group', )
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text', )
     list_filter = ('pub_date', )
+    date_hierarchy = 'pub_date'
     empty_value_display = '-пусто-'
+    action_form = PostActionForm
+    actions = ('reassign_group', 'delete_in_batches')
+
+    @admin.action(description='Перенести в выбранную группу',
+                  permissions=('change', ))
+    def reassign_group(self, request, queryset):
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        group = form.cleaned_data.get('group') if form.is_valid() else None
+        if group is None:
+            self.message_user(request, 'Выберите группу для переноса.',
+                              level=messages.ERROR)
+            return
+        # update() обходит сигналы постов, поэтому кэши лент, групп
+        # и sitemap сбрасываются здесь.
+        updated = 0
+        old_groups = {group.pk}
+        for shard, batch in in_batches(queryset):
+            posts = Post.objects.using(shard).filter(pk__in=batch)
+            old_groups.update(posts.exclude(group=None)
+                              .values_list('group_id', flat=True))
+            updated += posts.update(group=group)
+            sitemaps.invalidate('posts', *batch)
+        sitemaps.invalidate('groups', *old_groups)
+        bump_version('feed')
+        self.message_user(request, f'Перенесено постов: {updated}.')
 
 
 @admin.register(Group)
 class PostGroup(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('slug', )}
+    search_fields = ('title', 'slug')
 
 
 @admin.register(Comment)
-class PostComment(admin.ModelAdmin):
+class PostComment(LargeTableAdmin):
     list_display = ('post', 'author', 'text', 'created', )
+    list_select_related = ('post', 'author')
+    autocomplete_fields = ('post', 'author')
 
 
 @admin.register(Follow)
-class PostFollow(admin.ModelAdmin):
+class PostFollow(LargeTableAdmin):
     list_display = ('user', 'author', )
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
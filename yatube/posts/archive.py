@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.conf import settings as s
+from django.db import transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from core import blobs
+
+from . import sitemaps
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+from .sharding import shards
+
+POST_FIELDS = ('id', 'text', 'pub_date', 'author_id', 'group_id', 'image')
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'text', 'created')
+
+
+def archive_batch(before, batch_size, using=None):
+    """Переносит в архив одну пачку старых постов вместе с комментариями."""
+    with transaction.atomic(using=using):
+        # Блокировка постов не даёт вставить к ним комментарий, пока
+        # пачка копируется: каскад удалил бы его, не заархивировав.
+        posts = list(
+            Post.objects.using(using).select_for_update()
+            .filter(pub_date__lt=before)
+            .order_by('pub_date')
+            .values(*POST_FIELDS)[:batch_size]
+        )
+        if not posts:
+            return 0
+        ids = [post['id'] for post in posts]
+        # Удаление постов снимет ссылки на картинки, архив их вернёт.
+        blobs.retain(*(post['image'] for post in posts))
+        ArchivedPost.objects.using(using).bulk_create(
+            ArchivedPost(**post) for post in posts
+        )
+        ArchivedComment.objects.using(using).bulk_create(
+            (ArchivedComment(**comment) for comment in
+             Comment.objects.using(using).filter(post_id__in=ids)
+             .values(*COMMENT_FIELDS)),
+            batch_size=batch_size,
+        )
+        Post.objects.using(using).filter(id__in=ids).delete()
+    sitemaps.invalidate('archive', *ids)
+    return len(ids)
+
+
+def archive_posts(days=None, batch_size=None):
+    """Архивирует все посты старше порога. Возвращает их количество."""
+    days = s.ARCHIVE_AFTER_DAYS if days is None else days
+    batch_size = batch_size or s.ARCHIVE_BATCH
+    before = timezone.now() - timedelta(days=days)
+    archived = 0
+    for alias in shards():
+        while True:
+            moved = archive_batch(before, batch_size, alias)
+            archived += moved
+            if moved < batch_size:
+                break
+    return archived
+
+
+class ArchiveFallbackList:
+    """
+    Лента для Paginator: сначала посты из горячей таблицы, а когда
+    страница выходит за их пределы — продолжение из архива. Архивные
+    посты всегда старше горячих, поэтому порядок сохраняется.
+    """
+
+    def __init__(self, posts, archived_posts):
+        self.posts = posts
+        self.archived_posts = archived_posts
+
+    @cached_property
+    def hot_count(self):
+        return self.posts.count()
+
+    def count(self):
+        return self.hot_count + self.archived_posts.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        start, stop = key.start or 0, key.stop
+        items = []
+        if start < self.hot_count:
+            items.extend(self.posts[start:stop])
+        if stop is None or stop > self.hot_count:
+            archive_start = max(start - self.hot_count, 0)
+            archive_stop = None if stop is None else stop - self.hot_count
+            items.extend(self.archived_posts[archive_start:archive_stop])
+        return items
@@ -0,0 +1,137 @@
+from hashlib import md5
+from io import StringIO
+
+from django.conf import settings as s
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import http_date, quote_etag
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .sharding import ShardedList, scatter
+from .utils import cached_stream, get_version
+
+
+class StreamingFeedMixin:
+    """
+    Отдаёт ленту кусками: шапку, затем по одному элементу,
+    не собирая весь документ в памяти.
+    """
+
+    def __init__(self, *args, updated=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.updated = updated
+
+    def latest_post_date(self):
+        return self.updated or super().latest_post_date()
+
+    def stream(self, items):
+        buffer = StringIO()
+        handler = SimplerXMLGenerator(buffer, 'utf-8',
+                                      short_empty_elements=True)
+
+        def drain():
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
+
+        handler.startDocument()
+        self.open_root(handler)
+        self.add_root_elements(handler)
+        yield drain()
+        for item in items:
+            self.items = []
+            self.add_item(**item)
+            self.write_items(handler)
+            yield drain()
+        self.items = []
+        self.close_root(handler)
+        yield drain()
+
+
+class StreamingRssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    def open_root(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+
+    def close_root(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class StreamingAtomFeed(StreamingFeedMixin, Atom1Feed):
+    def open_root(self, handler):
+        handler.startElement('feed', self.root_attributes())
+
+    def close_root(self, handler):
+        handler.endElement('feed')
+
+
+FEED_TYPES = {
+    'rss': StreamingRssFeed,
+    'atom': StreamingAtomFeed,
+}
+
+
+def post_item(request, post):
+    """Поля элемента ленты для одного поста."""
+    link = request.build_absolute_uri(post.get_absolute_url())
+    return {
+        'title': str(post),
+        'link': link,
+        'description': post.text,
+        'unique_id': link,
+        'pubdate': post.pub_date,
+        'author_name': post.author.username,
+        'categories': [post.group.slug] if post.group else None,
+    }
+
+
+def feed_response(request, fmt, title, link, posts):
+    """
+    Лента последних постов с поддержкой If-None-Match/If-Modified-Since.
+    Версия ленты — последний пост и счётчик правок, по ней же
+    кэшируется готовый документ.
+    """
+    feed_class = FEED_TYPES.get(fmt)
+    if feed_class is None:
+        raise Http404
+    latest = max(filter(None, (shard.values_list('pub_date', 'id').first()
+                               for shard in scatter(posts))), default=None)
+    updated, latest_id = latest or (None, 0)
+    version = get_version('feed')
+    etag = md5(f'{fmt}:{link}:{latest_id}:{version}'.encode()).hexdigest()
+    last_modified = updated.timestamp() if updated else None
+    response = get_conditional_response(
+        request, etag=quote_etag(etag), last_modified=last_modified
+    )
+    if response is None:
+        feed = feed_class(
+            title=title,
+            link=request.build_absolute_uri(link),
+            description=title,
+            language=s.LANGUAGE_CODE,
+            feed_url=request.build_absolute_uri(),
+            updated=updated,
+        )
+        cache_key = f'feed:{request.get_host()}:{etag}'
+        content = cache.get(cache_key)
+        if content is not None:
+            response = HttpResponse(content, content_type=feed.content_type)
+        else:
+            items = (
+                post_item(request, post) for post in
+                ShardedList(posts.select_related('author', 'group'))
+                [:s.LAST_POSTS_QTY]
+            )
+            response = StreamingHttpResponse(
+                cached_stream(feed.stream(items), cache_key,
+                              s.FEED_CACHE_TIMEOUT),
+                content_type=feed.content_type,
+            )
+    response.headers['ETag'] = quote_etag(etag)
+    if last_modified:
+        response.headers['Last-Modified'] = http_date(last_modified)
+    return response
@@ -1,9 +1,51 @@
 from django import forms
+from django.db.models import F
+from django.utils import timezone
 
 from .models import Comment, Post
+from .signals import post_changed
+
+
+class EditConflict(Exception):
+    """Пост успели изменить после того, как форма была открыта."""
 
 
 class PostForm(forms.ModelForm):
+    version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial.setdefault('version', self.instance.version)
+
+    def save_changes(self):
+        """
+        Записывает только изменённые поля с проверкой версии и сообщает
+        о них сигналом post_changed. Возвращает имена изменённых полей.
+        """
+        post = self.instance
+        changed = [name for name in self.changed_data
+                   if name in self._meta.fields]
+        if not changed:
+            return []
+        values = {}
+        for name in changed:
+            field = post._meta.get_field(name)
+            # pre_save сохраняет новый файл картинки в хранилище.
+            values[field.attname] = field.pre_save(post, add=False)
+        queryset = Post.objects.using(post._state.db).filter(pk=post.pk)
+        expected = self.cleaned_data.get('version')
+        if expected is not None:
+            queryset = queryset.filter(version=expected)
+        # update() не вызывает pre_save, auto_now выставляем сами.
+        values['updated'] = timezone.now()
+        if not queryset.update(version=F('version') + 1, **values):
+            raise EditConflict
+        post.refresh_from_db(fields=('version', ))
+        post_changed.send(sender=Post, instance=post,
+                          changed_fields=frozenset(changed))
+        return changed
+
     class Meta:
         model = Post
         labels = {'text': 'Текст',
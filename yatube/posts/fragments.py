@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings as s
+from django.db.models import Q
+from django.urls import reverse
+
+from .models import ArchivedPost
+from .sharding import ShardedList
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+LIVE, ARCHIVE = 'p', 'a'
+
+
+def encode_cursor(post):
+    """Курсор «после этого поста»: таблица, время публикации и id."""
+    source = ARCHIVE if isinstance(post, ArchivedPost) else LIVE
+    return f'{source}{(post.pub_date - EPOCH) // MICROSECOND}-{post.pk}'
+
+
+def decode_cursor(cursor):
+    """Обратное к encode_cursor; ValueError на испорченный курсор."""
+    source, value = cursor[:1], cursor[1:]
+    if source not in (LIVE, ARCHIVE):
+        raise ValueError(cursor)
+    microseconds, pk = value.split('-')
+    return source, EPOCH + int(microseconds) * MICROSECOND, int(pk)
+
+
+def after(posts, pub_date, pk):
+    return posts.filter(Q(pub_date__lt=pub_date)
+                        | Q(pub_date=pub_date, pk__lt=pk))
+
+
+def fetch(posts, position, limit):
+    if position is not None:
+        posts = after(posts, *position)
+    # Тот же порядок, что у Meta.ordering постов и ключа ShardedList:
+    # страница пагинатора и фрагмент после неё стыкуются без пропусков.
+    posts = posts.select_related('author', 'group')
+    return list(ShardedList(posts)[:limit])
+
+
+def next_batch(posts, archived_posts=None, cursor=None, size=None):
+    """
+    Следующая порция постов после курсора и курсор для продолжения.
+    Когда горячие посты кончаются, лента продолжается из архива:
+    архивные посты всегда старше.
+    """
+    size = size or s.PAGINATOR
+    source, position = LIVE, None
+    if cursor:
+        source, pub_date, pk = decode_cursor(cursor)
+        position = (pub_date, pk)
+    items = []
+    if source == LIVE:
+        items = fetch(posts, position, size + 1)
+        if items:
+            position = (items[-1].pub_date, items[-1].pk)
+    if archived_posts is not None and len(items) <= size:
+        items += fetch(archived_posts, position, size + 1 - len(items))
+    if len(items) <= size:
+        return items, None
+    items = items[:size]
+    return items, encode_cursor(items[-1])
+
+
+def more_url(url_name, page_obj, *args):
+    """Адрес фрагмента, продолжающего страницу пагинатора."""
+    if not page_obj.has_next():
+        return None
+    cursor = encode_cursor(page_obj[-1])
+    return f'{reverse(url_name, args=args)}?cursor={cursor}'
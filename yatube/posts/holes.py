@@ -0,0 +1,55 @@
+from core.shell import register_hole
+
+from .forms import CommentForm
+from .models import ArchivedPost, Follow, Post, User
+from .recommendations import get_recommendations
+from .sharding import locate
+
+TABS = ('index', 'follow', 'hot')
+
+
+def switcher(request, tab, page):
+    return {tab: True} if tab in TABS else {}
+
+
+def follow_button(request, username, page):
+    author = page.get('author') or User.objects.filter(
+        username=username).first()
+    if author is None:
+        return None
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author
+    ).exists()
+    return {
+        'author': author,
+        'following': following,
+        'recommendations': get_recommendations(request.user),
+    }
+
+
+def post_context(post_id, page):
+    if 'post' in page:
+        return {'post': page['post'], 'archived': page.get('archived')}
+    if not post_id.isdigit():
+        return None
+    shard = locate(int(post_id))
+    post = Post.objects.using(shard).filter(pk=post_id).first()
+    if post is not None:
+        return {'post': post, 'archived': False}
+    post = ArchivedPost.objects.using(shard).filter(pk=post_id).first()
+    return post and {'post': post, 'archived': True}
+
+
+def comment_form(request, post_id, page):
+    context = post_context(post_id, page)
+    return context and {**context, 'form': CommentForm()}
+
+
+def edit_link(request, post_id, page):
+    return post_context(post_id, page)
+
+
+register_hole('switcher', 'includes/switcher.html', switcher)
+register_hole('follow', 'includes/follow_button.html', follow_button)
+register_hole('comment_form', 'includes/comment_form.html', comment_form)
+register_hole('edit_link', 'includes/edit_link.html', edit_link)
@@ -0,0 +1,61 @@
+from math import log1p
+from operator import attrgetter
+
+from django.conf import settings as s
+from django.db.models import F
+
+from .models import Follow, HotPost
+from .sharding import ShardedList, scatter
+
+
+def audience_score(author_id):
+    followers = Follow.objects.filter(author_id=author_id).count()
+    return s.HOT_FOLLOWER_WEIGHT * log1p(followers)
+
+
+def initial_score(post):
+    """Стартовый вес свежего поста: новизна плюс аудитория автора."""
+    return s.HOT_POST_WEIGHT + audience_score(post.author_id)
+
+
+def register_post(post):
+    HotPost.objects.using(post._state.db).get_or_create(
+        post=post, defaults={'score': initial_score(post)}
+    )
+
+
+def register_comment(comment):
+    """
+    Инкрементально поднимает пост при каждом новом комментарии.
+    Остывший пост возвращается в таблицу без бонуса новизны.
+    get_or_create переживает гонку первых комментариев, а вес
+    прибавляется одним UPDATE.
+    """
+    hot_posts = HotPost.objects.using(comment._state.db)
+    hot_posts.get_or_create(post_id=comment.post_id, defaults={
+        'score': audience_score(comment.post.author_id),
+    })
+    hot_posts.filter(post_id=comment.post_id).update(
+        score=F('score') + s.HOT_COMMENT_WEIGHT,
+        comments_count=F('comments_count') + 1,
+    )
+
+
+def decay(factor=None):
+    """
+    Затухание рейтинга: старые комментарии и новизна весят всё меньше,
+    остывшие посты удаляются из таблицы.
+    """
+    factor = s.HOT_DECAY_FACTOR if factor is None else factor
+    removed = 0
+    for hot_posts in scatter(HotPost.objects.all()):
+        hot_posts.update(score=F('score') * factor)
+        removed += hot_posts.filter(score__lt=s.HOT_MIN_SCORE).delete()[0]
+    return removed
+
+
+def get_hot_posts():
+    return ShardedList(
+        HotPost.objects.select_related('post__author', 'post__group'),
+        key=attrgetter('score'),
+    )[:s.HOT_POSTS_QTY]
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict, deque
+
+from django.conf import settings as s
+from django.db.models import Max
+
+from .models import Follow, Post
+from .sharding import scatter
+
+ALL = 'all'
+
+
+def group_channel(slug):
+    return f'group:{slug}'
+
+
+def author_channel(author_id):
+    return f'author:{author_id}'
+
+
+class Subscription:
+    """Очередь событий одного клиента в его цикле событий."""
+
+    def __init__(self, broker, channels):
+        self.broker = broker
+        self.channels = frozenset(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=s.LIVE_QUEUE_SIZE)
+
+    def notify(self, event):
+        # publish приходит из потока синхронного представления.
+        try:
+            self.loop.call_soon_threadsafe(self.put, event)
+        except RuntimeError:
+            # Цикл клиента уже закрыт, отписка вот-вот случится.
+            pass
+
+    def put(self, event):
+        if not self.queue.full():
+            self.queue.put_nowait(event)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def __enter__(self):
+        self.broker.add(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.broker.remove(self)
+
+
+class Broker:
+    """
+    Pub/sub внутри процесса. Ждущий клиент — это корутина с пустой
+    очередью, без опроса и без потока; publish будит только
+    подписчиков нужных каналов. Последние события хранятся, чтобы
+    переподключение (Last-Event-ID) ничего не теряло. id событий свои
+    у каждого процесса, поэтому live_poll считает по id постов.
+    """
+
+    def __init__(self, history=None):
+        self.lock = threading.Lock()
+        self.last_id = 0
+        self.history = deque(maxlen=history or s.LIVE_HISTORY)
+        self.channels = defaultdict(set)
+
+    def subscribe(self, channels):
+        return Subscription(self, channels)
+
+    def add(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                self.channels[channel].add(subscription)
+
+    def remove(self, subscription):
+        with self.lock:
+            for channel in subscription.channels:
+                subscribers = self.channels[channel]
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.channels[channel]
+
+    def publish(self, channels, data):
+        with self.lock:
+            self.last_id += 1
+            event = (self.last_id, frozenset(channels), data)
+            self.history.append(event)
+            targets = set().union(*(self.channels.get(channel, ())
+                                    for channel in channels))
+        for subscription in targets:
+            subscription.notify(event)
+        return event
+
+    def backlog(self, channels, since):
+        """События каналов после id since из недавней истории."""
+        with self.lock:
+            return [event for event in self.history
+                    if event[0] > since and event[1] & channels]
+
+
+broker = Broker()
+
+
+def publish_post(post):
+    channels = {ALL, author_channel(post.author_id)}
+    if post.group_id:
+        channels.add(group_channel(post.group.slug))
+    return broker.publish(channels, {
+        'post': post.pk,
+        'author': post.author.username,
+        'url': post.get_absolute_url(),
+    })
+
+
+def resolve_channels(request, feed):
+    """Каналы ленты из ?feed=all|group:<slug>|follow или None."""
+    if feed == ALL:
+        return {ALL}
+    if feed.startswith('group:') and len(feed) > len('group:'):
+        return {feed}
+    if feed == 'follow' and request.user.is_authenticated:
+        return {author_channel(author_id) for author_id in
+                Follow.objects.filter(user=request.user)
+                .values_list('author_id', flat=True)}
+    return None
+
+
+def sse(event):
+    event_id, _, data = event
+    return (f'id: {event_id}\nevent: post\n'
+            f'data: {json.dumps(data, ensure_ascii=False)}\n\n')
+
+
+def feed_posts(request, feed):
+    """Посты ленты ?feed=all|group:<slug>|follow или None."""
+    if feed == ALL:
+        return Post.objects.all()
+    if feed.startswith('group:') and len(feed) > len('group:'):
+        return Post.objects.filter(group__slug=feed[len('group:'):])
+    if feed == 'follow' and request.user.is_authenticated:
+        return Post.objects.filter(author__following__user=request.user)
+    return None
+
+
+def latest_post_id(posts):
+    return max((shard.aggregate(last=Max('pk'))['last'] or 0
+                for shard in scatter(posts)), default=0)
+
+
+def count_since(posts, since):
+    """Число постов с id больше since, не больше LIVE_POLL_MAX."""
+    return min(s.LIVE_POLL_MAX, sum(
+        shard.filter(pk__gt=since).order_by().values('pk')
+        [:s.LIVE_POLL_MAX].count()
+        for shard in scatter(posts)))
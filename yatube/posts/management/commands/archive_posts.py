@@ -0,0 +1,16 @@
+from django.conf import settings as s
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_posts
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты с комментариями в архивные таблицы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=s.ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int, default=s.ARCHIVE_BATCH)
+
+    def handle(self, *args, **options):
+        archived = archive_posts(options['days'], options['batch_size'])
+        self.stdout.write(f'В архив перенесено постов: {archived}.')
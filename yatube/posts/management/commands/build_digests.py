@@ -0,0 +1,19 @@
+from django.conf import settings as s
+from django.core.management.base import BaseCommand
+
+from posts.notifications import build_digests
+
+
+class Command(BaseCommand):
+    help = ('Сводит журнал уведомлений о комментариях в сводки для авторов. '
+            'Запускается периодически, например раз в несколько минут.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=s.NOTIFY_BATCH)
+        parser.add_argument('--email', action='store_true',
+                            default=s.NOTIFY_EMAIL,
+                            help='Отправить получателям письма со сводками.')
+
+    def handle(self, *args, **options):
+        events, sent = build_digests(options['batch_size'], options['email'])
+        self.stdout.write(f'Разобрано событий: {events}, писем: {sent}.')
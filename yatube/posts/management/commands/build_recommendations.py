@@ -0,0 +1,21 @@
+from django.conf import settings as s
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import build_recommendations
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации «на кого подписаться».'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int,
+                            default=s.RECOMMENDATIONS_QTY)
+        parser.add_argument('--batch-size', type=int,
+                            default=s.RECOMMENDATIONS_BATCH)
+
+    def handle(self, *args, **options):
+        users = build_recommendations(
+            top_k=options['top'], batch_size=options['batch_size']
+        )
+        self.stdout.write(f'Рекомендации пересчитаны для {users} '
+                          f'пользователей.')
@@ -0,0 +1,41 @@
+from collections import Counter
+
+from django.conf import settings as s
+from django.core.management.base import BaseCommand
+
+from core import blobs
+from posts.models import ArchivedPost, Post
+from posts.sharding import scatter
+
+
+def count_references():
+    references = Counter()
+    for model in (Post, ArchivedPost):
+        for posts in scatter(model.objects.exclude(image='')):
+            references.update(posts.values_list('image', flat=True)
+                              .iterator())
+    return references
+
+
+class Command(BaseCommand):
+    help = ('Удаляет из хранилища картинки, на которые больше не ссылается '
+            'ни один пост, вместе с их миниатюрами.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=int, default=s.MEDIA_GC_GRACE,
+                            help='Не трогать файлы моложе стольких секунд.')
+        parser.add_argument('--recount', action='store_true',
+                            help='Пересчитать ссылки по таблицам постов и '
+                                 'удалить также неучтённые файлы.')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        recount = options['recount'] and not options['dry_run']
+        if recount:
+            blobs.recount(count_references())
+        removed = blobs.collect(options['grace'], options['dry_run'],
+                                orphans=recount)
+        for name in removed:
+            self.stdout.write(name)
+        verb = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(f'{verb} файлов: {len(removed)}.')
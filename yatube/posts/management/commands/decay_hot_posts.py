@@ -0,0 +1,17 @@
+from django.conf import settings as s
+from django.core.management.base import BaseCommand
+
+from posts.hot import decay
+
+
+class Command(BaseCommand):
+    help = ('Затухание рейтинга популярных постов. '
+            'Запускается периодически, например раз в час.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--factor', type=float,
+                            default=s.HOT_DECAY_FACTOR)
+
+    def handle(self, *args, **options):
+        removed = decay(options['factor'])
+        self.stdout.write(f'Рейтинг обновлён, остывших постов: {removed}.')
@@ -0,0 +1,62 @@
+from time import perf_counter
+
+from django.conf import settings as s
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.synthetic import Generator
+
+
+class Command(BaseCommand):
+    help = ('Наполняет базу синтетическими пользователями, группами, '
+            'постами, комментариями и подписками для профилирования.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments-per-post', type=float, default=1.0)
+        parser.add_argument('--follows-per-user', type=int, default=10)
+        parser.add_argument('--group-share', type=float, default=0.5)
+        parser.add_argument('--images', type=int, default=0,
+                            help='Сколько разных картинок сгенерировать.')
+        parser.add_argument('--image-share', type=float, default=0.1)
+        parser.add_argument('--zipf', type=float, default=1.1,
+                            help='Показатель закона Ципфа для авторства.')
+        parser.add_argument('--days', type=int, default=365,
+                            help='За сколько дней распределить посты.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='user',
+                            help='Префикс имён пользователей.')
+        parser.add_argument('--password', default='password')
+        parser.add_argument('--batch-size', type=int,
+                            default=s.SYNTHETIC_BATCH)
+
+    def handle(self, *args, **options):
+        if options['users'] < 2:
+            raise CommandError('Нужно хотя бы два пользователя.')
+        started = perf_counter()
+        generator = Generator(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            prefix=options['prefix'],
+            zipf_exponent=options['zipf'],
+            days=options['days'],
+            log=self.log if options['verbosity'] > 1 else None,
+        )
+        generator.users(options['users'], options['password'])
+        generator.groups(options['groups'])
+        if options['images']:
+            generator.image_variants(options['images'])
+        generator.posts(
+            options['posts'],
+            comments_per_post=options['comments_per_post'],
+            group_share=options['group_share'],
+            image_share=options['image_share'],
+        )
+        generator.follows(options['follows_per_user'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {perf_counter() - started:.1f} с.'
+        ))
+
+    def log(self, message):
+        self.stdout.write(message)
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.rebalance import rebalance, sync_replicas
+
+
+class Command(BaseCommand):
+    help = ('Переносит посты на шарды их авторов после изменения SHARDS. '
+            'Перед этим выполните migrate --database для новых шардов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync-replicas', action='store_true',
+                            help='Скопировать пользователей, группы и '
+                                 'подписки из default на все шарды.')
+        parser.add_argument('--from', dest='sources', action='append',
+                            default=[], metavar='ALIAS',
+                            help='Перенести посты и с этой базы, даже если '
+                                 'её уже нет в SHARDS.')
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['sync_replicas'] and not options['dry_run']:
+            sync_replicas()
+            self.stdout.write('Копии на шардах обновлены.')
+        unknown = set(options['sources']) - set(settings.DATABASES)
+        if unknown:
+            raise CommandError(
+                f'Нет в DATABASES: {", ".join(sorted(unknown))}. '
+                'Перечислите их в RETIRED_SHARDS.')
+        moves = rebalance(options['dry_run'], options['batch_size'],
+                          options['sources'])
+        for (source, target), count in moves.items():
+            self.stdout.write(f'{source} -> {target}: {count}')
+        total = sum(moves.values())
+        verb = 'Нужно перенести' if options['dry_run'] else 'Перенесено'
+        self.stdout.write(f'{verb} постов: {total}.')
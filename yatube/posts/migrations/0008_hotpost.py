@@ -0,0 +1,26 @@
+# Generated by Django 4.2.1 on 2026-10-19 10:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0007_recommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HotPost',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='hot', serialize=False, to='posts.post')),
+                ('score', models.FloatField(db_index=True, default=0)),
+                ('comments_count', models.PositiveIntegerField(default=0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ('-score',),
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.1 on 2026-10-19 10:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('posts', '0010_post_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedMark',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='feed_mark', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('seen', models.DateTimeField(verbose_name='Просмотрено до')),
+            ],
+            options={
+                'verbose_name': 'Отметка ленты подписок',
+                'verbose_name_plural': 'Отметки ленты подписок',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['author', 'pub_date'], name='post_author_pub_date'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.1 on 2026-10-19 10:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_feed_mark'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Directory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20, verbose_name='Модель')),
+                ('shard', models.CharField(max_length=100, verbose_name='Шард')),
+            ],
+            options={
+                'verbose_name': 'Запись каталога шардов',
+                'verbose_name_plural': 'Каталог шардов',
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 4.2.1 on 2026-10-19 11:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0012_directory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationCursor',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Обработчик')),
+                ('last_event', models.PositiveBigIntegerField(default=0, verbose_name='Последнее событие')),
+            ],
+            options={
+                'verbose_name': 'Позиция в журнале уведомлений',
+                'verbose_name_plural': 'Позиции в журнале уведомлений',
+            },
+        ),
+        migrations.CreateModel(
+            name='NotificationEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.PositiveIntegerField(verbose_name='Пост')),
+                ('comment_id', models.PositiveIntegerField(verbose_name='Комментарий')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('actor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Получатель')),
+            ],
+            options={
+                'verbose_name': 'Событие уведомлений',
+                'verbose_name_plural': 'Журнал уведомлений',
+                'ordering': ('id',),
+            },
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.PositiveIntegerField(verbose_name='Пост')),
+                ('post_text', models.CharField(max_length=100, verbose_name='Начало поста')),
+                ('actors', models.JSONField(default=list, verbose_name='Комментаторы')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+                ('last_event', models.PositiveBigIntegerField(verbose_name='Последнее событие')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+                ('read', models.BooleanField(default=False, verbose_name='Прочитано')),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Получатель')),
+            ],
+            options={
+                'verbose_name': 'Уведомление',
+                'verbose_name_plural': 'Уведомления',
+                'ordering': ('-updated',),
+                'indexes': [models.Index(fields=['recipient', 'read', '-updated'], name='notification_unread')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.1 on 2026-10-19 11:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='more_actors',
+            field=models.BooleanField(default=False, verbose_name='Есть и другие комментаторы'),
+        ),
+    ]
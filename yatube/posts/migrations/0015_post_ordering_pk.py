@@ -0,0 +1,21 @@
+# Generated by Django 4.2.1 on 2026-10-19 11:54
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_notification_more_actors'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='archivedpost',
+            options={'ordering': ('-pub_date', '-pk'), 'verbose_name': 'Архивный пост', 'verbose_name_plural': 'Архивные посты'},
+        ),
+        migrations.AlterModelOptions(
+            name='post',
+            options={'ordering': ('-pub_date', '-pk'), 'verbose_name': 'Пост', 'verbose_name_plural': 'Посты'},
+        ),
+    ]
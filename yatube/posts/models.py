@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.db.models import UniqueConstraint
+from django.urls import reverse
 from django.utils.text import slugify
 
+from .sharding import ShardedQuerySet
+
 User = get_user_model()
 
 
@@ -62,15 +65,33 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    version = models.PositiveIntegerField(
+        verbose_name='Версия',
+        default=1,
+        editable=False,
+    )
+    updated = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+    )
+
+    objects = ShardedQuerySet.as_manager()
 
     class Meta:
-        ordering = ('-pub_date', )
+        ordering = ('-pub_date', '-pk')
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(fields=('author', 'pub_date'),
+                         name='post_author_pub_date'),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
+    def get_absolute_url(self):
+        return reverse('posts:post_detail', kwargs={'post_id': self.pk})
+
 
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE,
@@ -82,6 +103,8 @@ class Comment(models.Model):
     )
     created = models.DateTimeField(auto_now_add=True)
 
+    objects = ShardedQuerySet.as_manager()
+
     class Meta:
         ordering = ('created', )
 
@@ -92,3 +115,167 @@ class Follow(models.Model):
                              related_name='follower')
     author = models.ForeignKey(User, on_delete=models.CASCADE,
                                related_name='following')
+
+
+class Directory(models.Model):
+    """
+    Каталог шардов: выдаёт глобально уникальные id постов и комментариев
+    и помнит, на каком шарде лежит строка. Живёт только в default.
+    """
+    kind = models.CharField('Модель', max_length=20)
+    shard = models.CharField('Шард', max_length=100)
+
+    class Meta:
+        verbose_name = 'Запись каталога шардов'
+        verbose_name_plural = 'Каталог шардов'
+
+
+class FeedMark(models.Model):
+    """Момент, до которого пользователь просмотрел ленту подписок."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE,
+                                primary_key=True, related_name='feed_mark')
+    seen = models.DateTimeField('Просмотрено до')
+
+    class Meta:
+        verbose_name = 'Отметка ленты подписок'
+        verbose_name_plural = 'Отметки ленты подписок'
+
+
+class NotificationEvent(models.Model):
+    """
+    Журнал событий для уведомлений: строки только добавляются, по одной
+    на комментарий. Сводки из них собирает build_digests.
+    """
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE,
+                                  related_name='+',
+                                  verbose_name='Получатель')
+    actor = models.ForeignKey(User, on_delete=models.CASCADE,
+                              related_name='+', verbose_name='Автор')
+    post_id = models.PositiveIntegerField('Пост')
+    comment_id = models.PositiveIntegerField('Комментарий')
+    created = models.DateTimeField('Создано', auto_now_add=True)
+
+    class Meta:
+        ordering = ('id', )
+        verbose_name = 'Событие уведомлений'
+        verbose_name_plural = 'Журнал уведомлений'
+
+
+class NotificationCursor(models.Model):
+    """До какого события журнал уже разобран в сводки."""
+    name = models.CharField('Обработчик', max_length=50, primary_key=True)
+    last_event = models.PositiveBigIntegerField('Последнее событие',
+                                                default=0)
+
+    class Meta:
+        verbose_name = 'Позиция в журнале уведомлений'
+        verbose_name_plural = 'Позиции в журнале уведомлений'
+
+
+class Notification(models.Model):
+    """Сводка непрочитанных комментариев к одному посту автора."""
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE,
+                                  related_name='notifications',
+                                  verbose_name='Получатель')
+    post_id = models.PositiveIntegerField('Пост')
+    post_text = models.CharField('Начало поста', max_length=100)
+    actors = models.JSONField('Комментаторы', default=list)
+    # Комментаторов больше, чем помещается в actors.
+    more_actors = models.BooleanField('Есть и другие комментаторы',
+                                      default=False)
+    count = models.PositiveIntegerField('Комментариев', default=0)
+    last_event = models.PositiveBigIntegerField('Последнее событие')
+    updated = models.DateTimeField('Обновлено', auto_now=True)
+    read = models.BooleanField('Прочитано', default=False)
+
+    class Meta:
+        ordering = ('-updated', )
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        indexes = [
+            models.Index(fields=('recipient', 'read', '-updated'),
+                         name='notification_unread'),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.count} к посту {self.post_id}'
+
+    def get_absolute_url(self):
+        return reverse('posts:post_detail', kwargs={'post_id': self.post_id})
+
+
+class Recommendation(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE,
+                             related_name='recommendations')
+    author = models.ForeignKey(User, on_delete=models.CASCADE,
+                               related_name='+')
+    score = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ('-score', )
+        indexes = [
+            models.Index(fields=('user', '-score'),
+                         name='recommendation_user_score'),
+        ]
+        constraints = [
+            UniqueConstraint(fields=('user', 'author'),
+                             name='unique_recommendation'),
+        ]
+
+
+class HotPost(models.Model):
+    post = models.OneToOneField(Post, on_delete=models.CASCADE,
+                                primary_key=True, related_name='hot')
+    score = models.FloatField(default=0, db_index=True)
+    comments_count = models.PositiveIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ('-score', )
+
+
+class ArchivedPost(models.Model):
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст')
+    pub_date = models.DateTimeField(verbose_name='Дата публикации',
+                                    db_index=True)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        verbose_name='Автор',
+        related_name='archived_posts',
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        verbose_name='Группа',
+    )
+    image = models.ImageField('Картинка', upload_to='posts/', blank=True)
+    archived = models.DateTimeField('Дата архивации', auto_now_add=True)
+
+    class Meta:
+        ordering = ('-pub_date', '-pk')
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+
+    def __str__(self):
+        return self.text[:15]
+
+    def get_absolute_url(self):
+        return reverse('posts:post_detail', kwargs={'post_id': self.pk})
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(ArchivedPost, on_delete=models.CASCADE,
+                             related_name='comments')
+    author = models.ForeignKey(User, on_delete=models.CASCADE,
+                               related_name='archived_comments')
+    text = models.TextField()
+    created = models.DateTimeField()
+
+    class Meta:
+        ordering = ('created', )
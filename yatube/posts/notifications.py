@@ -0,0 +1,160 @@
+from django.conf import settings as s
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import (Notification, NotificationCursor, NotificationEvent,
+                     Post, User)
+from .sharding import scatter
+
+CURSOR = 'digests'
+
+
+def record_comment(comment):
+    """
+    Одна вставка в журнал на комментарий, без сводок и писем.
+    Вызывается после коммита комментария, отдельной короткой
+    транзакцией: digest_batch читает журнал курсором по id.
+    """
+    recipient_id = comment.post.author_id
+    if recipient_id == comment.author_id:
+        return None
+    return NotificationEvent.objects.create(
+        recipient_id=recipient_id,
+        actor_id=comment.author_id,
+        post_id=comment.post_id,
+        comment_id=comment.pk,
+    )
+
+
+def post_texts(post_ids):
+    texts = {}
+    for posts in scatter(Post.objects.filter(pk__in=post_ids)):
+        texts.update(posts.values_list('pk', 'text'))
+    return {pk: text[:100] for pk, text in texts.items()}
+
+
+def merge_actors(actors, new):
+    """
+    Последние комментаторы без повторов, свежие первыми, и признак,
+    что кто-то из них не поместился в NOTIFY_ACTORS.
+    """
+    merged = list(dict.fromkeys([*reversed(new), *actors]))
+    return merged[:s.NOTIFY_ACTORS], len(merged) > s.NOTIFY_ACTORS
+
+
+def digest_batch(batch_size):
+    """
+    Разбирает пачку событий после курсора: события одного получателя
+    к одному посту сливаются в его непрочитанную сводку или в новую.
+    Возвращает (число событий, затронутые сводки).
+
+    Курсор pk__gt верен, пока id событий растут в порядке коммитов.
+    Так на SQLite, где записи идут по одной. В PostgreSQL и MySQL
+    id выдаются до коммита, и событие, закоммиченное позже соседа
+    с большим id, курсор пропустит навсегда. Там курсор должен
+    отставать от свежих событий или отмечать разобранные строки.
+    """
+    with transaction.atomic():
+        cursor, _ = (NotificationCursor.objects.select_for_update()
+                     .get_or_create(name=CURSOR))
+        events = list(
+            NotificationEvent.objects.filter(pk__gt=cursor.last_event)
+            .order_by('pk').values_list('pk', 'recipient_id', 'post_id',
+                                        'actor__username')[:batch_size]
+        )
+        if not events:
+            return 0, []
+        grouped = {}
+        for pk, recipient_id, post_id, actor in events:
+            grouped.setdefault((recipient_id, post_id), []).append(
+                (pk, actor))
+        digests = {
+            (digest.recipient_id, digest.post_id): digest
+            # Блокировка: mark_read не пометит сводку прочитанной,
+            # пока в неё дописываются новые комментарии.
+            for digest in Notification.objects.select_for_update().filter(
+                read=False,
+                recipient_id__in={key[0] for key in grouped},
+                post_id__in={key[1] for key in grouped},
+            )
+        }
+        texts = post_texts({post_id for _, post_id in grouped})
+        created, updated = [], []
+        for (recipient_id, post_id), items in grouped.items():
+            digest = digests.get((recipient_id, post_id))
+            if digest is None:
+                digest = Notification(
+                    recipient_id=recipient_id, post_id=post_id,
+                    post_text=texts.get(post_id, ''),
+                )
+                created.append(digest)
+            else:
+                updated.append(digest)
+            digest.count += len(items)
+            digest.actors, dropped = merge_actors(
+                digest.actors, [actor for _, actor in items])
+            digest.more_actors = digest.more_actors or dropped
+            digest.last_event = items[-1][0]
+            # bulk_update не обновляет auto_now, а сводка должна всплыть.
+            digest.updated = timezone.now()
+        Notification.objects.bulk_create(created)
+        Notification.objects.bulk_update(
+            updated, ('count', 'actors', 'more_actors', 'last_event',
+                      'updated'))
+        cursor.last_event = events[-1][0]
+        cursor.save(update_fields=('last_event', ))
+    return len(events), created + updated
+
+
+def send_digests(digests):
+    """Одно письмо на получателя через очередь писем."""
+    by_recipient = {}
+    for digest in digests:
+        by_recipient.setdefault(digest.recipient_id, []).append(digest)
+    recipients = User.objects.filter(pk__in=by_recipient).exclude(email='')
+    messages = [
+        EmailMessage(
+            'Новые комментарии к вашим постам',
+            render_to_string('posts/notification_email.txt', {
+                'user': user, 'notifications': by_recipient[user.pk],
+                'site_url': s.NOTIFY_SITE_URL,
+            }),
+            to=[user.email],
+        )
+        for user in recipients
+    ]
+    if messages:
+        get_connection().send_messages(messages)
+    return len(messages)
+
+
+def build_digests(batch_size=None, email=None):
+    """
+    Сводит весь накопившийся журнал в сводки пачками по batch_size.
+    С email получатели обновлённых сводок получают по письму.
+    Возвращает (число событий, число писем).
+    """
+    batch_size = batch_size or s.NOTIFY_BATCH
+    email = s.NOTIFY_EMAIL if email is None else email
+    total, touched = 0, {}
+    while True:
+        count, digests = digest_batch(batch_size)
+        total += count
+        touched.update(((digest.recipient_id, digest.post_id), digest)
+                       for digest in digests)
+        if count < batch_size:
+            break
+    sent = send_digests(touched.values()) if email else 0
+    return total, sent
+
+
+def unread(user):
+    return (Notification.objects.filter(recipient=user, read=False)
+            .order_by('-updated')[:s.NOTIFY_UNREAD_QTY])
+
+
+def mark_read(user):
+    return Notification.objects.filter(recipient=user, read=False).update(
+        read=True)
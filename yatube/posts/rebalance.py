@@ -0,0 +1,86 @@
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from core import blobs
+
+from .models import (ArchivedComment, ArchivedPost, Comment, Directory,
+                     Follow, Group, HotPost, Post, User)
+from .sharding import plan_moves, shards
+
+REPLICATED_MODELS = (User, Group, Follow)
+# Порядок важен: сначала строки, на которые ссылаются остальные.
+POST_MODELS = (
+    (Post, 'pk'), (Comment, 'post_id'), (HotPost, 'post_id'),
+    (ArchivedPost, 'pk'), (ArchivedComment, 'post_id'),
+)
+
+
+def values(model, rows):
+    names = [field.attname for field in model._meta.concrete_fields]
+    return [model(**row) for row in rows.values(*names)]
+
+
+def sync_replicas(batch_size=1000):
+    """Приводит копии пользователей, групп и подписок к default."""
+    for alias in shards():
+        if alias == DEFAULT_DB_ALIAS:
+            continue
+        for model in REPLICATED_MODELS:
+            rows = values(model, model._base_manager.using(DEFAULT_DB_ALIAS))
+            replica = model._base_manager.using(alias)
+            replica.exclude(pk__in=[row.pk for row in rows]).delete()
+            replica.bulk_create(
+                rows, batch_size=batch_size, update_conflicts=True,
+                unique_fields=[model._meta.pk.name],
+                update_fields=[field.name for field in
+                               model._meta.concrete_fields
+                               if not field.primary_key],
+            )
+
+
+def misplaced(aliases, sources=()):
+    """
+    Посты и архивные посты, лежащие не на шарде своего автора.
+    sources — ещё базы для просмотра, уже убранные из aliases.
+    """
+    rows = []
+    for alias in dict.fromkeys([*aliases, *sources]):
+        for model in (Post, ArchivedPost):
+            rows += [(alias, pk, author_id) for pk, author_id in
+                     model.objects.using(alias)
+                     .values_list('pk', 'author_id')]
+    return plan_moves(rows, aliases)
+
+
+def move_posts(source, target, ids):
+    """Переносит посты с комментариями и рейтингом на другой шард."""
+    with transaction.atomic(using=target), transaction.atomic(using=source):
+        comment_ids = []
+        for model, key in POST_MODELS:
+            rows = model._base_manager.using(source).filter(
+                **{f'{key}__in': ids})
+            if model in (Comment, ArchivedComment):
+                comment_ids += rows.values_list('pk', flat=True)
+            if model in (Post, ArchivedPost):
+                # Удаление с прежнего шарда снимет эти ссылки.
+                blobs.retain(*rows.values_list('image', flat=True))
+            model._base_manager.using(target).bulk_create(
+                values(model, rows), ignore_conflicts=True)
+        Directory.objects.filter(pk__in=[*ids, *comment_ids]).update(
+            shard=target)
+        for model, key in reversed(POST_MODELS):
+            model._base_manager.using(source).filter(
+                **{f'{key}__in': ids}).delete()
+
+
+def rebalance(dry_run=False, batch_size=500, sources=()):
+    """
+    Возвращает {(откуда, куда): число постов}. Кроме шардов из SHARDS
+    опустошает RETIRED_SHARDS и базы из sources.
+    """
+    moves = misplaced(shards(), [*settings.RETIRED_SHARDS, *sources])
+    if not dry_run:
+        for (source, target), ids in moves.items():
+            for start in range(0, len(ids), batch_size):
+                move_posts(source, target, ids[start:start + batch_size])
+    return {route: len(ids) for route, ids in moves.items()}
@@ -0,0 +1,131 @@
+from collections import defaultdict
+from heapq import nlargest
+
+from django.conf import settings as s
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Window
+from django.db.models.functions import RowNumber
+
+from .models import Follow, Recommendation
+
+FRIEND_OF_FRIEND_WEIGHT = 1.0
+CO_FOLLOW_WEIGHT = 0.5
+
+
+def chunked(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), s.RECOMMENDATIONS_BATCH):
+        yield ids[start:start + s.RECOMMENDATIONS_BATCH]
+
+
+def follows_of(user_ids):
+    """Подписки пользователей: {user_id: {author_id, ...}}."""
+    following = defaultdict(set)
+    for chunk in chunked(user_ids):
+        for user_id, author_id in (Follow.objects.filter(user_id__in=chunk)
+                                   .values_list('user_id', 'author_id')):
+            following[user_id].add(author_id)
+    return following
+
+
+def sampled_followers(author_ids):
+    """
+    Не больше RECOMMENDATIONS_CO_FOLLOWERS последних подписчиков
+    каждого автора: у популярных авторов со-подписки иначе растут
+    как куб числа подписчиков.
+    """
+    followers = defaultdict(set)
+    for chunk in chunked(author_ids):
+        rows = (
+            Follow.objects.filter(author_id__in=chunk)
+            .annotate(rank=Window(RowNumber(), partition_by=F('author_id'),
+                                  order_by=F('pk').desc()))
+            .filter(rank__lte=s.RECOMMENDATIONS_CO_FOLLOWERS)
+            .values_list('author_id', 'user_id')
+        )
+        for author_id, user_id in rows:
+            followers[author_id].add(user_id)
+    return followers
+
+
+def load_neighbourhood(user_ids):
+    """
+    Часть графа подписок, нужная для пачки пользователей: их подписки,
+    выборка подписчиков их авторов и подписки всех этих соседей.
+    """
+    following = follows_of(user_ids)
+    authors = set().union(*following.values())
+    followers = sampled_followers(authors)
+    neighbours = authors.union(*followers.values())
+    following.update(follows_of(neighbours - following.keys()))
+    return following, followers
+
+
+def score_user(user_id, following, followers):
+    """
+    Строка разреженного произведения матриц подписок для одного
+    пользователя: друзья друзей (A·A) и со-подписки (A·Aᵀ·A),
+    нормированные на размер выборки подписчиков общего автора.
+    """
+    own = following.get(user_id, set())
+    scores = defaultdict(float)
+    for author_id in own:
+        for candidate in following.get(author_id, ()):
+            scores[candidate] += FRIEND_OF_FRIEND_WEIGHT
+        co_followers = followers.get(author_id)
+        if not co_followers:
+            continue
+        weight = CO_FOLLOW_WEIGHT / len(co_followers)
+        for other in co_followers:
+            if other == user_id:
+                continue
+            for candidate in following.get(other, ()):
+                scores[candidate] += weight
+    scores.pop(user_id, None)
+    for author_id in own:
+        scores.pop(author_id, None)
+    return scores
+
+
+def build_recommendations(top_k=None, batch_size=None):
+    """
+    Пересчитывает рекомендации для всех подписчиков пачками: граф
+    подписок читается по частям, нужным очередной пачке.
+    Возвращает количество обработанных пользователей.
+    """
+    top_k = top_k or s.RECOMMENDATIONS_QTY
+    batch_size = batch_size or s.RECOMMENDATIONS_BATCH
+    user_ids = (Follow.objects.order_by('user_id')
+                .values_list('user_id', flat=True).distinct())
+    processed, last_id = 0, 0
+    while True:
+        batch = list(user_ids.filter(user_id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1]
+        processed += len(batch)
+        following, followers = load_neighbourhood(batch)
+        rows = []
+        for user_id in batch:
+            scores = score_user(user_id, following, followers)
+            best = nlargest(top_k, scores.items(), key=lambda item: item[1])
+            rows.extend(
+                Recommendation(user_id=user_id, author_id=author_id,
+                               score=score)
+                for author_id, score in best
+            )
+        with transaction.atomic():
+            Recommendation.objects.filter(user_id__in=batch).delete()
+            Recommendation.objects.bulk_create(rows, batch_size=batch_size)
+    Recommendation.objects.filter(
+        ~Exists(Follow.objects.filter(user=OuterRef('user')))
+    ).delete()
+    return processed
+
+
+def get_recommendations(user):
+    """Готовые рекомендации пользователя одним индексным запросом."""
+    if not user.is_authenticated:
+        return []
+    return (Recommendation.objects.filter(user=user)
+            .select_related('author')[:s.RECOMMENDATIONS_QTY])
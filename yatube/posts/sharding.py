@@ -0,0 +1,224 @@
+import heapq
+from itertools import islice
+from operator import attrgetter
+
+from django.conf import settings as s
+from django.db import DEFAULT_DB_ALIAS, models, router
+
+# Модели постов живут на шарде автора; пользователи, группы и подписки
+# копируются на все шарды, чтобы JOIN и внешние ключи оставались
+# внутри одной базы.
+SHARDED = {
+    ('posts', 'post'), ('posts', 'comment'), ('posts', 'hotpost'),
+    ('posts', 'archivedpost'), ('posts', 'archivedcomment'),
+}
+REPLICATED = {
+    ('auth', 'user'), ('posts', 'group'), ('posts', 'follow'),
+}
+SHARD_APPS = {'auth', 'contenttypes'}
+# Строки, которые пишутся на шард своего поста, а не автора.
+FOLLOW_POST = {('posts', 'comment'), ('posts', 'hotpost')}
+
+
+def model_key(model):
+    # Работает и для экземпляров, в том числе для ленивого request.user.
+    return model._meta.app_label, model._meta.model_name
+
+
+def shards():
+    return list(s.SHARDS) or [DEFAULT_DB_ALIAS]
+
+
+def enabled():
+    return shards() != [DEFAULT_DB_ALIAS]
+
+
+def is_sharded(model):
+    return enabled() and model_key(model) in SHARDED
+
+
+def jump_hash(key, buckets):
+    """
+    Jump consistent hash (Lamping, Veach): при добавлении шарда
+    переезжает только ~1/N ключей.
+    """
+    bucket, candidate = -1, 0
+    while candidate < buckets:
+        bucket = candidate
+        key = (key * 2862933555777941757 + 1) % 2 ** 64
+        candidate = int((bucket + 1) * (2 ** 31 / ((key >> 33) + 1)))
+    return bucket
+
+
+def shard_for(author_id, aliases=None):
+    aliases = aliases or shards()
+    return aliases[jump_hash(author_id, len(aliases))]
+
+
+def locate(post_id):
+    """Шард поста по каталогу идентификаторов."""
+    if not enabled():
+        return DEFAULT_DB_ALIAS
+    from .models import Directory
+    return (Directory.objects.filter(pk=post_id)
+            .values_list('shard', flat=True).first() or DEFAULT_DB_ALIAS)
+
+
+def scatter(queryset):
+    """
+    Один и тот же запрос на каждом шарде. Запрос, уже привязанный
+    к шарду (author.posts, post.comments), идёт только туда, а запрос
+    к копируемым таблицам — только в default.
+    """
+    if not enabled() or model_key(queryset.model) not in SHARDED:
+        return [queryset]
+    pinned = queryset._db or ShardRouter().db_for_read(
+        queryset.model, **queryset._hints)
+    if pinned:
+        return [queryset.using(pinned)]
+    return [queryset.using(alias) for alias in shards()]
+
+
+class ShardedQuerySet(models.QuerySet):
+    def create(self, **kwargs):
+        """
+        Как QuerySet.create, но шард выбирается по самой строке:
+        у пустого Post.objects нет подсказки, куда писать.
+        """
+        obj = self.model(**kwargs)
+        self._for_write = True
+        obj.save(force_insert=True, using=self._db or router.db_for_write(
+            self.model, instance=obj))
+        return obj
+
+
+class ShardedList:
+    """
+    Список для Paginator поверх всех шардов: с каждого шарда берётся
+    не больше stop строк, уже отсортированных базой, и они сливаются
+    k-way merge по ключу сортировки.
+    """
+
+    def __init__(self, queryset, key=attrgetter('pub_date', 'pk'),
+                 reverse=True):
+        self.querysets = scatter(queryset)
+        self.key = key
+        self.reverse = reverse
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if len(self.querysets) == 1:
+            return self.querysets[0][key]
+        start, stop = key.start or 0, key.stop
+        merged = heapq.merge(
+            *(queryset[:stop] for queryset in self.querysets),
+            key=self.key, reverse=self.reverse,
+        )
+        return list(islice(merged, start, stop))
+
+
+def replicate(instance):
+    """Копирует строку из default на все остальные шарды."""
+    model = type(instance)
+    values = {field.attname: getattr(instance, field.attname)
+              for field in model._meta.concrete_fields}
+    for alias in shards():
+        if alias == DEFAULT_DB_ALIAS:
+            continue
+        rows = model._base_manager.using(alias)
+        if not rows.filter(pk=instance.pk).update(**values):
+            rows.bulk_create([model(**values)])
+
+
+def unreplicate(instance):
+    for alias in shards():
+        if alias != DEFAULT_DB_ALIAS:
+            type(instance)._base_manager.using(alias).filter(
+                pk=instance.pk).delete()
+
+
+def plan_moves(rows, aliases):
+    """
+    Какие посты лежат не на своём шарде: по строкам (шард, id, автор)
+    возвращает {(откуда, куда): [id, ...]}.
+    """
+    moves = {}
+    for alias, pk, author_id in rows:
+        target = shard_for(author_id, aliases)
+        if target != alias:
+            moves.setdefault((alias, target), []).append(pk)
+    return moves
+
+
+class ShardRouter:
+    """
+    Маршрутизатор шардов по автору. Пока SHARDS пуст, ничего
+    не решает и всё идёт в default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not enabled() or model_key(model) not in SHARDED:
+            return None
+        instance = hints.get('instance')
+        if instance is None:
+            return None
+        if model_key(instance) == ('auth', 'user'):
+            # author.posts, author.archived_posts — шард автора.
+            return shard_for(instance.pk)
+        if model_key(instance) in SHARDED:
+            return instance._state.db
+        return None
+
+    def db_for_write(self, model, **hints):
+        if not enabled():
+            return None
+        if model_key(model) not in SHARDED:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get('instance')
+        if instance is None:
+            return None
+        if isinstance(instance, model):
+            if instance._state.adding:
+                # _state.db новой строки уже мог выставить FK __set__
+                # (post.group = ..., comment.author = ...) по связанному
+                # объекту; шард решают автор поста и пост комментария.
+                return shard_of(instance) or instance._state.db
+            return instance._state.db
+        # post.comments.create(), author.posts.create().
+        return self.db_for_read(model, **hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if not enabled():
+            return None
+        keys = {model_key(obj1), model_key(obj2)}
+        if REPLICATED & keys:
+            return True
+        if ('posts', 'post') in keys and keys & FOLLOW_POST:
+            # Комментарий и рейтинг при записи уходят на шард поста.
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if not enabled() or db == DEFAULT_DB_ALIAS:
+            return None
+        if app_label in SHARD_APPS:
+            return True
+        return (app_label, model_name) in SHARDED | REPLICATED
+
+
+def shard_of(instance):
+    """Куда писать новую строку: пост — к автору, остальное — к посту."""
+    from .models import Comment, HotPost, Post
+    if isinstance(instance, Post):
+        # До назначения автора (проверка формы) шард ещё неизвестен.
+        return instance.author_id and shard_for(instance.author_id)
+    if isinstance(instance, (Comment, HotPost)):
+        if type(instance).post.is_cached(instance):
+            return instance.post._state.db
+        return locate(instance.post_id)
+    return None
@@ -0,0 +1,157 @@
+from functools import partial
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_save)
+from django.dispatch import Signal, receiver
+
+from core import blobs
+
+from . import hot, live, notifications, sharding, sitemaps
+from .models import (ArchivedPost, Comment, Directory, Follow, Group, Post,
+                     User)
+from .utils import bump_version
+
+# Отправляется при редактировании поста; changed_fields — множество
+# имён изменённых полей, чтобы кэши сбрасывались выборочно.
+post_changed = Signal()
+
+FEED_FIELDS = {'text', 'group'}
+
+
+@receiver(post_save, sender=Post)
+def post_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        hot.register_post(instance)
+        transaction.on_commit(partial(live.publish_post, instance),
+                              using=kwargs['using'])
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        hot.register_comment(instance)
+        transaction.on_commit(
+            partial(notifications.record_comment, instance),
+            using=kwargs['using'])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_sitemap_changed(sender, instance, **kwargs):
+    sitemaps.invalidate('posts', instance.pk)
+    sitemaps.invalidate('profiles', instance.author_id)
+
+
+@receiver(post_changed, sender=Post)
+def post_sitemap_edited(sender, instance, **kwargs):
+    # Правка меняет lastmod поста в его сегменте.
+    sitemaps.invalidate('posts', instance.pk)
+
+
+@receiver(post_changed, sender=Post)
+def post_feed_changed(sender, instance, changed_fields, **kwargs):
+    if changed_fields & FEED_FIELDS:
+        bump_version('feed')
+
+
+@receiver(post_delete, sender=Post)
+def post_feed_deleted(sender, instance, **kwargs):
+    bump_version('feed')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_sitemap_changed(sender, instance, **kwargs):
+    sitemaps.invalidate('groups', instance.pk)
+
+
+@receiver(post_init, sender=User)
+def remember_username(sender, instance, **kwargs):
+    # None — поле не загружено (only()).
+    instance._saved_username = instance.__dict__.get('username')
+
+
+@receiver(post_save, sender=User)
+def profile_sitemap_saved(sender, instance, created, **kwargs):
+    """
+    В разделе профилей только id и username, поэтому вход
+    (update_fields={'last_login'}) и другие правки его не сбрасывают.
+    """
+    old, instance._saved_username = (instance._saved_username,
+                                     instance.__dict__.get('username'))
+    if created or old != instance._saved_username:
+        sitemaps.invalidate('profiles', instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def profile_sitemap_deleted(sender, instance, **kwargs):
+    sitemaps.invalidate('profiles', instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def allocate_id(sender, instance, raw=False, **kwargs):
+    """На шардах id выдаёт общий каталог, а не автоинкремент шарда."""
+    if instance.pk is None and not raw and sharding.enabled():
+        instance.pk = Directory.objects.create(
+            kind=sender._meta.model_name,
+            shard=sharding.shard_of(instance),
+        ).pk
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=Follow)
+def replicate_saved(sender, instance, using, **kwargs):
+    if sharding.enabled() and using == DEFAULT_DB_ALIAS:
+        sharding.replicate(instance)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=Follow)
+def replicate_deleted(sender, instance, using, **kwargs):
+    if sharding.enabled() and using == DEFAULT_DB_ALIAS:
+        sharding.unreplicate(instance)
+
+
+def image_name(value):
+    return getattr(value, 'name', value) or ''
+
+
+@receiver(post_init, sender=Post)
+@receiver(post_init, sender=ArchivedPost)
+def remember_image(sender, instance, **kwargs):
+    # Сырое значение без FieldFile; None — поле не загружено (only()).
+    instance._saved_image = (image_name(instance.__dict__['image'])
+                             if 'image' in instance.__dict__ else None)
+
+
+def image_replaced(instance):
+    new = image_name(instance.image)
+    old, instance._saved_image = instance._saved_image, new
+    if old is not None and old != new:
+        blobs.retain(new)
+        blobs.release(old)
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender, instance, created, raw=False, **kwargs):
+    if created:
+        instance._saved_image = image_name(instance.image)
+        blobs.retain(instance._saved_image)
+    elif not raw:
+        image_replaced(instance)
+
+
+@receiver(post_changed, sender=Post)
+def post_image_changed(sender, instance, changed_fields, **kwargs):
+    if 'image' in changed_fields:
+        image_replaced(instance)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ArchivedPost)
+def post_image_deleted(sender, instance, **kwargs):
+    blobs.release(image_name(instance.image))
@@ -0,0 +1,263 @@
+import heapq
+from itertools import groupby
+from operator import itemgetter
+
+from django.conf import settings as s
+from django.core.cache import cache
+from django.db.models import Exists, F, Max, OuterRef
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import escape
+
+from .models import ArchivedPost, Group, Post, User
+from .sharding import scatter, shards
+from .utils import bump_version, cached_stream, get_version
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+CONTENT_TYPE = 'application/xml; charset=utf-8'
+
+
+class Section:
+    """Раздел карты сайта, нарезанный на сегменты по диапазонам id."""
+    fields = ('id', )
+
+    def queryset(self):
+        raise NotImplementedError
+
+    def querysets(self):
+        return scatter(self.queryset())
+
+    def location(self, row):
+        raise NotImplementedError
+
+    def lastmod(self, row):
+        return None
+
+    def segments(self):
+        """Номера сегментов и дата их последнего изменения."""
+        max_ids = [queryset.aggregate(max_id=Max('id'))['max_id']
+                   for queryset in self.querysets()]
+        max_id = max((value for value in max_ids if value is not None),
+                     default=None)
+        if max_id is None:
+            return []
+        return [(number, None)
+                for number in range(max_id // s.SITEMAP_SEGMENT_SIZE + 1)]
+
+    def is_empty(self, segment):
+        start = segment * s.SITEMAP_SEGMENT_SIZE
+        return not any(
+            queryset.filter(id__gte=start,
+                            id__lt=start + s.SITEMAP_SEGMENT_SIZE).exists()
+            for queryset in self.querysets()
+        )
+
+    def rows(self, segment):
+        """
+        Строки сегмента со всех шардов, слитые по id. Копии одной
+        строки на разных шардах отдаются один раз.
+        """
+        merged = heapq.merge(*(self.shard_rows(queryset, segment)
+                               for queryset in self.querysets()))
+        for _, copies in groupby(merged, key=itemgetter(0)):
+            yield next(copies)
+
+    def shard_rows(self, queryset, segment):
+        """Keyset-обход сегмента пачками без OFFSET."""
+        last_id = segment * s.SITEMAP_SEGMENT_SIZE - 1
+        end_id = (segment + 1) * s.SITEMAP_SEGMENT_SIZE
+        while True:
+            batch = list(
+                queryset
+                .filter(id__gt=last_id, id__lt=end_id)
+                .order_by('id')
+                .values_list(*self.fields)[:s.SITEMAP_BATCH]
+            )
+            yield from batch
+            if len(batch) < s.SITEMAP_BATCH:
+                return
+            last_id = batch[-1][0]
+
+
+class PostSection(Section):
+    fields = ('id', 'updated')
+    # Поле, по которому считается lastmod: правка поста меняет его.
+    modified = 'updated'
+
+    def queryset(self):
+        return Post.objects.all()
+
+    def location(self, row):
+        return reverse('posts:post_detail', args=[row[0]])
+
+    def lastmod(self, row):
+        return row[1]
+
+    def segments(self):
+        segments = {}
+        for queryset in self.querysets():
+            for segment, lastmod in (
+                queryset.order_by()
+                .annotate(segment=F('id') / s.SITEMAP_SEGMENT_SIZE)
+                .values('segment')
+                .annotate(lastmod=Max(self.modified))
+                .values_list('segment', 'lastmod')
+            ):
+                segments[segment] = max(lastmod,
+                                        segments.get(segment, lastmod))
+        return sorted(segments.items())
+
+
+class ArchivedPostSection(PostSection):
+    # Архивные посты не редактируются.
+    fields = ('id', 'pub_date')
+    modified = 'pub_date'
+
+    def queryset(self):
+        return ArchivedPost.objects.all()
+
+
+class GroupSection(Section):
+    fields = ('id', 'slug')
+
+    def queryset(self):
+        return Group.objects.all()
+
+    def location(self, row):
+        return reverse('posts:group_list', args=[row[1]])
+
+
+class ProfileSection(Section):
+    fields = ('id', 'username')
+
+    def queryset(self):
+        return User.objects.filter(
+            Exists(Post.objects.filter(author=OuterRef('pk')))
+            | Exists(ArchivedPost.objects.filter(author=OuterRef('pk')))
+        )
+
+    def querysets(self):
+        # Пользователи есть на каждом шарде, а посты — только у своего.
+        return [self.queryset().using(alias) for alias in shards()]
+
+    def location(self, row):
+        return reverse('posts:profile', args=[row[1]])
+
+
+SECTIONS = {
+    'posts': PostSection(),
+    'archive': ArchivedPostSection(),
+    'groups': GroupSection(),
+    'profiles': ProfileSection(),
+}
+
+
+def segment_key(section, segment):
+    return f'sitemap:{section}:{segment}'
+
+
+def segments_key(section):
+    key = f'sitemap:segments:{section}'
+    return f'{key}:{get_version(key)}'
+
+
+def touched_key(section, segment):
+    return f'sitemap:touched:{section}:{segment}'
+
+
+def cached_segments(section):
+    """
+    Сегменты раздела и их lastmod. Полный GROUP BY по таблице
+    выполняется, только когда сегмент появился или опустел.
+    """
+    return cache.get_or_set(
+        segments_key(section), lambda: dict(SECTIONS[section].segments()),
+        s.SITEMAP_CACHE_TIMEOUT,
+    )
+
+
+def invalidate(section, *pks):
+    """
+    Сбрасывает сегменты, в диапазон которых попали объекты, и отмечает
+    время их изменения для lastmod индекса. Список сегментов
+    пересобирается, только если сегмент появился или опустел.
+    """
+    segments = {pk // s.SITEMAP_SEGMENT_SIZE for pk in pks}
+    for segment in segments:
+        bump_version(segment_key(section, segment))
+    now = timezone.now()
+    cache.set_many({touched_key(section, segment): now
+                    for segment in segments}, s.SITEMAP_CACHE_TIMEOUT)
+    known = cache.get(segments_key(section))
+    if known is None:
+        return
+    if (segments - known.keys()
+            or any(map(SECTIONS[section].is_empty, segments))):
+        bump_version(f'sitemap:segments:{section}')
+
+
+def cached_response(request, key, chunks):
+    cache_key = f'{key}:{request.get_host()}:{get_version(key)}'
+    content = cache.get(cache_key)
+    if content is not None:
+        return HttpResponse(content, content_type=CONTENT_TYPE)
+    return StreamingHttpResponse(
+        cached_stream(chunks, cache_key, s.SITEMAP_CACHE_TIMEOUT),
+        content_type=CONTENT_TYPE,
+    )
+
+
+def index_content(request):
+    """
+    Индекс собирается на каждый запрос из закэшированных списков
+    сегментов: lastmod сегмента — позднее из значения в базе и
+    последней отметки invalidate.
+    """
+    entries = [f'{XML_HEADER}<sitemapindex {XMLNS}>\n']
+    for name in SECTIONS:
+        segments = cached_segments(name)
+        keys = {touched_key(name, segment): segment for segment in segments}
+        touched = {keys[key]: moment
+                   for key, moment in cache.get_many(keys).items()}
+        for segment, lastmod in sorted(segments.items()):
+            lastmod = max(
+                (moment for moment in (lastmod, touched.get(segment))
+                 if moment),
+                default=None,
+            )
+            location = request.build_absolute_uri(
+                reverse('posts:sitemap_section', args=[name, segment])
+            )
+            entry = f'<sitemap><loc>{escape(location)}</loc>'
+            if lastmod:
+                entry += f'<lastmod>{lastmod.isoformat()}</lastmod>'
+            entries.append(entry + '</sitemap>\n')
+    entries.append('</sitemapindex>\n')
+    return ''.join(entries)
+
+
+def section_chunks(request, section, segment):
+    yield f'{XML_HEADER}<urlset {XMLNS}>\n'
+    for row in section.rows(segment):
+        location = request.build_absolute_uri(section.location(row))
+        entry = f'<url><loc>{escape(location)}</loc>'
+        lastmod = section.lastmod(row)
+        if lastmod:
+            entry += f'<lastmod>{lastmod.isoformat()}</lastmod>'
+        yield entry + '</url>\n'
+    yield '</urlset>\n'
+
+
+def index_response(request):
+    return HttpResponse(index_content(request), content_type=CONTENT_TYPE)
+
+
+def section_response(request, section, segment):
+    if section not in SECTIONS:
+        raise Http404
+    return cached_response(
+        request, segment_key(section, segment),
+        section_chunks(request, SECTIONS[section], segment),
+    )
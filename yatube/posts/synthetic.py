@@ -0,0 +1,203 @@
+import random
+import re
+from contextlib import contextmanager
+from datetime import timedelta
+from io import BytesIO
+from itertools import accumulate
+
+from django.conf import settings as s
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from core import blobs
+
+from . import sitemaps
+from .models import Comment, Follow, Group, Post, User
+
+WORDS = (
+    'яндекс практикум пост лента подписка автор группа новость '
+    'сегодня вчера город книга музыка кино погода работа код '
+    'питон джанго тест база данные кэш очередь запрос ответ'
+).split()
+
+
+@contextmanager
+def no_auto_now(*fields):
+    """Временно отключает auto_now_add, чтобы записать свои даты."""
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field, _ in saved:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in saved:
+            field.auto_now_add = value
+
+
+def zipf_weights(count, exponent):
+    """Накопленные веса закона Ципфа для рангов 1..count."""
+    return list(accumulate(1 / rank ** exponent
+                           for rank in range(1, count + 1)))
+
+
+def sentence(rng, words):
+    return ' '.join(rng.choices(WORDS, k=words)).capitalize()
+
+
+def chunks(total, size):
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+class Generator:
+    """
+    Заполняет базу синтетическими данными пачками через bulk_create.
+    При одинаковом seed содержимое повторяется.
+    """
+
+    def __init__(self, seed=0, batch_size=None, prefix='user',
+                 zipf_exponent=1.1, days=365, log=None):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.batch_size = batch_size or s.SYNTHETIC_BATCH
+        self.prefix = prefix
+        self.zipf_exponent = zipf_exponent
+        self.days = days
+        self.log = log or (lambda message: None)
+        self.user_ids = []
+        self.group_ids = []
+        self.images = []
+
+    def users(self, count, password='password'):
+        hashed = make_password(password)
+        for start, size in chunks(count, self.batch_size):
+            User.objects.bulk_create(
+                User(username=f'{self.prefix}{number}', password=hashed)
+                for number in range(start, start + size)
+            )
+            self.log(f'Пользователи: {start + size}/{count}')
+        self.user_ids = list(
+            User.objects
+            .filter(username__regex=rf'^{re.escape(self.prefix)}\d+$')
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        sitemaps.invalidate('profiles', *self.segment_pks(self.user_ids))
+
+    def groups(self, count):
+        Group.objects.bulk_create(
+            Group(
+                title=f'Группа {self.prefix} {number}',
+                slug=f'{self.prefix}-{self.seed}-{number}'[:30],
+                description=sentence(self.rng, 12),
+            )
+            for number in range(count)
+        )
+        self.group_ids = list(
+            Group.objects.filter(slug__startswith=f'{self.prefix}-'
+                                                  f'{self.seed}-')
+            .values_list('pk', flat=True)
+        )
+        sitemaps.invalidate('groups', *self.group_ids)
+
+    def image_variants(self, count):
+        """Несколько общих картинок, чтобы не писать файл на каждый пост."""
+        for number in range(count):
+            buffer = BytesIO()
+            color = tuple(self.rng.randrange(256) for _ in range(3))
+            Image.new('RGB', (960, 640), color).save(buffer, 'JPEG')
+            self.images.append(default_storage.save(
+                f'posts/synthetic-{self.seed}-{number}.jpg',
+                ContentFile(buffer.getvalue()),
+            ))
+
+    def posts(self, count, comments_per_post=0, group_share=0.5,
+              image_share=0.0):
+        """
+        Посты с авторством по закону Ципфа: немногие авторы пишут
+        большую часть ленты. Комментарии создаются той же пачкой.
+        """
+        authors = zipf_weights(len(self.user_ids), self.zipf_exponent)
+        end = timezone.now()
+        step = timedelta(days=self.days) / max(count, 1)
+        start_date = end - step * count
+        first_pk = last_pk = None
+        date_fields = (Post._meta.get_field('pub_date'),
+                       Comment._meta.get_field('created'))
+        with no_auto_now(*date_fields):
+            for start, size in chunks(count, self.batch_size):
+                author_ids = self.rng.choices(
+                    self.user_ids, cum_weights=authors, k=size)
+                batch = [
+                    Post(
+                        author_id=author_id,
+                        text=sentence(self.rng, self.rng.randint(5, 40)),
+                        pub_date=start_date + step * (start + offset),
+                        group_id=(
+                            self.rng.choice(self.group_ids)
+                            if self.group_ids
+                            and self.rng.random() < group_share else None
+                        ),
+                        image=(
+                            self.rng.choice(self.images)
+                            if self.images
+                            and self.rng.random() < image_share else ''
+                        ),
+                    )
+                    for offset, author_id in enumerate(author_ids)
+                ]
+                with transaction.atomic():
+                    Post.objects.bulk_create(batch)
+                    blobs.retain(*(post.image.name for post in batch))
+                    if comments_per_post:
+                        self.comments(batch, comments_per_post, step)
+                if batch[0].pk is not None:
+                    first_pk = first_pk or batch[0].pk
+                    last_pk = batch[-1].pk
+                self.log(f'Посты: {start + size}/{count}')
+        if first_pk is not None:
+            sitemaps.invalidate(
+                'posts', *self.segment_pks(range(first_pk, last_pk + 1)))
+
+    def comments(self, posts, per_post, step):
+        if posts[0].pk is None:
+            return
+        total = round(len(posts) * per_post)
+        Comment.objects.bulk_create(
+            Comment(
+                post_id=post.pk,
+                author_id=self.rng.choice(self.user_ids),
+                text=sentence(self.rng, self.rng.randint(3, 15)),
+                created=post.pub_date + step * self.rng.random(),
+            )
+            for post in self.rng.choices(posts, k=total)
+        )
+
+    def follows(self, per_user):
+        """Подписки тоже тянутся к популярным авторам."""
+        authors = zipf_weights(len(self.user_ids), self.zipf_exponent)
+        per_user = min(per_user, len(self.user_ids) - 1)
+        for start, size in chunks(len(self.user_ids), self.batch_size):
+            batch = []
+            for user_id in self.user_ids[start:start + size]:
+                followed = set()
+                while len(followed) < per_user:
+                    followed.update(self.rng.choices(
+                        self.user_ids, cum_weights=authors,
+                        k=per_user - len(followed)))
+                    followed.discard(user_id)
+                batch.extend(Follow(user_id=user_id, author_id=author_id)
+                             for author_id in sorted(followed))
+            Follow.objects.bulk_create(batch)
+            self.log(f'Подписки: {start + size}/{len(self.user_ids)}')
+
+    @staticmethod
+    def segment_pks(pks):
+        """По одному pk на каждый затронутый сегмент карты сайта."""
+        if not pks:
+            return []
+        return [*range(pks[0], pks[-1], s.SITEMAP_SEGMENT_SIZE),
+                pks[-1]]
@@ -0,0 +1,28 @@
+from datetime import timedelta
+
+from tasks.queue import task
+
+from .archive import archive_posts as archive
+from .hot import decay
+from .notifications import build_digests
+from .recommendations import build_recommendations
+
+
+@task(every=timedelta(hours=1))
+def decay_hot_posts():
+    decay()
+
+
+@task(every=timedelta(days=1))
+def rebuild_recommendations():
+    build_recommendations()
+
+
+@task(every=timedelta(days=1))
+def archive_posts():
+    archive()
+
+
+@task(every=timedelta(minutes=15))
+def build_notification_digests():
+    build_digests()
@@ -0,0 +1,83 @@
+from django.contrib.admin.models import DELETION, LogEntry
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..utils import get_version
+
+User = get_user_model()
+SIGNED_COOKIES = 'django.contrib.sessions.backends.signed_cookies'
+
+
+@override_settings(ADMIN_BATCH_SIZE=2, SESSION_ENGINE=SIGNED_COOKIES)
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='admin-pass')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        Post.objects.bulk_create(
+            Post(author=cls.admin, text=f'Пост {i}') for i in range(5)
+        )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+
+    def test_changelist_queries_do_not_grow(self):
+        """Число запросов списка постов не зависит от числа строк."""
+        self.client.get(self.url)
+        # Первый запрос — загрузка request.user.
+        with self.assertNumQueries(6):
+            self.client.get(self.url)
+        Post.objects.bulk_create(
+            Post(author=self.admin, group=self.group, text='Ещё пост')
+            for _ in range(5)
+        )
+        with self.assertNumQueries(6):
+            self.client.get(self.url)
+
+    def test_reassign_group_in_batches(self):
+        """Действие переносит выбранные посты в группу и сбрасывает кэши."""
+        pks = list(Post.objects.values_list('pk', flat=True))
+        version = get_version('feed')
+        self.client.post(self.url, {
+            'action': 'reassign_group',
+            '_selected_action': pks,
+            'group': self.group.pk,
+        })
+        self.assertEqual(self.group.posts.count(), len(pks))
+        self.assertGreater(get_version('feed'), version)
+
+    def test_reassign_without_group_keeps_posts(self):
+        """Без выбранной группы посты остаются на месте."""
+        Post.objects.update(group=self.group)
+        pks = list(Post.objects.values_list('pk', flat=True))
+        response = self.client.post(self.url, {
+            'action': 'reassign_group',
+            '_selected_action': pks,
+            'group': '',
+        }, follow=True)
+        self.assertContains(response, 'Выберите группу')
+        self.client.post(self.url, {
+            'action': 'reassign_group',
+            '_selected_action': pks,
+            'group': 999,
+        })
+        self.assertEqual(self.group.posts.count(), len(pks))
+
+    def test_delete_in_batches(self):
+        """Удаление после подтверждения, с записями в журнале."""
+        pks = list(Post.objects.values_list('pk', flat=True))
+        data = {'action': 'delete_in_batches', '_selected_action': pks}
+        response = self.client.post(self.url, data)
+        self.assertTemplateUsed(
+            response, 'admin/delete_in_batches_confirmation.html')
+        self.assertEqual(Post.objects.count(), len(pks))
+        self.client.post(self.url, {**data, 'post': 'yes'})
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(
+            LogEntry.objects.filter(action_flag=DELETION).count(), len(pks))
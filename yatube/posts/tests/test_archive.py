@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_posts
+from ..models import ArchivedPost, Comment, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(PAGINATOR=2, ARCHIVE_BATCH=2)
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.old_posts = [
+            Post.objects.create(author=cls.author, group=cls.group,
+                                text=f'Старый пост {i}')
+            for i in range(3)
+        ]
+        for days, post in enumerate(cls.old_posts, start=1000):
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.now() - timedelta(days=days))
+        Comment.objects.create(post=cls.old_posts[0], author=cls.author,
+                               text='Старый комментарий')
+        cls.new_post = Post.objects.create(author=cls.author,
+                                           group=cls.group, text='Новый пост')
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_old_posts_moved(self):
+        """Старые посты с комментариями переезжают в архив пачками."""
+        self.assertEqual(archive_posts(days=365), 3)
+        self.assertEqual(list(Post.objects.all()), [self.new_post])
+        self.assertEqual(ArchivedPost.objects.count(), 3)
+        archived = ArchivedPost.objects.get(pk=self.old_posts[0].pk)
+        self.assertEqual(archived.comments.get().text, 'Старый комментарий')
+
+    def test_post_detail_falls_back_to_archive(self):
+        """Архивный пост открывается по прежнему адресу."""
+        archive_posts(days=365)
+        post = self.old_posts[0]
+        response = self.client.get(reverse('posts:post_detail',
+                                           args=[post.pk]))
+        self.assertEqual(response.context['post'].text, post.text)
+        self.assertTrue(response.context['archived'])
+        self.assertEqual(len(response.context['comments']), 1)
+
+    def test_feeds_continue_into_archive(self):
+        """Профиль и группа листаются дальше в архив без потерь."""
+        archive_posts(days=365)
+        urls = (
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:group_list', args=[self.group.slug]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                texts = []
+                for page in (1, 2):
+                    response = self.client.get(url, {'page': page})
+                    texts += [post.text
+                              for post in response.context['page_obj']]
+                self.assertEqual(texts, ['Новый пост', 'Старый пост 0',
+                                         'Старый пост 1', 'Старый пост 2'])
@@ -0,0 +1,64 @@
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..signals import post_changed
+
+
+class PostEditTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.post = Post.objects.create(author=cls.author, text='Текст',
+                                       group=cls.group)
+        cls.url = reverse('posts:post_edit', args=[cls.post.pk])
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.author)
+        self.events = []
+        post_changed.connect(self.record, sender=Post)
+        self.addCleanup(post_changed.disconnect, self.record, sender=Post)
+
+    def record(self, sender, instance, changed_fields, **kwargs):
+        self.events.append(changed_fields)
+
+    def edit(self, **data):
+        return self.client.post(self.url, {
+            'text': 'Текст', 'group': self.group.pk, 'version': 1, **data,
+        })
+
+    def test_unchanged_post_is_not_written(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.edit()
+        self.assertFalse([query for query in queries.captured_queries
+                          if query['sql'].startswith('UPDATE')])
+        self.assertEqual(self.events, [])
+
+    def test_only_changed_fields_written(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.edit(text='Новый текст')
+        [update] = [query['sql'] for query in queries.captured_queries
+                    if query['sql'].startswith('UPDATE')]
+        self.assertRedirects(
+            response, reverse('posts:post_detail', args=[self.post.pk]))
+        self.assertIn('"text"', update)
+        self.assertNotIn('"image"', update)
+        self.assertEqual(self.events, [{'text'}])
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertEqual((post.text, post.version), ('Новый текст', 2))
+
+    def test_stale_version_rejected(self):
+        """Правка по устаревшей версии не затирает чужие изменения."""
+        Post.objects.filter(pk=self.post.pk).update(text='Чужая правка',
+                                                    version=2)
+        response = self.edit(text='Моя правка')
+        self.assertTrue(response.context['form'].non_field_errors())
+        self.assertEqual(response.context['form']['version'].value(), 2)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).text,
+                         'Чужая правка')
+        self.assertEqual(self.events, [])
@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.post = Post.objects.create(author=cls.author, group=cls.group,
+                                       text='Пост для ленты')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_feeds_are_streamed(self):
+        """Ленты индекса, группы и профиля отдаются потоком."""
+        urls = (
+            reverse('posts:index_feed', args=['rss']),
+            reverse('posts:group_feed', args=[self.group.slug, 'atom']),
+            reverse('posts:profile_feed', args=[self.author.username,
+                                                'rss']),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.streaming)
+                content = b''.join(response.streaming_content).decode()
+                self.assertIn('Пост для ленты', content)
+
+    def test_unknown_format_not_found(self):
+        response = self.client.get(reverse('posts:index_feed',
+                                           args=['json']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_request(self):
+        """Повторный опрос с ETag получает 304 без тела."""
+        url = reverse('posts:index_feed', args=['atom'])
+        response = self.client.get(url)
+        b''.join(response.streaming_content)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_feed_cached_per_version(self):
+        """Готовая лента берётся из кэша, новый пост меняет версию."""
+        url = reverse('posts:index_feed', args=['rss'])
+        b''.join(self.client.get(url).streaming_content)
+        response = self.client.get(url)
+        self.assertFalse(response.streaming)
+        Post.objects.create(author=self.author, text='Свежий пост')
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        self.assertIn('Свежий пост',
+                      b''.join(response.streaming_content).decode())
+
+    def test_feed_cached_per_host(self):
+        """Ссылки в закэшированной ленте ведут на хост запроса."""
+        url = reverse('posts:index_feed', args=['rss'])
+        b''.join(self.client.get(url).streaming_content)
+        response = self.client.get(url, HTTP_HOST='127.0.0.1')
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('http://127.0.0.1/', content)
+        self.assertNotIn('http://testserver/', content)
@@ -0,0 +1,71 @@
+import re
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_posts
+from ..fragments import decode_cursor, encode_cursor
+from ..models import Post
+
+User = get_user_model()
+MORE_RE = re.compile(r'data-fragment="([^"]+)"')
+
+
+@override_settings(PAGINATOR=2)
+class FragmentTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.posts = [Post.objects.create(author=cls.author, text=f'Пост {i}')
+                     for i in range(5)]
+        for days, post in enumerate(cls.posts):
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=timezone.now() - timedelta(days=days * 300))
+
+    def setUp(self):
+        self.client = Client()
+
+    def scroll(self, url):
+        """Проходит ленту фрагментами, как это делает feed.js."""
+        texts = []
+        while url:
+            content = self.client.get(url).content.decode()
+            texts += re.findall(r'Пост \d', content)
+            match = MORE_RE.search(content)
+            url = match and match.group(1)
+        return texts
+
+    def test_cursor_round_trip(self):
+        post = Post.objects.get(pk=self.posts[1].pk)
+        self.assertEqual(decode_cursor(encode_cursor(post)),
+                         ('p', post.pub_date, post.pk))
+
+    def test_index_fragment_is_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('posts:index_fragment'))
+        self.assertContains(response, 'Пост 0')
+        self.assertNotContains(response, '<footer')
+
+    def test_scroll_from_page_continues_into_archive(self):
+        archive_posts(days=365)
+        page = self.client.get(
+            reverse('posts:profile', args=[self.author.username]))
+        more = MORE_RE.search(page.content.decode()).group(1)
+        self.assertEqual(self.scroll(more),
+                         ['Пост 2', 'Пост 3', 'Пост 4'])
+
+    def test_bad_cursor(self):
+        response = self.client.get(reverse('posts:index_fragment'),
+                                   {'cursor': 'x1-2'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_and_fragment_agree_on_equal_dates(self):
+        """Посты с одинаковым временем не теряются и не повторяются."""
+        Post.objects.update(pub_date=timezone.now())
+        page = self.client.get(reverse('posts:index')).content.decode()
+        more = MORE_RE.search(page).group(1)
+        texts = re.findall(r'Пост \d', page)[:2] + self.scroll(more)
+        self.assertEqual(texts, [f'Пост {i}' for i in range(4, -1, -1)])
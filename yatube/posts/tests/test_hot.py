@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..hot import decay
+from ..models import Comment, HotPost, Post
+
+User = get_user_model()
+
+
+class HotPostTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.quiet_post = Post.objects.create(author=cls.author,
+                                             text='Тихий пост')
+        cls.loud_post = Post.objects.create(author=cls.author,
+                                            text='Обсуждаемый пост')
+
+    def test_new_post_gets_rating(self):
+        """Новый пост сразу попадает в таблицу рейтинга."""
+        self.assertTrue(HotPost.objects.filter(post=self.quiet_post).exists())
+
+    def test_comment_raises_post(self):
+        """Комментарий инкрементально поднимает пост в выдаче."""
+        Comment.objects.create(post=self.loud_post, author=self.author,
+                               text='Комментарий')
+        hot_post = HotPost.objects.first()
+        self.assertEqual(hot_post.post, self.loud_post)
+        self.assertEqual(hot_post.comments_count, 1)
+
+    def test_decay_removes_cold_posts(self):
+        """Затухание снижает рейтинг и убирает остывшие посты."""
+        self.assertEqual(decay(0), 2)
+        self.assertFalse(HotPost.objects.exists())
+
+    def test_hot_page(self):
+        """Страница популярного выдаёт посты по убыванию рейтинга."""
+        Comment.objects.create(post=self.loud_post, author=self.author,
+                               text='Комментарий')
+        response = Client().get(reverse('posts:hot'))
+        posts = [hot.post for hot in response.context['page_obj']]
+        self.assertEqual(posts, [self.loud_post, self.quiet_post])
+
+    def test_comment_revives_cold_post_without_bonus(self):
+        """Остывший пост возвращается с весом комментария, без новизны."""
+        decay(0)
+        Comment.objects.create(post=self.quiet_post, author=self.author,
+                               text='Комментарий')
+        hot_post = HotPost.objects.get(post=self.quiet_post)
+        self.assertEqual(hot_post.score, settings.HOT_COMMENT_WEIGHT)
+        self.assertEqual(hot_post.comments_count, 1)
@@ -0,0 +1,86 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..live import ALL, Broker, broker, group_channel
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class BrokerTests(TestCase):
+    async def test_only_matching_channels_wake_up(self):
+        hub = Broker(history=10)
+        with hub.subscribe({group_channel('cats')}) as cats, \
+                hub.subscribe({group_channel('dogs')}) as dogs:
+            await asyncio.to_thread(
+                hub.publish, {ALL, group_channel('cats')}, {'post': 1})
+            event = await cats.get(timeout=1)
+            self.assertEqual(event[2], {'post': 1})
+            self.assertTrue(dogs.queue.empty())
+        self.assertEqual(dict(hub.channels), {})
+
+    def test_backlog(self):
+        hub = Broker(history=2)
+        for number in range(3):
+            hub.publish({ALL}, {'post': number})
+        self.assertEqual([data['post'] for _, _, data in
+                          hub.backlog({ALL}, 0)], [1, 2])
+        self.assertEqual(hub.backlog({'author:1'}, 0), [])
+
+
+@override_settings(LIVE_KEEPALIVE=0.05)
+class LiveViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Котики', slug='cats',
+                                         description='Котики')
+
+    def create_post(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Post.objects.create(author=self.author, text='Пост',
+                                       group=self.group)
+
+    def test_post_creation_is_published(self):
+        since = broker.last_id
+        post = self.create_post()
+        events = broker.backlog({group_channel('cats')}, since)
+        self.assertEqual(events[-1][2]['post'], post.pk)
+        self.assertIn(f'author:{self.author.pk}', events[-1][1])
+
+    def test_short_poll(self):
+        url = reverse('posts:live_poll')
+        since = self.client.get(url).json()['last']
+        post = self.create_post()
+        data = self.client.get(
+            url, {'feed': 'group:cats', 'since': since}).json()
+        self.assertEqual((data['last'], data['count']), (post.pk, 1))
+        data = self.client.get(
+            url, {'feed': 'group:dogs', 'since': since}).json()
+        self.assertEqual((data['last'], data['count']), (since, 0))
+        self.assertEqual(self.client.get(url, {'feed': 'follow'}).status_code,
+                         400)
+
+    async def test_stream_replays_after_last_event_id(self):
+        since = broker.last_id
+        post = await sync_to_async(self.create_post)()
+        response = await self.async_client.get(
+            reverse('posts:live_stream'), {'feed': 'all'},
+            headers={'Last-Event-ID': str(since)})
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = response.streaming_content
+        self.assertTrue((await anext(chunks)).startswith(b'retry:'))
+        self.assertIn(f'"post": {post.pk}'.encode(), await anext(chunks))
+        self.assertEqual(await anext(chunks), b': keepalive\n\n')
+        await chunks.aclose()
+
+    def test_wsgi_falls_back_to_poll(self):
+        response = self.client.get(reverse('posts:live_stream'))
+        self.assertEqual(response.status_code, 204)
+        response = self.client.get(reverse('posts:live_stream'),
+                                   {'feed': 'follow'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,113 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import blobs
+from core.models import Blob
+
+from ..models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+OTHER_GIF = SMALL_GIF[:-3] + b'\x0B\x00\x3B'
+
+
+def upload(name, content=SMALL_GIF):
+    return SimpleUploadedFile(name, content, content_type='image/gif')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class DedupMediaTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='author')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def refs(self, name):
+        return Blob.objects.get(pk=name).refs
+
+    def test_same_image_is_stored_once(self):
+        for name in ('cat.gif', 'copy-of-cat.gif'):
+            self.client.post(reverse('posts:post_create'),
+                             {'text': name, 'image': upload(name)})
+        first, second = Post.objects.order_by('pk')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r'^posts/[0-9a-f]{2}/'
+                                           r'[0-9a-f]{64}\.gif$')
+        self.assertEqual(
+            len(os.listdir(os.path.dirname(first.image.path))), 1)
+        self.assertEqual(self.refs(first.image.name), 2)
+
+        first.delete()
+        self.assertEqual(self.refs(second.image.name), 1)
+        self.assertEqual(blobs.collect(grace=0), [])
+        second.delete()
+        self.assertEqual(blobs.collect(grace=0), [second.image.name])
+        self.assertFalse(default_storage.exists(second.image.name))
+
+    def test_reupload_protects_released_blob(self):
+        """Повторная загрузка спасает файл без ссылок от сборки мусора."""
+        post = Post.objects.create(author=self.user, text='Пост',
+                                   image=upload('a.gif'))
+        name = post.image.name
+        post.delete()
+        long_ago = timezone.now() - timedelta(days=30)
+        Blob.objects.filter(pk=name).update(released=long_ago)
+        os.utime(default_storage.path(name),
+                 (long_ago.timestamp(), long_ago.timestamp()))
+        self.assertEqual(default_storage.save('posts/b.gif', upload('b.gif')),
+                         name)
+        self.assertEqual(blobs.collect(grace=60), [])
+        self.assertTrue(default_storage.exists(name))
+
+    def test_edit_moves_reference(self):
+        post = Post.objects.create(author=self.user, text='Пост',
+                                   image=upload('a.gif'))
+        old = post.image.name
+        self.client.post(reverse('posts:post_edit', args=[post.pk]), {
+            'text': 'Пост', 'image': upload('b.gif', OTHER_GIF),
+            'version': post.version,
+        })
+        post.refresh_from_db()
+        self.assertNotEqual(post.image.name, old)
+        self.assertEqual(self.refs(old), 0)
+        self.assertEqual(self.refs(post.image.name), 1)
+
+    def test_recount_removes_orphans(self):
+        post = Post.objects.create(author=self.user, text='Пост',
+                                   image=upload('a.gif'))
+        orphan = default_storage.save('posts/orphan.gif',
+                                      upload('b.gif', OTHER_GIF))
+        Blob.objects.all().delete()
+        call_command('collect_media', '--recount', '--grace=0',
+                     stdout=StringIO())
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists(post.image.name))
+        self.assertEqual(self.refs(post.image.name), 1)
@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.models import QueuedEmail
+
+from ..models import Comment, Notification, NotificationEvent, Post
+from ..notifications import build_digests
+
+User = get_user_model()
+
+
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author',
+                                              email='author@yatube.com')
+        cls.readers = [User.objects.create_user(username=f'reader{number}')
+                       for number in range(5)]
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def comment(self, user):
+        # Событие пишется в журнал после коммита комментария.
+        with self.captureOnCommitCallbacks(execute=True):
+            return Comment.objects.create(post=self.post, author=user,
+                                          text='Комментарий')
+
+    def test_comment_appends_event(self):
+        with self.captureOnCommitCallbacks():
+            Comment.objects.create(post=self.post, author=self.readers[1],
+                                   text='Комментарий')
+        self.assertFalse(NotificationEvent.objects.exists())
+        self.comment(self.readers[0])
+        self.comment(self.author)
+        self.assertEqual(
+            list(NotificationEvent.objects.values_list('recipient', 'actor')),
+            [(self.author.pk, self.readers[0].pk)])
+
+    def test_events_are_merged_into_one_digest(self):
+        for reader in self.readers[:2] + self.readers[:2]:
+            self.comment(reader)
+        self.assertEqual(build_digests(batch_size=3), (4, 0))
+        digest = Notification.objects.get()
+        self.assertEqual(digest.count, 4)
+        self.assertEqual(digest.actors, ['reader1', 'reader0'])
+        self.assertFalse(digest.more_actors)
+        self.assertEqual(digest.post_text, 'Пост')
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertContains(response, 'от reader1, reader0')
+        self.assertNotContains(response, 'и других')
+
+        for reader in self.readers[2:]:
+            self.comment(reader)
+        build_digests()
+        digest.refresh_from_db()
+        self.assertEqual(digest.count, 7)
+        self.assertEqual(digest.actors, ['reader4', 'reader3', 'reader2'])
+        self.assertTrue(digest.more_actors)
+        self.assertEqual(build_digests(), (0, 0))
+
+    def test_unread_view_and_mark_read(self):
+        self.comment(self.readers[0])
+        build_digests()
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertContains(response, 'комментариев: 1, от reader0')
+        self.client.post(reverse('posts:notifications_read'))
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertContains(response, 'Новых уведомлений нет')
+
+        self.comment(self.readers[1])
+        build_digests()
+        self.assertEqual(Notification.objects.filter(read=False).count(), 1)
+
+    @override_settings(EMAIL_BACKEND='core.mail.QueuedEmailBackend')
+    def test_digest_email_goes_through_queue(self):
+        self.comment(self.readers[0])
+        self.comment(self.readers[1])
+        self.assertEqual(build_digests(email=True), (2, 1))
+        queued = QueuedEmail.objects.get()
+        self.assertEqual(queued.recipients, ['author@yatube.com'])
+        self.assertIn('reader1, reader0', bytes(queued.message).decode())
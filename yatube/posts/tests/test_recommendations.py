@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Recommendation
+from ..recommendations import build_recommendations, sampled_followers
+
+User = get_user_model()
+
+
+class RecommendationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.friend = User.objects.create_user(username='friend')
+        cls.writer = User.objects.create_user(username='writer')
+        cls.stranger = User.objects.create_user(username='stranger')
+        Follow.objects.create(user=cls.reader, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.writer)
+        Follow.objects.create(user=cls.stranger, author=cls.friend)
+        Follow.objects.create(user=cls.stranger, author=cls.writer)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_friend_of_friend_recommended(self):
+        """Автор, на которого подписаны друзья, попадает в рекомендации."""
+        build_recommendations()
+        authors = list(Recommendation.objects.filter(
+            user=self.reader).values_list('author__username', flat=True))
+        self.assertEqual(authors, ['writer'])
+
+    def test_followed_and_self_not_recommended(self):
+        """В рекомендациях нет себя и уже отслеживаемых авторов."""
+        build_recommendations()
+        self.assertFalse(Recommendation.objects.filter(
+            user=self.stranger).exists())
+
+    def test_recommendations_shown_on_follow_index(self):
+        """Рекомендации выводятся в ленте подписок."""
+        build_recommendations()
+        response = self.client.get(reverse('posts:follow_index'))
+        recommendations = response.context['recommendations']
+        self.assertEqual(recommendations[0].author, self.writer)
+
+    def test_follow_removes_recommendation(self):
+        """Подписка убирает автора из рекомендаций."""
+        build_recommendations()
+        self.client.get(reverse('posts:profile_follow',
+                                args=[self.writer.username]))
+        self.assertFalse(Recommendation.objects.filter(
+            user=self.reader, author=self.writer).exists())
+
+    @override_settings(RECOMMENDATIONS_CO_FOLLOWERS=1,
+                       RECOMMENDATIONS_BATCH=1)
+    def test_co_followers_are_sampled(self):
+        """У автора учитываются только последние подписчики."""
+        self.assertEqual(sampled_followers([self.friend.pk]),
+                         {self.friend.pk: {self.stranger.pk}})
+        self.assertEqual(build_recommendations(), 3)
+        self.assertTrue(Recommendation.objects.filter(
+            user=self.reader, author=self.writer).exists())
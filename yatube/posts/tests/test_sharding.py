@@ -0,0 +1,205 @@
+from io import StringIO
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from ..admin import PostAdmin
+from ..models import Comment, Directory, Group, Post
+from ..sharding import (ShardedList, ShardRouter, jump_hash, plan_moves,
+                        shard_for)
+
+User = get_user_model()
+SHARDS = ['default', 'shard1', 'shard2']
+
+
+class FakeQuerySet(list):
+    """Уже отсортированная «выборка одного шарда» для ShardedList."""
+
+    def count(self):
+        return len(self)
+
+
+@override_settings(SHARDS=[])
+class ShardingTests(SimpleTestCase):
+    def test_jump_hash_moves_few_keys(self):
+        before = [jump_hash(key, 3) for key in range(3000)]
+        after = [jump_hash(key, 4) for key in range(3000)]
+        moved = [old for old, new in zip(before, after) if old != new]
+        self.assertTrue(all(new == 3 for old, new in zip(before, after)
+                            if old != new))
+        self.assertLess(len(moved), 3000 * 0.3)
+        self.assertEqual(set(before), {0, 1, 2})
+
+    def test_shard_for_is_stable(self):
+        self.assertEqual(shard_for(7, SHARDS), shard_for(7, SHARDS))
+        self.assertEqual(shard_for(7, ['default']), 'default')
+
+    def test_sharded_list_merges_pages(self):
+        def rows(*dates):
+            return FakeQuerySet(SimpleNamespace(pub_date=date, pk=date)
+                                for date in dates)
+        posts = ShardedList(None)
+        posts.querysets = [rows(9, 6, 2), rows(8, 7, 1), rows(5, 4, 3)]
+        self.assertEqual(posts.count(), 9)
+        self.assertEqual([post.pub_date for post in posts[2:5]],
+                         [7, 6, 5])
+
+    def test_plan_moves(self):
+        rows = [('default', pk, author) for pk, author in
+                enumerate(range(1, 30))]
+        moves = plan_moves(rows, SHARDS)
+        self.assertNotIn(('default', 'default'), moves)
+        for (source, target), ids in moves.items():
+            for pk in ids:
+                self.assertEqual(shard_for(rows[pk][2], SHARDS), target)
+
+    @override_settings(SHARDS=SHARDS)
+    def test_router(self):
+        router = ShardRouter()
+        author = User(pk=5)
+        post = Post(author=author)
+        self.assertEqual(router.db_for_write(Post, instance=post),
+                         shard_for(5))
+        self.assertEqual(router.db_for_read(Post, instance=author),
+                         shard_for(5))
+        post._state.db = 'shard2'
+        comment = Comment(post=post, author=author)
+        self.assertEqual(router.db_for_write(Comment, instance=comment),
+                         'shard2')
+        self.assertEqual(router.db_for_write(Group), 'default')
+        self.assertTrue(router.allow_migrate('shard1', 'posts', 'post'))
+        self.assertFalse(router.allow_migrate('shard1', 'posts',
+                                              'recommendation'))
+
+    def test_router_is_idle_without_shards(self):
+        self.assertIsNone(ShardRouter().db_for_write(
+            Post, instance=Post(author=User(pk=5))))
+
+
+@override_settings(SHARDS=SHARDS)
+class ShardedDatabaseTests(TestCase):
+    databases = set(SHARDS)
+
+    @classmethod
+    def setUpTestData(cls):
+        # По автору на каждый шард; копии пользователей и группы
+        # расходятся по шардам сигналами.
+        cls.authors = {}
+        number = 0
+        while len(cls.authors) < len(SHARDS):
+            number += 1
+            user = User.objects.create_user(username=f'author{number}')
+            cls.authors.setdefault(shard_for(user.pk), user)
+        cls.group = Group.objects.create(title='Группа', slug='group')
+
+    def setUp(self):
+        cache.clear()
+
+    def client_for(self, user):
+        self.client.force_login(user)
+        return self.client
+
+    def stored_on(self, model, pk):
+        return [alias for alias in SHARDS
+                if model.objects.using(alias).filter(pk=pk).exists()]
+
+    def test_create_with_group_goes_to_author_shard(self):
+        author = self.authors['shard2']
+        self.client_for(author).post(reverse('posts:post_create'), {
+            'text': 'Пост с группой', 'group': self.group.pk,
+        })
+        post = Post.objects.using('shard2').get(text='Пост с группой')
+        self.assertEqual(self.stored_on(Post, post.pk), ['shard2'])
+        self.assertEqual(Directory.objects.get(pk=post.pk).shard, 'shard2')
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.pk]))
+        self.assertEqual(response.context['post'], post)
+
+    def test_comment_follows_post_shard(self):
+        post = Post.objects.create(text='Пост', author=self.authors['shard1'])
+        self.client_for(self.authors['shard2']).post(
+            reverse('posts:add_comment', args=[post.pk]),
+            {'text': 'Комментарий'},
+        )
+        comment = Comment.objects.using('shard1').get(post=post)
+        self.assertEqual(self.stored_on(Comment, comment.pk), ['shard1'])
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.pk]))
+        self.assertEqual(list(response.context['comments']), [comment])
+
+    def test_index_merges_shards(self):
+        posts = [Post.objects.create(text=f'Пост {alias}', author=author)
+                 for alias, author in self.authors.items()]
+        self.assertEqual({post._state.db for post in posts}, set(SHARDS))
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(list(response.context['page_obj']),
+                         list(reversed(posts)))
+
+    def test_rebalance_drains_retired_shard(self):
+        author = self.authors['shard2']
+        post = Post.objects.create(text='Пост', author=author)
+        Comment.objects.create(post=post, author=author, text='Ответ')
+        remaining = ['default', 'shard1']
+        target = shard_for(author.pk, remaining)
+        with self.settings(SHARDS=remaining, RETIRED_SHARDS=['shard2']):
+            out = StringIO()
+            call_command('rebalance_shards', stdout=out)
+            self.assertIn(f'shard2 -> {target}: 1', out.getvalue())
+            response = self.client.get(
+                reverse('posts:post_detail', args=[post.pk]))
+            self.assertEqual(response.context['post'], post)
+        self.assertEqual(self.stored_on(Post, post.pk), [target])
+        self.assertFalse(Comment.objects.using('shard2').exists())
+
+    def test_rebalance_from_unknown_alias(self):
+        with self.assertRaises(CommandError):
+            call_command('rebalance_shards', '--from', 'missing',
+                         stdout=StringIO())
+
+    def test_sitemap_and_feed_cover_all_shards(self):
+        posts = [Post.objects.create(text=f'Пост {alias}', author=author)
+                 for alias, author in self.authors.items()]
+        sitemap = b''.join(self.client.get(
+            reverse('posts:sitemap_section', args=['posts', 0]))
+            .streaming_content).decode()
+        profiles = b''.join(self.client.get(
+            reverse('posts:sitemap_section', args=['profiles', 0]))
+            .streaming_content).decode()
+        feed = b''.join(self.client.get(
+            reverse('posts:index_feed', args=['rss']))
+            .streaming_content).decode()
+        for post in posts:
+            url = reverse('posts:post_detail', args=[post.pk])
+            self.assertIn(url, sitemap)
+            self.assertIn(url, feed)
+            self.assertEqual(profiles.count(
+                reverse('posts:profile', args=[post.author.username])), 1)
+
+    def test_admin_sees_all_shards(self):
+        admin = User.objects.create_superuser(username='admin',
+                                              password='admin-pass')
+        posts = [Post.objects.create(text=f'Пост {alias}', author=author)
+                 for alias, author in self.authors.items()]
+        client = self.client_for(admin)
+        url = reverse('admin:posts_post_changelist')
+        response = client.get(url)
+        self.assertEqual(list(response.context['cl'].result_list),
+                         list(reversed(posts)))
+        with patch.object(PostAdmin, 'list_per_page', 2):
+            response = client.get(url, {'p': 2})
+        self.assertEqual(list(response.context['cl'].result_list),
+                         posts[:1])
+        response = client.get(
+            reverse('admin:posts_post_change', args=[posts[-1].pk]))
+        self.assertEqual(response.status_code, 200)
+        client.post(url, {
+            'action': 'delete_in_batches', 'select_across': '1',
+            'index': '0', '_selected_action': [posts[0].pk], 'post': 'yes',
+        })
+        self.assertEqual(sum(Post.objects.using(alias).count()
+                             for alias in SHARDS), 0)
@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+@override_settings(SITEMAP_SEGMENT_SIZE=2, SITEMAP_BATCH=1)
+class SitemapTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.posts = [
+            Post.objects.create(author=cls.author, group=cls.group,
+                                text=f'Пост {i}')
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def read(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        if response.streaming:
+            return b''.join(response.streaming_content).decode()
+        return response.content.decode()
+
+    def test_index_lists_segments(self):
+        """Индекс перечисляет сегменты всех разделов."""
+        content = self.read(reverse('posts:sitemap'))
+        last_segment = self.posts[-1].id // 2
+        self.assertIn(f'sitemap-posts-{last_segment}.xml', content)
+        self.assertIn('sitemap-groups-0.xml', content)
+        self.assertIn('<lastmod>', content)
+
+    def test_segment_lists_only_its_range(self):
+        """Сегмент содержит только посты из своего диапазона id."""
+        post = self.posts[0]
+        content = self.read(reverse('posts:sitemap_section',
+                                    args=['posts', post.id // 2]))
+        for other in self.posts:
+            with self.subTest(post=other.id):
+                url = reverse('posts:post_detail', args=[other.id])
+                self.assertEqual(f'{url}</loc>' in content,
+                                 other.id // 2 == post.id // 2)
+
+    def test_segment_cache_invalidated_on_change(self):
+        """Сегмент берётся из кэша, пока в его диапазоне нет изменений."""
+        url = reverse('posts:sitemap_section', args=['profiles', 0])
+        self.read(url)
+        self.assertFalse(self.client.get(url).streaming)
+        self.author.save(update_fields=['last_login'])
+        self.assertFalse(self.client.get(url).streaming)
+        self.author.username = 'renamed'
+        self.author.save()
+        self.assertTrue(self.client.get(url).streaming)
+
+    def test_unknown_section(self):
+        response = self.client.get(reverse('posts:sitemap_section',
+                                           args=['comments', 0]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_index_rebuilt_only_when_segments_change(self):
+        """Правка поста не пересчитывает сегменты, новый сегмент — да."""
+        url = reverse('posts:sitemap')
+        self.read(url)
+        post = self.posts[0]
+        post.text = 'Правка'
+        post.save()
+        with self.assertNumQueries(0):
+            self.read(url)
+        new = Post.objects.create(author=self.author, text='Новый пост')
+        while new.pk // 2 == self.posts[-1].pk // 2:
+            new = Post.objects.create(author=self.author, text='Ещё пост')
+        self.assertIn(f'sitemap-posts-{new.pk // 2}.xml', self.read(url))
+
+    def test_edit_updates_lastmod(self):
+        """Правка через форму попадает в lastmod поста."""
+        post = self.posts[0]
+        self.client.force_login(self.author)
+        self.client.post(reverse('posts:post_edit', args=[post.pk]), {
+            'text': 'Исправленный текст', 'version': post.version,
+        })
+        post.refresh_from_db()
+        self.assertGreater(post.updated, post.pub_date)
+        content = self.read(reverse('posts:sitemap_section',
+                                    args=['posts', post.pk // 2]))
+        self.assertIn(f'<lastmod>{post.updated.isoformat()}</lastmod>',
+                      content)
@@ -0,0 +1,41 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.test import TestCase
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class GenerateDataTests(TestCase):
+    def generate(self, **options):
+        call_command('generate_data', users=20, groups=3, posts=300,
+                     comments_per_post=0.5, follows_per_user=3,
+                     batch_size=100, verbosity=0, stdout=StringIO(),
+                     **options)
+
+    def test_counts(self):
+        self.generate()
+        self.assertEqual(User.objects.count(), 20)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(Comment.objects.count(), 150)
+        self.assertEqual(Follow.objects.count(), 60)
+        self.assertFalse(Follow.objects.filter(user=F('author')).exists())
+
+    def test_zipf_authorship(self):
+        """Первый по рангу автор пишет заметно больше последнего."""
+        self.generate()
+        counts = dict(Post.objects.values_list('author__username')
+                      .annotate(total=Count('id')))
+        self.assertGreater(counts['user0'], 5 * counts.get('user19', 0))
+
+    def test_same_seed_same_data(self):
+        self.generate(seed=7)
+        first = list(Post.objects.order_by('pk').values_list(
+            'text', 'author__username'))
+        Group.objects.all().delete()
+        User.objects.all().delete()
+        self.generate(seed=7)
+        second = list(Post.objects.order_by('pk').values_list(
+            'text', 'author__username'))
+        self.assertEqual(first, second)
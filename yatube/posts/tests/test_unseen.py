@@ -0,0 +1,51 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import unseen
+from ..models import FeedMark, Follow, Post, User
+
+SIGNED_COOKIES = 'django.contrib.sessions.backends.signed_cookies'
+
+
+@override_settings(SESSION_ENGINE=SIGNED_COOKIES)
+class UnseenCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        Post.objects.create(author=cls.author, text='Старый пост')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def unseen(self):
+        return self.client.get(reverse('posts:follow_unseen')).json()
+
+    def test_visit_marks_feed_seen(self):
+        self.assertEqual(self.unseen()['count'], 1)
+        self.client.get(reverse('posts:follow_index'))
+        self.assertTrue(FeedMark.objects.filter(user=self.reader).exists())
+        self.assertEqual(self.unseen(), {'count': 0, 'more': False})
+
+    def test_counts_only_new_posts_of_followed_authors(self):
+        self.client.get(reverse('posts:follow_index'))
+        Post.objects.create(author=self.author, text='Новый пост')
+        Post.objects.create(author=self.stranger, text='Чужой пост')
+        unseen.forget(self.reader)
+        self.assertEqual(self.unseen()['count'], 1)
+
+    def test_counter_is_cached(self):
+        self.unseen()
+        # Остаётся только загрузка request.user.
+        with self.assertNumQueries(1):
+            self.unseen()
+
+    @override_settings(UNSEEN_MAX=1)
+    def test_count_is_capped(self):
+        Post.objects.create(author=self.author, text='Ещё пост')
+        self.assertEqual(self.unseen(), {'count': 1, 'more': True})
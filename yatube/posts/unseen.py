@@ -0,0 +1,52 @@
+from django.conf import settings as s
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import FeedMark, Follow, Post
+from .sharding import scatter
+
+
+def cache_key(user_id):
+    return f'unseen:{user_id}'
+
+
+def mark_seen(user, seen=None):
+    """Сдвигает отметку прочтения ленты подписок вперёд."""
+    seen = seen or timezone.now()
+    updated = FeedMark.objects.filter(user=user, seen__lt=seen).update(
+        seen=seen)
+    if not updated:
+        FeedMark.objects.get_or_create(user=user, defaults={'seen': seen})
+    cache.delete(cache_key(user.pk))
+
+
+def count_unseen(user):
+    """
+    Число новых постов от избранных авторов, не больше UNSEEN_MAX + 1.
+    Считается по индексу (author, pub_date) без JOIN с лентой.
+    """
+    posts = Post.objects.filter(
+        author__in=Follow.objects.filter(user=user).values('author'))
+    seen = (FeedMark.objects.filter(user=user)
+            .values_list('seen', flat=True).first())
+    if seen is not None:
+        posts = posts.filter(pub_date__gt=seen)
+    return sum(shard.order_by().values('pk')[:s.UNSEEN_MAX + 1].count()
+               for shard in scatter(posts))
+
+
+def get_unseen(user):
+    """Счётчик для опроса клиентом; кэшируется на UNSEEN_CACHE_TIMEOUT."""
+    count = cache.get(cache_key(user.pk))
+    if count is None:
+        count = count_unseen(user)
+        cache.set(cache_key(user.pk), count, s.UNSEEN_CACHE_TIMEOUT)
+    return {
+        'count': min(count, s.UNSEEN_MAX),
+        'more': count > s.UNSEEN_MAX,
+    }
+
+
+def forget(user):
+    """Сбрасывает кэш счётчика, например после подписки или отписки."""
+    cache.delete(cache_key(user.pk))
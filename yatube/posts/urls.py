@@ -6,14 +6,35 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('fragment/', views.index_fragment, name='index_fragment'),
+    path('feed/<str:fmt>/', views.index_feed, name='index_feed'),
+    path('hot/', views.hot, name='hot'),
+    path('live/', views.live_stream, name='live_stream'),
+    path('live/poll/', views.live_poll, name='live_poll'),
+    path('sitemap.xml', views.sitemap, name='sitemap'),
+    path('sitemap-<str:section>-<int:segment>.xml',
+         views.sitemap_section, name='sitemap_section'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('group/<slug:slug>/fragment/',
+         views.group_fragment, name='group_fragment'),
+    path('group/<slug:slug>/feed/<str:fmt>/',
+         views.group_feed, name='group_feed'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/fragment/',
+         views.profile_fragment, name='profile_fragment'),
+    path('profile/<str:username>/feed/<str:fmt>/',
+         views.profile_feed, name='profile_feed'),
     path('posts/<int:post_id>/', views.post_detail, name="post_detail"),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/comment/',
          views.add_comment, name='add_comment'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/unseen/', views.follow_unseen, name='follow_unseen'),
+    path('follow/fragment/', views.follow_fragment, name='follow_fragment'),
+    path('notifications/', views.notification_list, name='notifications'),
+    path('notifications/read/', views.notifications_read,
+         name='notifications_read'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
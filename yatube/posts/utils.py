@@ -1,4 +1,5 @@
 from django.conf import settings as s
+from django.core.cache import cache
 from django.core.paginator import Paginator
 
 
@@ -6,3 +7,24 @@ def get_paginator(request, posts):
     paginator = Paginator(posts, s.PAGINATOR)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
+
+
+def cached_stream(chunks, cache_key, timeout):
+    """Отдаёт куски ответа по мере готовности и кэширует собранный итог."""
+    body = []
+    for chunk in chunks:
+        body.append(chunk)
+        yield chunk
+    cache.set(cache_key, ''.join(body), timeout)
+
+
+def get_version(key):
+    return cache.get_or_set(f'version:{key}', 1, None)
+
+
+def bump_version(key):
+    """Инвалидирует все записи кэша, построенные на версии ключа."""
+    try:
+        cache.incr(f'version:{key}')
+    except ValueError:
+        cache.set(f'version:{key}', 2, None)
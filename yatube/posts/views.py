@@ -1,58 +1,155 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings as s
 from django.contrib.auth.decorators import login_required
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (HttpResponse, HttpResponseBadRequest, JsonResponse,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.views.decorators.http import require_POST
+
+from core.shell import edge_shell
 
-from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from . import live, notifications, unseen
+from .archive import ArchiveFallbackList
+from .feeds import feed_response
+from .fragments import more_url, next_batch
+from .forms import CommentForm, EditConflict, PostForm
+from .hot import get_hot_posts
+from .models import (ArchivedPost, Follow, Group, Post, Recommendation,
+                     User)
+from .recommendations import get_recommendations
+from .sharding import ShardedList, locate
+from .sitemaps import index_response, section_response
 from .utils import get_paginator
 
 
+@edge_shell
 def index(request):
-    posts = Post.objects.all()
+    posts = ShardedList(Post.objects.all())
+    page_obj = get_paginator(request, posts)
     context = {
-        'page_obj': get_paginator(request, posts),
+        'page_obj': page_obj,
+        'more_url': more_url('posts:index_fragment', page_obj),
     }
     return render(request, 'posts/index.html', context)
 
 
+def fragment_response(request, posts, archived_posts=None, **context):
+    """Следующая порция карточек постов после курсора из ?cursor=."""
+    try:
+        items, cursor = next_batch(posts, archived_posts,
+                                   request.GET.get('cursor'))
+    except ValueError:
+        return HttpResponseBadRequest('Неверный курсор')
+    context['posts'] = items
+    if cursor:
+        context['more_url'] = f'{request.path}?cursor={cursor}'
+    return render(request, 'includes/post_cards.html', context)
+
+
+def index_fragment(request):
+    return fragment_response(request, Post.objects.all())
+
+
+def index_feed(request, fmt):
+    return feed_response(request, fmt, 'Последние обновления на сайте',
+                         reverse('posts:index'), Post.objects.all())
+
+
+def group_feed(request, slug, fmt):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_response(request, fmt, group.title,
+                         reverse('posts:group_list', args=[slug]),
+                         group.posts.all())
+
+
+def profile_feed(request, username, fmt):
+    author = get_object_or_404(User, username=username)
+    return feed_response(request, fmt, f'Посты пользователя {username}',
+                         reverse('posts:profile', args=[username]),
+                         author.posts.all())
+
+
+def sitemap(request):
+    return index_response(request)
+
+
+def sitemap_section(request, section, segment):
+    return section_response(request, section, segment)
+
+
+@edge_shell
+def hot(request):
+    context = {
+        'page_obj': get_paginator(request, get_hot_posts()),
+        'hot': True,
+    }
+    return render(request, 'posts/hot.html', context)
+
+
+@edge_shell
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    posts = ArchiveFallbackList(ShardedList(group.posts.all()),
+                                ShardedList(group.archived_posts.all()))
+    page_obj = get_paginator(request, posts)
     context = {
         'group': group,
-        'page_obj': get_paginator(request, posts),
+        'page_obj': page_obj,
+        'more_url': more_url('posts:group_fragment', page_obj, slug),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+def group_fragment(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return fragment_response(request, group.posts.all(),
+                             group.archived_posts.all(), group=group)
+
+
+@edge_shell
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    following = request.user.is_authenticated and Follow.objects.filter(
-        user=request.user, author=author
-    ).exists()
+    post_list = ArchiveFallbackList(author.posts.all(),
+                                    author.archived_posts.all())
+    page_obj = get_paginator(request, post_list)
     context = {
         'author': author,
-        'following': following,
-        'page_obj': get_paginator(request, post_list),
+        'page_obj': page_obj,
+        'more_url': more_url('posts:profile_fragment', page_obj, username),
     }
     return render(request, 'posts/profile.html', context)
 
 
+def profile_fragment(request, username):
+    author = get_object_or_404(User, username=username)
+    return fragment_response(request, author.posts.all(),
+                             author.archived_posts.all())
+
+
+@edge_shell
 def post_detail(request, post_id):
-    form = CommentForm(request.POST or None)
-    post = get_object_or_404(Post, id=post_id)
+    shard = locate(post_id)
+    post = Post.objects.using(shard).filter(id=post_id).first()
+    archived = post is None
+    if archived:
+        post = get_object_or_404(ArchivedPost.objects.using(shard),
+                                 id=post_id)
     comments = post.comments.all()
     context = {
         'post': post,
-        'form': form,
         'comments': comments,
+        'archived': archived,
     }
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
@@ -63,7 +160,8 @@ def post_create(request):
 
 @login_required
 def post_edit(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.using(locate(post_id)),
+                             id=post_id)
     if request.user != post.author:
         return redirect('posts:post_detail', post_id=post_id)
     form = PostForm(
@@ -71,18 +169,29 @@ def post_edit(request, post_id):
         files=request.FILES or None,
         instance=post
     )
-    if not form.is_valid():
-        return render(request, 'posts/create_post.html', {
-            'form': form,
-            'is_edit': True
-        })
-    form.save()
-    return redirect('posts:post_detail', post_id=post_id)
+    if form.is_valid():
+        try:
+            form.save_changes()
+        except EditConflict:
+            form.add_error(None, 'Пост изменили, пока вы его '
+                                 'редактировали. Проверьте текст и '
+                                 'сохраните ещё раз.')
+            form.data = form.data.copy()
+            form.data['version'] = (
+                Post.objects.using(post._state.db)
+                .values_list('version', flat=True).get(pk=post.pk))
+        else:
+            return redirect('posts:post_detail', post_id=post_id)
+    return render(request, 'posts/create_post.html', {
+        'form': form,
+        'is_edit': True
+    })
 
 
 @login_required
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.using(locate(post_id)),
+                             id=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
@@ -94,18 +203,54 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    posts = ShardedList(
+        Post.objects.filter(author__following__user=request.user))
+    page_obj = get_paginator(request, posts)
+    if page_obj.number == 1:
+        latest = page_obj[0].pub_date if page_obj else None
+        unseen.mark_seen(request.user, latest)
     context = {
-        'page_obj': get_paginator(request, posts)
+        'page_obj': page_obj,
+        'more_url': more_url('posts:follow_fragment', page_obj),
+        'recommendations': get_recommendations(request.user),
     }
     return render(request, 'posts/follow.html', context)
 
 
+@login_required
+def follow_fragment(request):
+    return fragment_response(
+        request, Post.objects.filter(author__following__user=request.user))
+
+
+@login_required
+def follow_unseen(request):
+    return JsonResponse(unseen.get_unseen(request.user))
+
+
+@login_required
+def notification_list(request):
+    return render(request, 'posts/notifications.html', {
+        'notifications': notifications.unread(request.user),
+    })
+
+
+@login_required
+@require_POST
+def notifications_read(request):
+    notifications.mark_read(request.user)
+    return redirect('posts:notifications')
+
+
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if request.user != author:
         Follow.objects.get_or_create(author=author, user=request.user)
+        Recommendation.objects.filter(
+            user=request.user, author=author
+        ).delete()
+        unseen.forget(request.user)
     return redirect('posts:profile', username)
 
 
@@ -117,4 +262,64 @@ def profile_unfollow(request, username):
     )
     if old_subscription.exists():
         old_subscription.delete()
+        unseen.forget(request.user)
     return redirect('posts:profile', username)
+
+
+def event_id(value):
+    return int(value) if value and value.isdigit() else None
+
+
+async def live_stream(request):
+    """
+    Server-sent events о новых постах ленты ?feed=all|group:<slug>|follow.
+    Работает только под ASGI: под WSGI отвечает 204, и live.js
+    переходит на короткий опрос live_poll.
+    """
+    channels = await sync_to_async(live.resolve_channels)(
+        request, request.GET.get('feed', live.ALL))
+    if channels is None:
+        return HttpResponseBadRequest('Неизвестная лента')
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    since = event_id(request.headers.get('Last-Event-ID'))
+
+    async def events():
+        with live.broker.subscribe(channels) as subscription:
+            yield f'retry: {s.LIVE_RETRY_MS}\n\n'
+            if since is not None:
+                for event in live.broker.backlog(channels, since):
+                    yield live.sse(event)
+            while True:
+                try:
+                    event = await subscription.get(s.LIVE_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    # Комментарий не даёт прокси закрыть молчащее соединение.
+                    yield ': keepalive\n\n'
+                else:
+                    yield live.sse(event)
+
+    response = StreamingHttpResponse(events(),
+                                     content_type='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def live_poll(request):
+    """
+    Короткий опрос для WSGI и браузеров без SSE: сразу отвечает числом
+    новых постов ленты с id больше ?since=. Курсор — id поста из базы,
+    поэтому годится для любого воркера. Без since возвращает id,
+    от которого считать.
+    """
+    posts = live.feed_posts(request, request.GET.get('feed', live.ALL))
+    if posts is None:
+        return HttpResponseBadRequest('Неизвестная лента')
+    since = event_id(request.GET.get('since'))
+    latest = live.latest_post_id(posts)
+    return JsonResponse({
+        'last': latest if since is None else max(since, latest),
+        'count': 0 if since is None else live.count_since(posts, since),
+        'retry': s.LIVE_POLL_INTERVAL * 1000,
+    })
@@ -0,0 +1,11 @@
+// Бесконечная лента: кнопка «Показать ещё» подгружает фрагмент
+// со следующей порцией постов и заменяется им.
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('.js-more');
+  if (!link) return;
+  event.preventDefault();
+  link.classList.add('disabled');
+  fetch(link.dataset.fragment)
+    .then(function (response) { return response.text(); })
+    .then(function (html) { link.parentNode.outerHTML = html; });
+});
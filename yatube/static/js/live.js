@@ -0,0 +1,35 @@
+// Уведомления о новых постах ленты: поток EventSource, а если сервер
+// работает без ASGI (ответ 204) или браузер не умеет SSE — короткий
+// опрос live_poll раз в интервал, который сообщает сервер.
+(function () {
+  var box = document.querySelector('.js-live');
+  if (!box) return;
+  var count = 0;
+
+  function show(added) {
+    count += added;
+    box.querySelector('span').textContent = count;
+    box.hidden = false;
+  }
+
+  function poll(since) {
+    var url = box.dataset.poll;
+    if (since !== undefined) url += '&since=' + since;
+    fetch(url)
+      .then(function (response) { return response.json(); })
+      .then(function (data) {
+        if (data.count) show(data.count);
+        setTimeout(function () { poll(data.last); }, data.retry);
+      })
+      .catch(function () {
+        setTimeout(function () { poll(since); }, 30000);
+      });
+  }
+
+  if (!window.EventSource) return poll();
+  var source = new EventSource(box.dataset.stream);
+  source.addEventListener('post', function () { show(1); });
+  source.onerror = function () {
+    if (source.readyState === EventSource.CLOSED) poll();
+  };
+})();
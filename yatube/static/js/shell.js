@@ -0,0 +1,16 @@
+// Страница-оболочка одинакова для всех, поэтому личные куски
+// (меню, подписка, форма комментария) забираем одним запросом.
+document.addEventListener('DOMContentLoaded', function () {
+  var holes = document.querySelectorAll('[data-hole]');
+  if (!holes.length) return;
+  var query = Array.prototype.map.call(holes, function (hole) {
+    return 'h=' + encodeURIComponent(hole.dataset.hole);
+  }).join('&');
+  fetch(document.body.dataset.holes + '?' + query)
+    .then(function (response) { return response.json(); })
+    .then(function (fragments) {
+      holes.forEach(function (hole) {
+        hole.outerHTML = fragments[hole.dataset.hole] || '';
+      });
+    });
+});
@@ -0,0 +1,68 @@
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, wait)
+from time import monotonic, sleep
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks.queue import claim, requeue_stale, run_task, schedule_periodic
+
+POOLS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+
+class Command(BaseCommand):
+    help = 'Фоновый воркер очереди задач на пуле потоков или процессов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pool', choices=POOLS, default='thread')
+        parser.add_argument('--workers', type=int,
+                            default=settings.TASKS_WORKERS)
+        parser.add_argument('--interval', type=float,
+                            default=settings.TASKS_POLL_INTERVAL)
+        parser.add_argument('--once', action='store_true',
+                            help='Выполнить созревшие задачи и выйти')
+        parser.add_argument('--no-schedule', action='store_true',
+                            help='Не ставить периодические задачи '
+                                 '(их ставит другой воркер)')
+
+    def housekeeping(self, options):
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(f'Зависших задач снято: {requeued}')
+        if not options['no_schedule']:
+            schedule_periodic()
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        pool_options = {'max_workers': workers}
+        if options['pool'] == 'process':
+            # Дочерние процессы открывают свои соединения с БД.
+            connections.close_all()
+            pool_options['initializer'] = django.setup
+        with POOLS[options['pool']](**pool_options) as pool:
+            running = set()
+            next_housekeeping = 0
+            while True:
+                if monotonic() >= next_housekeeping:
+                    self.housekeeping(options)
+                    next_housekeeping = (monotonic()
+                                         + settings.TASKS_SCHEDULE_INTERVAL)
+                free = workers - len(running)
+                pks = claim(free) if free else []
+                running.update(pool.submit(run_task, pk) for pk in pks)
+                if not running:
+                    if options['once']:
+                        return
+                    sleep(options['interval'])
+                    continue
+                done, running = wait(
+                    running, timeout=options['interval'],
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    self.stdout.write(f'Задача завершена: {future.result()}')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Avg, Count, Max, Q
+
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Статистика времени выполнения задач по именам.'
+
+    def handle(self, *args, **options):
+        stats = (
+            Task.objects.order_by('name').values('name').annotate(
+                total=Count('id'),
+                failed=Count('id', filter=Q(status=Task.FAILED)),
+                queued=Count('id', filter=Q(status=Task.QUEUED)),
+                avg=Avg('duration'),
+                slowest=Max('duration'),
+            )
+        )
+        self.stdout.write(f'{"task":<45}{"total":>7}{"queued":>7}'
+                          f'{"failed":>7}{"avg, s":>9}{"max, s":>9}')
+        for row in stats:
+            self.stdout.write(
+                f'{row["name"]:<45}{row["total"]:>7}{row["queued"]:>7}'
+                f'{row["failed"]:>7}{row["avg"] or 0:>9.3f}'
+                f'{row["slowest"] or 0:>9.3f}'
+            )
@@ -0,0 +1,51 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=200)
+    kwargs = models.JSONField('Аргументы', default=dict, blank=True)
+    priority = models.SmallIntegerField('Приоритет', default=0)
+    dedup_key = models.CharField(
+        'Ключ дедупликации',
+        max_length=200,
+        unique=True,
+        null=True,
+        blank=True,
+        help_text='Пока задача с этим ключом не завершена, '
+                  'повторная постановка игнорируется',
+    )
+    status = models.CharField('Статус', max_length=10, choices=STATUSES,
+                              default=QUEUED)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField('Максимум попыток',
+                                                    default=3)
+    run_after = models.DateTimeField('Не раньше', default=timezone.now)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    started = models.DateTimeField('Запущена', null=True, blank=True)
+    finished = models.DateTimeField('Завершена', null=True, blank=True)
+    duration = models.FloatField('Длительность, с', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('-priority', 'run_after', 'id')
+        verbose_name = 'Задача'
+        verbose_name_plural = 'Задачи'
+        indexes = [
+            models.Index(fields=('status', '-priority', 'run_after'),
+                         name='task_due'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.get_status_display()})'
@@ -0,0 +1,137 @@
+import logging
+from datetime import timedelta
+from functools import partial
+from time import perf_counter
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+# Периодические задачи: имя -> интервал между запусками.
+PERIODIC = {}
+
+
+def task(func=None, *, name=None, max_attempts=None, every=None):
+    """
+    Регистрирует функцию как фоновую задачу. Постановка в очередь:
+    func.delay(**kwargs) или enqueue(name, ...). С every (timedelta)
+    задачу раз в интервал ставит в очередь schedule_periodic.
+    """
+    if func is None:
+        return partial(task, name=name, max_attempts=max_attempts,
+                       every=every)
+    task_name = name or f'{func.__module__}.{func.__name__}'
+    REGISTRY[task_name] = func
+    if every is not None:
+        PERIODIC[task_name] = every
+    func.task_name = task_name
+    func.max_attempts = max_attempts or settings.TASKS_MAX_ATTEMPTS
+    func.delay = lambda **kwargs: enqueue(task_name, kwargs)
+    return func
+
+
+def enqueue(name, kwargs=None, priority=0, dedup_key=None, delay=None):
+    """
+    Ставит задачу в очередь. Если незавершённая задача с тем же
+    dedup_key уже есть, возвращает None.
+    """
+    func = REGISTRY[name]
+    run_after = timezone.now() + (delay or timedelta())
+    try:
+        with transaction.atomic():
+            return Task.objects.create(
+                name=name,
+                kwargs=kwargs or {},
+                priority=priority,
+                dedup_key=dedup_key,
+                max_attempts=func.max_attempts,
+                run_after=run_after,
+            )
+    except IntegrityError:
+        return None
+
+
+def claim(limit):
+    """Забирает до limit созревших задач по приоритету."""
+    candidates = Task.objects.filter(
+        status=Task.QUEUED, run_after__lte=timezone.now()
+    ).values_list('pk', flat=True)[:limit]
+    return [
+        pk for pk in candidates
+        if Task.objects.filter(pk=pk, status=Task.QUEUED).update(
+            status=Task.RUNNING,
+            started=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+    ]
+
+
+def schedule_periodic():
+    """
+    Ставит в очередь периодические задачи. Следующий запуск
+    откладывается на интервал; пока он не выполнен, dedup_key
+    не даёт поставить задачу повторно. Возвращает число новых задач.
+    """
+    return sum(
+        enqueue(name, dedup_key=f'periodic:{name}', delay=every) is not None
+        for name, every in PERIODIC.items()
+    )
+
+
+def requeue_stale():
+    """
+    Возвращает в очередь задачи, которые дольше TASKS_RUNNING_TIMEOUT
+    числятся выполняемыми: их воркер упал. Исчерпавшие попытки
+    помечаются ошибкой.
+    """
+    stale = Task.objects.filter(
+        status=Task.RUNNING,
+        started__lt=timezone.now() - timedelta(
+            seconds=settings.TASKS_RUNNING_TIMEOUT),
+    )
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Task.FAILED, dedup_key=None, finished=timezone.now(),
+        last_error='Воркер не завершил задачу')
+    return failed + stale.update(status=Task.QUEUED)
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.TASKS_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def run_task(pk):
+    """Выполняет захваченную задачу и записывает её время."""
+    close_old_connections()
+    try:
+        task_obj = Task.objects.get(pk=pk)
+        started = perf_counter()
+        try:
+            REGISTRY[task_obj.name](**task_obj.kwargs)
+        except Exception as error:
+            logger.exception('Задача %s упала', task_obj.name)
+            task_obj.last_error = repr(error)
+            if task_obj.attempts < task_obj.max_attempts:
+                task_obj.status = Task.QUEUED
+                task_obj.run_after = (timezone.now()
+                                      + retry_delay(task_obj.attempts))
+            else:
+                task_obj.status = Task.FAILED
+        else:
+            task_obj.status = Task.DONE
+        task_obj.duration = perf_counter() - started
+        task_obj.finished = timezone.now()
+        if task_obj.status != Task.QUEUED:
+            task_obj.dedup_key = None
+        task_obj.save(update_fields=(
+            'status', 'duration', 'finished', 'dedup_key', 'last_error',
+            'run_after',
+        ))
+        return task_obj.status
+    finally:
+        close_old_connections()
@@ -0,0 +1,106 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from ..models import Task
+from ..queue import (PERIODIC, claim, enqueue, requeue_stale, run_task,
+                     schedule_periodic, task)
+
+calls = []
+
+
+@task(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='tests.tick')
+def tick():
+    calls.append('tick')
+
+
+@task(name='tests.broken', max_attempts=2)
+def broken():
+    raise RuntimeError('сломано')
+
+
+class QueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_dedup_key(self):
+        """Незавершённая задача с тем же ключом не дублируется."""
+        self.assertIsNotNone(
+            enqueue('tests.record', {'value': 1}, dedup_key='once'))
+        self.assertIsNone(
+            enqueue('tests.record', {'value': 2}, dedup_key='once'))
+        run_task(claim(1)[0])
+        self.assertIsNotNone(
+            enqueue('tests.record', {'value': 3}, dedup_key='once'))
+
+    def test_priority_order(self):
+        """Задачи с большим приоритетом забираются первыми."""
+        low = enqueue('tests.record', {'value': 'low'})
+        high = enqueue('tests.record', {'value': 'high'}, priority=10)
+        self.assertEqual(claim(2), [high.pk, low.pk])
+
+    def test_retries_then_fails(self):
+        """Упавшая задача повторяется, затем помечается ошибкой."""
+        broken_task = broken.delay()
+        self.assertEqual(run_task(claim(1)[0]), Task.QUEUED)
+        Task.objects.filter(pk=broken_task.pk).update(
+            run_after=broken_task.run_after)
+        self.assertEqual(run_task(claim(1)[0]), Task.FAILED)
+        broken_task.refresh_from_db()
+        self.assertEqual(broken_task.attempts, 2)
+        self.assertIn('сломано', broken_task.last_error)
+
+    def test_delay_passes_kwargs(self):
+        """delay(**kwargs) передаёт аргументы задаче, а не enqueue."""
+        record.delay(value='delay')
+        run_task(claim(1)[0])
+        self.assertEqual(calls, ['delay'])
+
+    def test_stale_running_requeued(self):
+        """Задача упавшего воркера возвращается в очередь."""
+        queued = record.delay(value=1)
+        claim(1)
+        self.assertEqual(requeue_stale(), 0)
+        Task.objects.update(started=timezone.now() - timedelta(
+            seconds=settings.TASKS_RUNNING_TIMEOUT + 1))
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual(claim(1), [queued.pk])
+
+    def test_schedule_periodic(self):
+        """Периодическая задача ставится один раз до её выполнения."""
+        with mock.patch.dict(PERIODIC, {'tests.tick': timedelta()},
+                             clear=True):
+            self.assertEqual(schedule_periodic(), 1)
+            self.assertEqual(schedule_periodic(), 0)
+            run_task(claim(1)[0])
+            self.assertEqual(calls, ['tick'])
+            self.assertEqual(schedule_periodic(), 1)
+
+    def test_timing_recorded(self):
+        record.delay(value=1)
+        run_task(claim(1)[0])
+        finished = Task.objects.get()
+        self.assertEqual(finished.status, Task.DONE)
+        self.assertIsNotNone(finished.duration)
+
+
+class RunWorkerTests(TransactionTestCase):
+    def test_worker_runs_queued_tasks(self):
+        """Воркер выполняет все созревшие задачи на пуле потоков."""
+        calls.clear()
+        for value in range(3):
+            record.delay(value=value)
+        call_command('runworker', once=True, workers=2, no_schedule=True,
+                     stdout=StringIO())
+        self.assertEqual(sorted(calls), [0, 1, 2])
+        self.assertFalse(Task.objects.exclude(status=Task.DONE).exists())
@@ -0,0 +1,16 @@
+"""
+ASGI config for yatube project.
+
+Нужен для posts:live_stream — под WSGI каждый открытый поток событий
+занимал бы воркер. Например: uvicorn yatube.asgi:application
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = get_asgi_application()
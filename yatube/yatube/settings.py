@@ -1,11 +1,25 @@
 import os
 
+
+def env_flag(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
 SECRET_KEY = str(os.getenv('SECRET_KEY'))
 
-DEBUG = True
+DEBUG = env_flag('DEBUG', True)
+
+# Профиль окружения: инструменты разработчика и админка подключаются
+# только там, где нужны, чтобы воркеры не тратили на них время старта.
+DEV_TOOLS = env_flag('DEV_TOOLS', DEBUG)
+ADMIN_ENABLED = env_flag('ADMIN_ENABLED', True)
+# Страницы-оболочки без данных пользователя для общего кэша (CDN);
+# личные куски подгружаются запросом к /_holes/.
+EDGE_SHELL = env_flag('EDGE_SHELL', False)
+EDGE_SHELL_MAX_AGE = 60
 
 ALLOWED_HOSTS = [
     'localhost',
@@ -18,7 +32,10 @@ ALLOWED_HOSTS = [
 
 
 INSTALLED_APPS = [
-    'django.contrib.admin',
+    # Без админки оставляем SimpleAdminConfig: её шаблоны нужны страницам
+    # сброса и смены пароля, но модули admin.py не импортируются.
+    'django.contrib.admin' if ADMIN_ENABLED
+    else 'django.contrib.admin.apps.SimpleAdminConfig',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -28,20 +45,24 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'tasks.apps.TasksConfig',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
+if DEV_TOOLS:
+    INSTALLED_APPS.append('debug_toolbar')
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
+if DEV_TOOLS:
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
 
 ROOT_URLCONF = 'yatube.urls'
 
@@ -59,6 +80,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.shell.edge_shell',
             ],
         },
     },
@@ -74,6 +96,34 @@ DATABASES = {
     }
 }
 
+# Шарды постов по автору, например SHARDS=default,shard1,shard2.
+# Пустой список — без шардирования, всё в default.
+SHARDS = [alias for alias in os.getenv('SHARDS', '').split(',') if alias]
+# Шарды, убранные из SHARDS: база остаётся объявленной, пока
+# rebalance_shards не перенесёт с неё посты.
+RETIRED_SHARDS = [alias for alias in
+                  os.getenv('RETIRED_SHARDS', '').split(',') if alias]
+# shard1 и shard2 объявлены всегда (файл sqlite создаётся только при
+# первом обращении), чтобы тесты шардирования шли без переменных.
+for alias in ['shard1', 'shard2', *SHARDS, *RETIRED_SHARDS]:
+    DATABASES.setdefault(alias, {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, f'{alias}.sqlite3'),
+    })
+DATABASE_ROUTERS = ['posts.sharding.ShardRouter']
+
+TEST_RUNNER = 'core.runner.TestRunner'
+
+
+# core.backends.CachedModelBackend берёт request.user из кэша.
+# Включать только с общим кэшем (Redis, Memcached): с LocMemCache
+# другие воркеры до AUTH_USER_CACHE_TIMEOUT не узнают о смене пароля
+# или блокировке пользователя.
+AUTHENTICATION_BACKENDS = [
+    os.getenv('AUTH_BACKEND', 'django.contrib.auth.backends.ModelBackend'),
+]
+
+AUTH_USER_CACHE_TIMEOUT = 60 * 15
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -103,22 +153,124 @@ USE_TZ = True
 
 
 STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'core.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'django.contrib.staticfiles.storage.StaticFilesStorage'
+            if DEBUG else
+            'core.storage.CompressedManifestStaticFilesStorage'
+        ),
+    },
+}
+
+# Файлы, из которых collectstatic вырезает правила с неиспользуемыми
+# в шаблонах классами; классы, подставляемые динамически, — в safelist.
+STATIC_PRUNE_CSS = ()
+STATIC_CSS_SAFELIST = ('active', 'show', 'collapsing', 'fade')
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
+
+COMPRESSION_CACHE_TIMEOUT = 60 * 5
+COMPRESSION_CACHE_MAX_SIZE = 512 * 1024
 
 LAST_POSTS_QTY = 10
 
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+
+SITEMAP_SEGMENT_SIZE = 10000
+SITEMAP_BATCH = 1000
+SITEMAP_CACHE_TIMEOUT = 60 * 60 * 24
+
 PAGINATOR = 10
 
+RECOMMENDATIONS_QTY = 5
+RECOMMENDATIONS_BATCH = 500
+# Со-подписки считаются по стольким последним подписчикам автора.
+RECOMMENDATIONS_CO_FOLLOWERS = 50
+
+UNSEEN_MAX = 99
+UNSEEN_CACHE_TIMEOUT = 30
+
+# Живые уведомления о новых постах (posts.live): сколько событий
+# помнить для переподключений SSE, интервал keepalive в секундах.
+# Под WSGI клиенты опрашивают live_poll раз в LIVE_POLL_INTERVAL секунд.
+LIVE_HISTORY = 200
+LIVE_QUEUE_SIZE = 100
+LIVE_KEEPALIVE = 15
+LIVE_POLL_INTERVAL = 30
+LIVE_POLL_MAX = 99
+LIVE_RETRY_MS = 5000
+
+# Уведомления о комментариях: журнал событий сводится в сводки задачей
+# build_notification_digests; NOTIFY_EMAIL — ещё и письмо получателю.
+NOTIFY_BATCH = 1000
+NOTIFY_ACTORS = 3
+NOTIFY_UNREAD_QTY = 50
+NOTIFY_EMAIL = False
+NOTIFY_SITE_URL = os.getenv('SITE_URL', 'http://localhost:8000')
+
+ADMIN_BATCH_SIZE = 500
+
+ARCHIVE_AFTER_DAYS = 365 * 2
+ARCHIVE_BATCH = 500
+
+SYNTHETIC_BATCH = 5000
+
+HEALTH_CHECK_TIMEOUT = 0.5
+
+HOT_POSTS_QTY = 50
+HOT_POST_WEIGHT = 10.0
+HOT_FOLLOWER_WEIGHT = 2.0
+HOT_COMMENT_WEIGHT = 3.0
+HOT_DECAY_FACTOR = 0.8
+HOT_MIN_SCORE = 0.5
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+MAIL_QUEUE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+MAIL_QUEUE_BATCH = 100
+MAIL_QUEUE_MAX_ATTEMPTS = 5
+MAIL_QUEUE_RETRY_DELAY = 60
+# Через сколько секунд письмо в статусе «Отправляется» считается
+# брошенным упавшим воркером и возвращается в очередь.
+MAIL_QUEUE_SENDING_TIMEOUT = 60 * 10
+
+TASKS_WORKERS = 4
+TASKS_POLL_INTERVAL = 1
+TASKS_MAX_ATTEMPTS = 3
+TASKS_RETRY_DELAY = 30
+# Задача в статусе «Выполняется» дольше этого числа секунд считается
+# брошенной упавшим воркером. Раз в TASKS_SCHEDULE_INTERVAL секунд
+# runworker возвращает такие задачи и ставит периодические.
+TASKS_RUNNING_TIMEOUT = 60 * 60
+TASKS_SCHEDULE_INTERVAL = 60
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Сборка мусора в хранилище по содержимому (collect_media): каталоги
+# загрузок и сколько секунд не трогать свежие файлы без ссылок.
+MEDIA_GC_DIRS = ('posts', )
+MEDIA_GC_GRACE = 60 * 60 * 24
+# Оригиналы по хешу содержимого и миниатюры sorl не меняются под
+# своим именем — их можно кэшировать навсегда.
+MEDIA_IMMUTABLE_PATTERNS = (r'posts/[0-9a-f]{2}/[0-9a-f]{64}\.',
+                            r'cache/')
+MEDIA_MAX_AGE = STATIC_MAX_AGE
+# Отдача файлов веб-сервером: '' — сами, 'x-accel' — nginx через
+# internal location MEDIA_ACCEL_PREFIX, 'x-sendfile' — Apache/lighttpd.
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
 
 CACHES = {
     'default': {
@@ -126,6 +278,15 @@ CACHES = {
     }
 }
 
+# core.sessions держит сессии в кэше и пишет их в БД с задержкой
+# (отложенное сбрасывает runworker). Включать только с общим кэшем
+# (Redis, Memcached): с LocMemCache другие воркеры читают устаревшую
+# строку из БД. Альтернатива без БД:
+# django.contrib.sessions.backends.signed_cookies.
+SESSION_ENGINE = os.getenv('SESSION_ENGINE',
+                           'django.contrib.sessions.backends.db')
+SESSION_WRITE_BEHIND_INTERVAL = 60 * 5
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -1,22 +1,38 @@
+import re
+from urllib.parse import urlsplit
+
 from django.conf import settings
-from django.conf.urls.static import static
-from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.views import serve_media, serve_static
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('', include('posts.urls', namespace='posts')),
     path('about/', include('about.urls', namespace='about')),
+    path('', include('core.urls', namespace='core')),
 ]
 
+if settings.ADMIN_ENABLED:
+    from django.contrib import admin
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
+
 handler403 = 'core.views.permission_denied'
 handler404 = 'core.views.page_not_found'
 handler500 = 'core.views.server_error'
 
-if settings.DEBUG:
+if settings.DEV_TOOLS:
     import debug_toolbar
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
+
+# Как django.conf.urls.static.static(): префикс из MEDIA_URL, а медиа
+# на другом домене (CDN) отдаём не мы.
+if not urlsplit(settings.MEDIA_URL).netloc:
+    media_prefix = re.escape(settings.MEDIA_URL.lstrip('/'))
+    urlpatterns += (re_path(rf'^{media_prefix}(?P<path>.*)$', serve_media),)
+
+if not settings.DEBUG and not urlsplit(settings.STATIC_URL).netloc:
+    static_prefix = re.escape(settings.STATIC_URL.lstrip('/'))
+    urlpatterns += (re_path(rf'^{static_prefix}(?P<path>.*)$',
+                            serve_static),)